@@ -30,6 +30,8 @@ from app.database import Base
 from app.models.user import User
 from app.models.category import Category
 from app.models.transaction import Transaction
+from app.models.monthly_category_total import MonthlyCategoryTotal
+from app.models.ai_usage_window import AIUsageWindow
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
@@ -0,0 +1,54 @@
+"""add transaction query indexes
+
+Revision ID: 5c1d8e2f7a90
+Revises: 22409ee9c3be
+Create Date: 2026-10-18 09:12:05.417302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1d8e2f7a90'
+down_revision: Union[str, Sequence[str], None] = '22409ee9c3be'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY can't run inside a transaction, and keeps large
+    # transaction tables writable while the indexes build
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_transactions_user_id_date_id',
+            'transactions',
+            ['user_id', sa.text('date DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_transactions_user_id_category_id_date',
+            'transactions',
+            ['user_id', 'category_id', 'date'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_categories_user_id_type',
+            'categories',
+            ['user_id', 'type'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_categories_user_id_type', table_name='categories', postgresql_concurrently=True)
+        op.drop_index('ix_transactions_user_id_category_id_date', table_name='transactions', postgresql_concurrently=True)
+        op.drop_index('ix_transactions_user_id_date_id', table_name='transactions', postgresql_concurrently=True)
@@ -0,0 +1,61 @@
+"""add monthly category totals rollup
+
+Revision ID: 8e4b0a6d3f21
+Revises: 5c1d8e2f7a90
+Create Date: 2026-10-18 10:03:48.126530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4b0a6d3f21'
+down_revision: Union[str, Sequence[str], None] = '5c1d8e2f7a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    rollup = op.create_table('monthly_category_totals',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'year', 'month', 'category_id')
+    )
+
+    # Backfill from existing history
+    transactions = sa.table('transactions',
+        sa.column('user_id', sa.Integer()),
+        sa.column('category_id', sa.Integer()),
+        sa.column('date', sa.Date()),
+        sa.column('amount', sa.Float()),
+        sa.column('id', sa.Integer()),
+    )
+    year = sa.cast(sa.extract('year', transactions.c.date), sa.Integer())
+    month = sa.cast(sa.extract('month', transactions.c.date), sa.Integer())
+    source = sa.select(
+        transactions.c.user_id,
+        year,
+        month,
+        transactions.c.category_id,
+        sa.func.sum(transactions.c.amount),
+        sa.func.count(transactions.c.id),
+    ).group_by(transactions.c.user_id, year, month, transactions.c.category_id)
+
+    op.execute(rollup.insert().from_select(
+        ['user_id', 'year', 'month', 'category_id', 'total', 'count'], source
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('monthly_category_totals')
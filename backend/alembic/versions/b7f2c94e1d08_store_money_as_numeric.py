@@ -0,0 +1,135 @@
+"""store money as numeric
+
+Revision ID: b7f2c94e1d08
+Revises: 8e4b0a6d3f21
+Create Date: 2026-10-18 14:21:07.593114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7f2c94e1d08'
+down_revision: Union[str, Sequence[str], None] = '8e4b0a6d3f21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows copied per transaction during the Postgres backfill
+BACKFILL_CHUNK = 10_000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        _upgrade_transactions_online()
+    else:
+        with op.batch_alter_table('transactions') as batch:
+            batch.alter_column('amount', type_=sa.Numeric(14, 2), existing_nullable=False)
+
+    with op.batch_alter_table('monthly_category_totals') as batch:
+        batch.alter_column(
+            'total', type_=sa.Numeric(16, 2), existing_nullable=False,
+            postgresql_using='total::numeric(16, 2)',
+        )
+
+    # The rollup was summed in floating point - recompute it exactly
+    _rebuild_rollup()
+
+
+def _upgrade_transactions_online() -> None:
+    """
+    ALTER COLUMN ... TYPE would rewrite transactions under an exclusive
+    lock. Instead: add a shadow column, keep it in sync with a trigger,
+    backfill it in small committed chunks, then swap it in.
+    """
+    op.add_column('transactions', sa.Column('amount_numeric', sa.Numeric(14, 2), nullable=True))
+    op.execute("""
+        CREATE FUNCTION transactions_sync_amount_numeric() RETURNS trigger AS $$
+        BEGIN
+            NEW.amount_numeric := round(NEW.amount::numeric, 2);
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER transactions_sync_amount_numeric
+        BEFORE INSERT OR UPDATE OF amount ON transactions
+        FOR EACH ROW EXECUTE FUNCTION transactions_sync_amount_numeric()
+    """)
+
+    bind = op.get_bind()
+    max_id = bind.execute(sa.text('SELECT max(id) FROM transactions')).scalar() or 0
+
+    # Each chunk commits on its own, so row locks are short-lived and
+    # writes keep flowing while history is converted
+    with op.get_context().autocommit_block():
+        for start in range(0, max_id + 1, BACKFILL_CHUNK):
+            op.execute(sa.text("""
+                UPDATE transactions SET amount_numeric = round(amount::numeric, 2)
+                WHERE id >= :start AND id < :end AND amount_numeric IS NULL
+            """).bindparams(start=start, end=start + BACKFILL_CHUNK))
+
+    # Anything the trigger and the chunks both missed (e.g. rows updated
+    # mid-migration in a way that didn't fire it) gets caught here
+    op.execute('UPDATE transactions SET amount_numeric = round(amount::numeric, 2) WHERE amount_numeric IS NULL')
+
+    # A validated CHECK lets SET NOT NULL skip its own full-table scan
+    op.execute('ALTER TABLE transactions ADD CONSTRAINT transactions_amount_numeric_not_null '
+               'CHECK (amount_numeric IS NOT NULL) NOT VALID')
+    op.execute('ALTER TABLE transactions VALIDATE CONSTRAINT transactions_amount_numeric_not_null')
+
+    op.execute('DROP TRIGGER transactions_sync_amount_numeric ON transactions')
+    op.execute('DROP FUNCTION transactions_sync_amount_numeric()')
+    op.drop_column('transactions', 'amount')
+    op.alter_column('transactions', 'amount_numeric', new_column_name='amount', nullable=False)
+    op.execute('ALTER TABLE transactions DROP CONSTRAINT transactions_amount_numeric_not_null')
+
+
+def _rebuild_rollup() -> None:
+    transactions = sa.table('transactions',
+        sa.column('user_id', sa.Integer()),
+        sa.column('category_id', sa.Integer()),
+        sa.column('date', sa.Date()),
+        sa.column('amount', sa.Numeric(14, 2)),
+        sa.column('id', sa.Integer()),
+    )
+    rollup = sa.table('monthly_category_totals',
+        sa.column('user_id', sa.Integer()),
+        sa.column('year', sa.Integer()),
+        sa.column('month', sa.Integer()),
+        sa.column('category_id', sa.Integer()),
+        sa.column('total', sa.Numeric(16, 2)),
+        sa.column('count', sa.Integer()),
+    )
+    year = sa.cast(sa.extract('year', transactions.c.date), sa.Integer())
+    month = sa.cast(sa.extract('month', transactions.c.date), sa.Integer())
+    source = sa.select(
+        transactions.c.user_id,
+        year,
+        month,
+        transactions.c.category_id,
+        sa.func.sum(transactions.c.amount),
+        sa.func.count(transactions.c.id),
+    ).group_by(transactions.c.user_id, year, month, transactions.c.category_id)
+
+    op.execute(rollup.delete())
+    op.execute(rollup.insert().from_select(
+        ['user_id', 'year', 'month', 'category_id', 'total', 'count'], source
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('monthly_category_totals') as batch:
+        batch.alter_column(
+            'total', type_=sa.Float(), existing_nullable=False,
+            postgresql_using='total::double precision',
+        )
+    with op.batch_alter_table('transactions') as batch:
+        batch.alter_column(
+            'amount', type_=sa.Float(), existing_nullable=False,
+            postgresql_using='amount::double precision',
+        )
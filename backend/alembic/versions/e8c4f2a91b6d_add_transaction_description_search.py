@@ -0,0 +1,83 @@
+"""add transaction description search
+
+Revision ID: e8c4f2a91b6d
+Revises: d3a61f5c8b47
+Create Date: 2026-10-18 18:05:33.871026
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c4f2a91b6d'
+down_revision: Union[str, Sequence[str], None] = 'd3a61f5c8b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        # Same reasons as 5c1d8e2f7a90 for CONCURRENTLY
+        with op.get_context().autocommit_block():
+            # Must stay the expression app.services.search queries with
+            op.create_index(
+                'ix_transactions_description_fts',
+                'transactions',
+                [sa.text("to_tsvector('simple', coalesce(description, ''))")],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_concurrently=True,
+            )
+            op.create_index(
+                'ix_transactions_description_trgm',
+                'transactions',
+                ['description'],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_ops={'description': 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+            )
+    elif op.get_bind().dialect.name == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE transactions_fts USING fts5("
+            "description, content='transactions', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute("""
+            CREATE TRIGGER transactions_fts_insert AFTER INSERT ON transactions BEGIN
+                INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER transactions_fts_delete AFTER DELETE ON transactions BEGIN
+                INSERT INTO transactions_fts(transactions_fts, rowid, description)
+                VALUES ('delete', old.id, old.description);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER transactions_fts_update AFTER UPDATE OF description ON transactions BEGIN
+                INSERT INTO transactions_fts(transactions_fts, rowid, description)
+                VALUES ('delete', old.id, old.description);
+                INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description);
+            END
+        """)
+        # Index the rows already there
+        op.execute("INSERT INTO transactions_fts(transactions_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_transactions_description_trgm', table_name='transactions', postgresql_concurrently=True)
+            op.drop_index('ix_transactions_description_fts', table_name='transactions', postgresql_concurrently=True)
+        # pg_trgm stays - other objects may have come to depend on it
+    elif op.get_bind().dialect.name == 'sqlite':
+        op.execute('DROP TRIGGER transactions_fts_update')
+        op.execute('DROP TRIGGER transactions_fts_delete')
+        op.execute('DROP TRIGGER transactions_fts_insert')
+        op.execute('DROP TABLE transactions_fts')
@@ -0,0 +1,30 @@
+"""add user data version
+
+Revision ID: f1a7c3d9e254
+Revises: e8c4f2a91b6d
+Create Date: 2026-10-18 21:14:08.530912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a7c3d9e254'
+down_revision: Union[str, Sequence[str], None] = 'e8c4f2a91b6d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A server default fills existing rows without rewriting the table on Postgres 11+
+    op.add_column('users', sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('users') as batch:
+        batch.drop_column('data_version')
@@ -1,28 +1,41 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import Optional
+import secrets
+import time
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
+from sqlalchemy import event
 from sqlalchemy.orm import Session
-from app.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
-from app.database import get_db
+from app.config import (
+    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES,
+    AUTH_CACHE_TTL_SECONDS, AUTH_CACHE_MAX_ENTRIES, METRICS_TOKEN,
+)
+from app.database import get_db, run_db
 from app.models.user import User
-
-# This handles password hashing - never store plain text passwords
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.services.cache import LRUTTLCache, MISSING
 
 # This tells FastAPI where to look for the JWT token in requests
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 bearer_scheme = HTTPBearer()
 
-def hash_password(password: str) -> str:
-    """Converts plain password to a hashed version for safe storage"""
-    return pwd_context.hash(password)
+
+@dataclass(frozen=True, slots=True)
+class CurrentUser:
+    """
+    Who is making the request - a plain snapshot, not an ORM object,
+    so it can be cached and used without a live session.
+    Routers only need it for ownership checks and /me.
+    """
+    id: int
+    name: str
+    email: str
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Checks if the login password matches the stored hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+# token -> CurrentUser. Short TTL bounds how long a missed
+# invalidation could serve stale user data.
+_user_cache = LRUTTLCache(max_entries=AUTH_CACHE_MAX_ENTRIES, ttl_seconds=AUTH_CACHE_TTL_SECONDS)
 
 
 def create_access_token(data: dict) -> str:
@@ -33,8 +46,17 @@ def create_access_token(data: dict) -> str:
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: Session = Depends(get_db)) -> User:
-    token = credentials.credentials
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: Session = Depends(get_db)) -> CurrentUser:
+    return await authenticate(credentials.credentials, db)
+
+
+async def authenticate(token: str, db) -> CurrentUser:
+    """get_current_user without the dependency wiring, for tokens that arrive some other way"""
+    # Cache hit skips the signature check and the users lookup
+    cached = _user_cache.get(token)
+    if cached is not MISSING:
+        return cached
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -48,7 +70,61 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_
     except JWTError:
         raise credentials_exception
 
+    principal = await run_db(db, _load_principal, user_id)
+    if principal is None:
+        raise credentials_exception
+
+    # Never cache past the token's own expiry
+    expires_in = payload["exp"] - time.time() if "exp" in payload else AUTH_CACHE_TTL_SECONDS
+    _user_cache.set(token, principal, ttl=min(AUTH_CACHE_TTL_SECONDS, expires_in))
+    return principal
+
+
+def _load_principal(db: Session, user_id: int):
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
-        raise credentials_exception
-    return user
\ No newline at end of file
+        return None
+    return CurrentUser(id=user.id, name=user.name, email=user.email)
+
+
+async def require_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    """
+    For /metrics: process-wide numbers, not any one user's. With
+    METRICS_TOKEN set it needs "Authorization: Bearer <token>"; without
+    it it's open, for a scraper on a private network.
+    """
+    if METRICS_TOKEN and not secrets.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+
+async def require_internal_token(authorization: Optional[str] = Header(None)) -> None:
+    """For /api/internal: the metrics token, and no way in at all until one is set"""
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    await require_metrics_token(authorization)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drops every cached token for this user. Call after changing or deleting them."""
+    _user_cache.delete_where(lambda principal: principal.id == user_id)
+
+
+# ORM updates/deletes of a User invalidate automatically once committed.
+# Bulk query.update()/delete() skip these events - call invalidate_user yourself.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _track_changed_user(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop("changed_user_ids", ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session):
+    session.info.pop("changed_user_ids", None)
\ No newline at end of file
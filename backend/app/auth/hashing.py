@@ -0,0 +1,95 @@
+"""
+Password hashing off the request path.
+
+bcrypt burns ~250ms of CPU per call at cost 12. On the shared
+threadpool a login burst ties up the threads every other endpoint
+needs, so it gets its own process pool instead, and callers are
+turned away with a 503 once too much work is queued.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from passlib.context import CryptContext
+from app.config import BCRYPT_ROUNDS, BCRYPT_WORKERS, BCRYPT_MAX_PENDING
+
+# Hashes made with a different cost are flagged by needs_update,
+# which is what drives the rehash-on-login below
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_and_update(password: str, password_hash: str) -> tuple[bool, Optional[str]]:
+    """(matches, new_hash) - new_hash is set when the stored hash should be replaced"""
+    return pwd_context.verify_and_update(password, password_hash)
+
+
+class PasswordHasher:
+    """
+    Bounded process pool for bcrypt. workers=0 hashes on the shared
+    threadpool instead (still bounded), for scripts and tests that
+    can't spawn processes.
+    Pending counts calls queued or running; it only changes on the
+    event loop, so it needs no lock.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn, not fork: forking a process with a live event loop and
+            # DB connections copies both into the child
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-in requests right now. Please try again in a moment.",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            if not self.workers:
+                return await run_in_threadpool(fn, *args)
+            return await asyncio.get_running_loop().run_in_executor(self._executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify_and_update(self, password: str, password_hash: str) -> tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update, password, password_hash)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "rounds": BCRYPT_ROUNDS,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+password_hasher = PasswordHasher(workers=BCRYPT_WORKERS, max_pending=BCRYPT_MAX_PENDING)
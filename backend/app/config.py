@@ -7,4 +7,87 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 1440))
\ No newline at end of file
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 1440))
+# Set DB_ASYNC=true to run queries through SQLAlchemy's AsyncEngine.
+# ASYNC_DATABASE_URL defaults to DATABASE_URL with an async driver swapped in.
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() == "true"
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# Connection pool. Size x workers has to fit under the database's max_connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # seconds; -1 keeps connections forever
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))  # Postgres only, 0 disables
+
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", 200))
+AGGREGATE_MAX_BUCKETS = int(os.getenv("AGGREGATE_MAX_BUCKETS", 1000))  # per /aggregate request
+
+# Bulk import: rows per INSERT batch, and how many row errors to report back
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 1000))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", 100))
+BATCH_MAX_OPERATIONS = int(os.getenv("BATCH_MAX_OPERATIONS", 500))
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 1000))  # rows fetched and encoded at a time
+
+# Analytics response cache: "memory" (per process) or "redis" (shared across workers)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", 300))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 10000))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Decoded-token -> user snapshot cache used by get_current_user
+AUTH_CACHE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_TTL_SECONDS", 60))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", 10000))
+
+# Password hashing. Raising BCRYPT_ROUNDS is safe: old hashes are upgraded on next login.
+# Hashing runs in a process pool of BCRYPT_WORKERS per app worker; once BCRYPT_MAX_PENDING
+# hashes are queued or running, register/login answer 503 instead of piling up.
+# BCRYPT_WORKERS=0 hashes on the shared threadpool instead of separate processes.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", os.cpu_count() or 1))
+BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", 64))
+
+# Natural-language transaction parsing. With AI_BASE_URL unset the Groq SDK is used;
+# set it to any OpenAI-compatible /v1 endpoint (or a local fake server) to use that instead.
+AI_BASE_URL = os.getenv("AI_BASE_URL")
+AI_API_KEY = os.getenv("AI_API_KEY", GROQ_API_KEY or "")
+AI_MODEL = os.getenv("AI_MODEL", "llama-3.1-8b-instant")
+AI_TIMEOUT_SECONDS = float(os.getenv("AI_TIMEOUT_SECONDS", 10))  # per attempt
+AI_MAX_RETRIES = int(os.getenv("AI_MAX_RETRIES", 2))
+AI_RETRY_BUDGET_SECONDS = float(os.getenv("AI_RETRY_BUDGET_SECONDS", 20))  # all attempts together
+AI_CACHE_TTL_SECONDS = int(os.getenv("AI_CACHE_TTL_SECONDS", 3600))
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", 10000))
+# Inputs the local rule parser is at least this sure about skip the LLM (0-1; above 1 disables it)
+RULE_PARSER_MIN_CONFIDENCE = float(os.getenv("RULE_PARSER_MIN_CONFIDENCE", 0.8))
+
+# Batch parsing: lines per request, prompt size per LLM call, and LLM calls in flight per request
+AI_BATCH_MAX_LINES = int(os.getenv("AI_BATCH_MAX_LINES", 50))
+AI_BATCH_TOKEN_BUDGET = int(os.getenv("AI_BATCH_TOKEN_BUDGET", 1200))
+AI_BATCH_CONCURRENCY = int(os.getenv("AI_BATCH_CONCURRENCY", 4))
+
+# AI credit limits. Backend: "memory" (per process), "redis" (shared, uses REDIS_URL)
+# or "database" (shared, uses the ai_usage_windows table). Policy: "daily" resets at
+# midnight UTC, "sliding" counts the last 24 hours.
+AI_DAILY_LIMIT = int(os.getenv("AI_DAILY_LIMIT", 20))
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_POLICY = os.getenv("RATE_LIMIT_POLICY", "daily")
+
+# Instrumentation. SERVER_TIMING adds a Server-Timing header (DB time, query count, pool
+# wait) to every response. Statements slower than SLOW_QUERY_MS are logged (0 disables).
+# Set METRICS_TOKEN to require "Authorization: Bearer <token>" on /metrics and /api/internal/*;
+# without it /metrics is open and /api/internal/* is off (404).
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() == "true"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 500))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Analytics engine: loaded transaction arrays kept per (user, data version), in this process
+ANALYTICS_LEDGER_CACHE_ENTRIES = int(os.getenv("ANALYTICS_LEDGER_CACHE_ENTRIES", 32))
+
+# Live updates (/api/events). EVENTS_BACKEND: "memory" (streams only see writes made by the
+# same process) or "postgres" (LISTEN/NOTIFY, so a write on any worker reaches every stream;
+# needs CACHE_BACKEND=redis so the totals streams attach are the same on every worker).
+# A stream more than EVENTS_QUEUE_SIZE events behind gets one "resync" event instead.
+EVENTS_BACKEND = os.getenv("EVENTS_BACKEND", "memory")
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", 100))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", 15))
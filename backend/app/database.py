@@ -1,15 +1,99 @@
+from contextlib import asynccontextmanager
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from app.config import DATABASE_URL
+from starlette.concurrency import run_in_threadpool
+from app.config import (
+    DATABASE_URL, DB_ASYNC, ASYNC_DATABASE_URL,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING, DB_STATEMENT_TIMEOUT_MS,
+)
+from app.services.pool_metrics import pool_metrics, InstrumentedQueuePool, InstrumentedAsyncQueuePool
+from app.services.request_metrics import request_metrics
 
-engine = create_engine(DATABASE_URL)
+
+def _engine_options(url: str, is_async: bool) -> dict:
+    """Pool and session settings from config, adjusted for the driver"""
+    parsed = make_url(url)
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+
+    # In-memory SQLite is one connection per thread - there is no pool to tune
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return options
+
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+
+    if DB_STATEMENT_TIMEOUT_MS and parsed.get_backend_name() == "postgresql":
+        if parsed.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+
+    return options
+
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL, is_async=False))
+pool_metrics.instrument(engine)
+request_metrics.instrument(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
+
+def _to_async_url(url: str) -> str:
+    """Swaps the sync driver in DATABASE_URL for its async counterpart"""
+    scheme, rest = url.split("://", 1)
+    driver = {"postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+    return f"{driver.get(scheme.split('+')[0], scheme)}://{rest}"
+
+
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    async_url = ASYNC_DATABASE_URL or _to_async_url(DATABASE_URL)
+    async_engine = create_async_engine(async_url, **_engine_options(async_url, is_async=True))
+    pool_metrics.instrument(async_engine.sync_engine)
+    request_metrics.instrument(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
+
+async def get_db():
+    """
+    Yields an AsyncSession when DB_ASYNC is on, otherwise a regular Session.
+    Routers shouldn't care which - they hand their queries to run_db().
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+
+
+# get_db as an async context manager, for code that needs a session outside
+# a request's dependencies - e.g. a long-lived stream that shouldn't hold one open
+db_session = asynccontextmanager(get_db)
+
+
+async def run_db(db, fn, *args, **kwargs):
+    """
+    Runs fn(session, *args, **kwargs) and returns its result.
+
+    fn is plain sync ORM code. With an AsyncSession it runs through
+    run_sync, so every query awaits the async driver and the event loop
+    stays free. With a sync Session it runs in the threadpool, exactly
+    like the old sync handlers did.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
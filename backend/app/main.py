@@ -1,12 +1,29 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
-from app.routers import auth, category, transaction, ai
+from app.routers import auth, category, transaction, ai, analytics, internal, metrics, events
+from app.auth.hashing import password_hasher
+from app.services.request_metrics import RequestMetricsMiddleware
+from app.services.events import event_broker
+from app.services.conditional import ConditionalGetMiddleware
+from app.responses import ORJSONResponse
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    event_broker.start()
+    yield
+    event_broker.stop()
+    password_hasher.shutdown()
+
 
 app = FastAPI(
     title="Finance Tracker API",
     description="AI-Powered Personal Finance Tracker",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -22,11 +39,18 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ConditionalGetMiddleware)
+# Added last, so it's outermost and times everything including CORS
+app.add_middleware(RequestMetricsMiddleware)
 
 app.include_router(auth.router, )
 app.include_router(category.router)
 app.include_router(transaction.router)
 app.include_router(ai.router)
+app.include_router(analytics.router)
+app.include_router(internal.router)
+app.include_router(metrics.router)
+app.include_router(events.router)
 
 
 def custom_openapi():
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from app.database import Base
+
+class AIUsageWindow(Base):
+    """
+    AI credits used per (user, UTC day). Backs the database rate limiter,
+    so limits hold across workers and restarts without Redis.
+    """
+    __tablename__ = "ai_usage_windows"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Integer, primary_key=True)  # UTC days since 1970-01-01
+    count = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -13,5 +13,10 @@ class Category(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_categories_user_id_type", "user_id", "type"),
+    )
+
     user = relationship("User", back_populates="categories")
-    transactions = relationship("Transaction", back_populates="category", cascade="all, delete-orphan")
\ No newline at end of file
+    transactions = relationship("Transaction", back_populates="category", cascade="all, delete-orphan")
+    monthly_totals = relationship("MonthlyCategoryTotal", back_populates="category", cascade="all, delete-orphan")
\ No newline at end of file
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, Numeric, ForeignKey
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+class MonthlyCategoryTotal(Base):
+    """
+    Running totals per (user, month, category), kept in sync by the
+    transaction endpoints so dashboards never re-scan full history.
+    """
+    __tablename__ = "monthly_category_totals"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    total = Column(Numeric(16, 2), nullable=False, default=0)  # room for sums of NUMERIC(14,2)
+    count = Column(Integer, nullable=False, default=0)
+
+    user = relationship("User", back_populates="monthly_totals")
+    category = relationship("Category", back_populates="monthly_totals")
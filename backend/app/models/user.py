@@ -11,6 +11,9 @@ class User(Base):
     email = Column(String(255), unique=True, index=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped with every write to the user's transactions or categories (services/versions)
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     categories = relationship("Category", back_populates="user", cascade="all, delete-orphan")
-    transactions = relationship("Transaction", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
+    transactions = relationship("Transaction", back_populates="user", cascade="all, delete-orphan")
+    monthly_totals = relationship("MonthlyCategoryTotal", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
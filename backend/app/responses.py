@@ -0,0 +1,33 @@
+"""
+Default JSON response class.
+
+orjson encodes several times faster than the stdlib json FastAPI uses
+by default, and handles dates and datetimes natively. Decimal amounts
+go out as JSON numbers, the same as the Money type does.
+"""
+from decimal import Decimal
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z  # "Z" for UTC, as pydantic writes it
+
+
+def _default(value: Any):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    Also the way to skip response_model validation: return one of these
+    directly with data we built ourselves and FastAPI sends it as is.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,20 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models.user import User
-from app.models.category import Category
-from app.schemas.transaction import AITransactionInput
-from app.services.ai_service import parse_transaction_text
+from app.database import get_db, run_db
+from app.schemas.transaction import AITransactionInput, AIBatchInput
+from app.services.ai_service import transaction_parser, normalize_text
+from app.services import rule_parser, reads
+from app.config import RULE_PARSER_MIN_CONFIDENCE
 from app.services.rate_limiter import ai_rate_limiter
-from app.auth.auth import get_current_user
+from app.auth.auth import get_current_user, CurrentUser
 
 router = APIRouter(prefix="/api/ai", tags=["AI"])
 
 
 @router.get("/usage")
-def get_ai_usage(current_user: User = Depends(get_current_user)):
+async def get_ai_usage(current_user: CurrentUser = Depends(get_current_user)):
     """Check how many AI parses the user has left today"""
-    remaining = ai_rate_limiter.get_remaining(current_user.id)
+    remaining = await ai_rate_limiter.get_remaining(current_user.id)
     return {
         "daily_limit": ai_rate_limiter.daily_limit,
         "remaining": remaining,
@@ -23,36 +23,106 @@ def get_ai_usage(current_user: User = Depends(get_current_user)):
 
 
 @router.post("/parse-transaction")
-def parse_transaction(
+async def parse_transaction(
     data: AITransactionInput,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    # Check rate limit BEFORE calling Groq
-    rate_check = ai_rate_limiter.check_and_increment(current_user.id)
+    """
+    Tries the local rule parser first, then the LLM cache, then the LLM.
+    parsed_by says which one answered; only an LLM call uses a credit.
+    """
+    user_categories = await run_db(db, reads.list_categories, current_user.id)
+    category_names = [c.name for c in user_categories]
 
-    if not rate_check["allowed"]:
-        raise HTTPException(
-            status_code=429,
-            detail=f"Daily AI limit reached ({ai_rate_limiter.daily_limit}/day). Resets at midnight UTC. You can still add transactions manually."
-        )
+    rules = rule_parser.parse(data.text, [(c.name, c.type) for c in user_categories])
+    if rules.confidence >= RULE_PARSER_MIN_CONFIDENCE:
+        result, parsed_by = rules.as_result(), "rules"
+        remaining = await ai_rate_limiter.get_remaining(current_user.id)
+    elif (result := transaction_parser.get_cached(data.text, category_names)) is not None:
+        # Something already parsed today costs nothing - no LLM call, no credit
+        parsed_by = "cache"
+        remaining = await ai_rate_limiter.get_remaining(current_user.id)
+    else:
+        # Check rate limit BEFORE calling the LLM
+        rate_check = await ai_rate_limiter.check_and_increment(current_user.id)
+
+        if not rate_check["allowed"]:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Daily AI limit reached ({ai_rate_limiter.daily_limit}/day). Resets at {rate_check['resets_at']}. You can still add transactions manually."
+            )
 
-    user_categories = db.query(Category).filter(
-        Category.user_id == current_user.id
-    ).all()
+        remaining = rate_check["remaining"]
+        result, parsed_by = await transaction_parser.parse(data.text, category_names), "llm"
+
+    _attach_category(result, user_categories)
+
+    # Include remaining usage in response
+    result["ai_remaining"] = remaining
+    result["parsed_by"] = parsed_by
 
+    return result
+
+
+@router.post("/parse-transactions")
+async def parse_transactions(
+    data: AIBatchInput,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Parses many lines (one transaction each) in one request.
+    Same tiers as parse-transaction, but lines that need the LLM are
+    packed into a few prompts that run concurrently. Each of those
+    lines costs one credit, as it would one at a time; once credits
+    run out, the remaining lines come back with an error instead.
+    """
+    user_categories = await run_db(db, reads.list_categories, current_user.id)
     category_names = [c.name for c in user_categories]
-    result = parse_transaction_text(data.text, category_names)
+    typed_categories = [(c.name, c.type) for c in user_categories]
+
+    results, parsed_by, needs_llm = [None] * len(data.lines), [None] * len(data.lines), []
+    for i, line in enumerate(data.lines):
+        rules = rule_parser.parse(line, typed_categories)
+        if rules.confidence >= RULE_PARSER_MIN_CONFIDENCE:
+            results[i], parsed_by[i] = rules.as_result(), "rules"
+        elif (cached := transaction_parser.get_cached(line, category_names)) is not None:
+            results[i], parsed_by[i] = cached, "cache"
+        else:
+            needs_llm.append(i)
 
-    if "category" in result and "error" not in result:
+    # Repeated lines are parsed once, so they're charged once
+    distinct = list(dict.fromkeys(normalize_text(data.lines[i]) for i in needs_llm))
+    granted = min(len(distinct), await ai_rate_limiter.get_remaining(current_user.id))
+    if granted and not (await ai_rate_limiter.check_and_increment(current_user.id, cost=granted))["allowed"]:
+        granted = 0  # someone else used the credits in the meantime
+    allowed = set(distinct[:granted])
+
+    llm_lines = [i for i in needs_llm if normalize_text(data.lines[i]) in allowed]
+    parsed = await transaction_parser.parse_many([data.lines[i] for i in llm_lines], category_names)
+    for i, result in zip(llm_lines, parsed):
+        results[i], parsed_by[i] = result, "llm"
+    for i in needs_llm:
+        if results[i] is None:
+            results[i] = {"error": f"Daily AI limit reached ({ai_rate_limiter.daily_limit}/day)"}
+
+    items = []
+    for number, (line, result, source) in enumerate(zip(data.lines, results, parsed_by), start=1):
+        _attach_category(result, user_categories)
+        items.append({"line": number, "text": line, **result, "parsed_by": source})
+
+    return {
+        "results": items,
+        "ai_remaining": await ai_rate_limiter.get_remaining(current_user.id),
+    }
+
+
+def _attach_category(result: dict, user_categories) -> None:
+    if result.get("category") and "error" not in result:
         matched = next(
-            (c for c in user_categories if c.name.lower() == result["category"].lower()),
+            (c for c in user_categories if c.name.lower() == str(result["category"]).lower()),
             None
         )
         if matched:
             result["category_id"] = matched.id
-
-    # Include remaining usage in response
-    result["ai_remaining"] = rate_check["remaining"]
-
-    return result
\ No newline at end of file
@@ -0,0 +1,75 @@
+from datetime import date
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.database import get_db, run_db
+from app.auth.auth import get_current_user, CurrentUser
+from app.services import analytics
+from app.services.cache import analytics_cache
+
+router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
+
+
+@router.get("/trends")
+async def get_trends(
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    months: int = Query(24, ge=1, le=120),
+    window: int = Query(3, ge=1, le=12)
+):
+    """Monthly income, expense, net and savings rate, with rolling averages and MoM / YoY changes"""
+    return await _cached(db, current_user.id, "analytics-trends", analytics.trends, months=months, window=window)
+
+
+@router.get("/daily")
+async def get_daily(
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    days: int = Query(90, ge=1, le=1096),
+    window: int = Query(7, ge=1, le=90)
+):
+    """Income and expense per day, with a rolling average of spending"""
+    return await _cached(db, current_user.id, "analytics-daily", analytics.daily, days=days, window=window)
+
+
+@router.get("/categories")
+async def get_category_trends(
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    months: int = Query(12, ge=1, le=120)
+):
+    """Per-category totals, shares, trend lines and MoM / YoY changes over complete months"""
+    return await _cached(db, current_user.id, "analytics-categories", analytics.category_trends, months=months)
+
+
+@router.get("/savings-rate")
+async def get_savings_rate(
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    months: int = Query(12, ge=1, le=120)
+):
+    """Savings rate over the last complete months, against the period before"""
+    return await _cached(db, current_user.id, "analytics-savings-rate", analytics.savings_rate, months=months)
+
+
+@router.get("/forecast")
+async def get_forecast(
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    months: int = Query(3, ge=1, le=24),
+    history: int = Query(12, ge=2, le=120)
+):
+    """Income and expense projected from the recent trend, plus a run-rate for this month"""
+    return await _cached(db, current_user.id, "analytics-forecast", analytics.forecast, months=months, history=history)
+
+
+async def _cached(db, user_id: int, endpoint: str, metric, **params):
+    # Results depend on today as well as the data - part of the key
+    today = date.today()
+
+    async def compute():
+        ledger = await run_db(db, analytics.get_ledger, user_id)
+        # NumPy work goes to the threadpool - in async DB mode run_db runs on the event loop
+        return await run_in_threadpool(metric, ledger, today, **params)
+
+    return await analytics_cache.aget_or_compute(user_id, endpoint, {**params, "today": today}, compute)
@@ -1,15 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, run_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin, UserResponse, TokenResponse
-from app.auth.auth import hash_password, verify_password, create_access_token, get_current_user
+from app.auth.auth import create_access_token, get_current_user, CurrentUser
+from app.auth.hashing import password_hasher
+from app.services.conditional import user_etag
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=UserResponse)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """
     Registration endpoint.
     1. Check if email already exists
@@ -17,17 +19,26 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     3. Create user in database
     4. Return user info (without password)
     """
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
+    if await run_db(db, _find_user_by_email, user_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
+    # bcrypt is CPU-bound - it runs in its own process pool
+    password_hash = await password_hasher.hash(user_data.password)
+    return await run_db(db, _create_user, user_data, password_hash)
+
+
+def _find_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
+
+def _create_user(db: Session, user_data: UserCreate, password_hash: str) -> User:
     new_user = User(
         name=user_data.name,
         email=user_data.email,
-        password_hash=hash_password(user_data.password)
+        password_hash=password_hash
     )
     db.add(new_user)
     db.commit()
@@ -35,8 +46,13 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     return new_user
 
 
+def _update_password_hash(db: Session, user_id: int, password_hash: str) -> None:
+    db.query(User).filter(User.id == user_id).update({"password_hash": password_hash})
+    db.commit()
+
+
 @router.post("/login", response_model=TokenResponse)
-def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, db: Session = Depends(get_db)):
     """
     Login endpoint.
     1. Find user by email
@@ -44,23 +60,36 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
     3. Create JWT token with user ID inside it
     4. Return token + user info
     """
-    user = db.query(User).filter(User.email == user_data.email).first()
-    if not user or not verify_password(user_data.password, user.password_hash):
+    user = await run_db(db, _find_user_by_email, user_data.email)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password"
+        )
+
+    valid, new_hash = await password_hasher.verify_and_update(user_data.password, user.password_hash)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
+    # Copied out first: the rehash commit expires user, and an AsyncSession
+    # can't lazy-load it back here on the event loop
+    user_response = UserResponse.model_validate(user)
+    if new_hash:
+        # Stored with an old cost factor - upgrade it now that we have the password
+        await run_db(db, _update_password_hash, user.id, new_hash)
 
-    token = create_access_token(data={"sub": str(user.id)})
+    token = create_access_token(data={"sub": str(user_response.id)})
     return {
         "access_token": token,
         "token_type": "bearer",
-        "user": user
+        "user": user_response
     }
 
 
-@router.get("/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+@router.get("/me", response_model=UserResponse, dependencies=[Depends(user_etag)])
+async def get_me(current_user: CurrentUser = Depends(get_current_user)):
     """
     Returns the currently logged-in user's info.
     The get_current_user dependency automatically extracts
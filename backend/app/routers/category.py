@@ -1,53 +1,70 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
-from app.database import get_db
-from app.models.user import User
+from app.database import get_db, run_db
 from app.models.category import Category
 from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
-from app.auth.auth import get_current_user
+from app.auth.auth import get_current_user, CurrentUser
+from app.services.cache import analytics_cache
+from app.services.events import event_broker
+from app.services.conditional import data_version_etag
+from app.services import reads, versions
+from app.responses import ORJSONResponse
 
-router = APIRouter(prefix="/api/categories", tags=["Categories"])
+# Every GET here answers 304 when the client's ETag is still current
+router = APIRouter(prefix="/api/categories", tags=["Categories"], dependencies=[Depends(data_version_etag)])
 
 
 @router.post("/", response_model=CategoryResponse)
-def create_category(
+async def create_category(
     data: CategoryCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """Create a new category for the logged-in user"""
-    category = Category(**data.model_dump(), user_id=current_user.id)
+    return await run_db(db, _create_category, current_user.id, data)
+
+
+def _create_category(db: Session, user_id: int, data: CategoryCreate) -> Category:
+    category = Category(**data.model_dump(), user_id=user_id)
     db.add(category)
+    version = versions.bump(db, user_id)
     db.commit()
+    analytics_cache.bump_version(user_id)
     db.refresh(category)
+    event_broker.publish(user_id, "category.created", version, id=category.id)
     return category
 
 
 @router.get("/", response_model=List[CategoryResponse])
-def get_categories(
+async def get_categories(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """Get all categories belonging to the logged-in user"""
-    return db.query(Category).filter(Category.user_id == current_user.id).all()
+    # Column rows, already in CategoryResponse's shape - no need to validate them again
+    return ORJSONResponse(await run_db(db, reads.list_categories, current_user.id))
 
 
 @router.put("/{category_id}", response_model=CategoryResponse)
-def update_category(
+async def update_category(
     category_id: int,
     data: CategoryUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
-    Update a category. 
-    First checks if it exists AND belongs to this user — 
+    Update a category.
+    First checks if it exists AND belongs to this user —
     so users can't edit each other's categories.
     """
+    return await run_db(db, _update_category, current_user.id, category_id, data)
+
+
+def _update_category(db: Session, user_id: int, category_id: int, data: CategoryUpdate) -> Category:
     category = db.query(Category).filter(
         Category.id == category_id,
-        Category.user_id == current_user.id
+        Category.user_id == user_id
     ).first()
 
     if not category:
@@ -57,26 +74,36 @@ def update_category(
     for key, value in update_data.items():
         setattr(category, key, value)
 
+    version = versions.bump(db, user_id)
     db.commit()
+    analytics_cache.bump_version(user_id)
     db.refresh(category)
+    event_broker.publish(user_id, "category.updated", version, id=category_id)
     return category
 
 
 @router.delete("/{category_id}")
-def delete_category(
+async def delete_category(
     category_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """Delete a category and all its transactions"""
+    return await run_db(db, _delete_category, current_user.id, category_id)
+
+
+def _delete_category(db: Session, user_id: int, category_id: int) -> dict:
     category = db.query(Category).filter(
         Category.id == category_id,
-        Category.user_id == current_user.id
+        Category.user_id == user_id
     ).first()
 
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
 
     db.delete(category)
+    version = versions.bump(db, user_id)
     db.commit()
-    return {"message": "Category deleted successfully"}
\ No newline at end of file
+    analytics_cache.bump_version(user_id)
+    event_broker.publish(user_id, "category.deleted", version, id=category_id)
+    return {"message": "Category deleted successfully"}
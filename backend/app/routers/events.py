@@ -0,0 +1,113 @@
+import asyncio
+import time
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from jose import jwt
+from app.auth.auth import authenticate
+from app.config import EVENTS_HEARTBEAT_SECONDS
+from app.database import db_session, run_db
+from app.responses import dumps
+from app.services import rollup, versions
+from app.services.cache import analytics_cache
+from app.services.events import event_broker
+
+router = APIRouter(prefix="/api/events", tags=["Events"])
+
+# How long a browser's EventSource waits before reconnecting after a drop
+RETRY_MS = 3000
+# Last event on a stream whose token has run out: reconnect with a new one
+EXPIRED = {"type": "expired"}
+
+
+@router.get("/")
+async def stream_events(
+    access_token: Optional[str] = Query(None, description="For EventSource, which can't send headers"),
+    authorization: Optional[str] = Header(None),
+    totals: bool = Query(False, description="Attach the /summary body for month/year to each event"),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    year: Optional[int] = Query(None),
+):
+    """
+    Server-Sent Events for the logged-in user's data. First a "ready"
+    event with the current data version, then one event per committed
+    change to their transactions or categories (type, version, and ids
+    where there are any), plus a comment line every
+    EVENTS_HEARTBEAT_SECONDS so proxies don't drop an idle connection.
+    Versions are users.data_version, the same on every worker, so an
+    event at or below the version of a client's snapshot is already in it.
+    A "resync" event means events were missed - refetch everything.
+    The stream ends with an "expired" event when the token does.
+    """
+    token = access_token
+    if authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    # The session is only for the token check - an open stream holds no connection
+    async with db_session() as db:
+        user = await authenticate(token, db)
+    # Already verified by authenticate()
+    expires_at = jwt.get_unverified_claims(token).get("exp")
+
+    return StreamingResponse(
+        _stream(user.id, totals, month, year, expires_at),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: nginx would otherwise hold events back
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _stream(
+    user_id: int, totals: bool, month: Optional[int], year: Optional[int], expires_at: Optional[float] = None
+):
+    # Subscribed before reading the version, so no change can fall in between
+    subscription = event_broker.subscribe(user_id)
+    try:
+        async with db_session() as db:
+            ready = {"type": "ready", "version": await run_db(db, versions.current, user_id)}
+        if totals:
+            ready["summary"] = await _current_summary(user_id, month, year)
+        yield f"retry: {RETRY_MS}\n\n" + _frame(ready)
+
+        while True:
+            wait = EVENTS_HEARTBEAT_SECONDS
+            if expires_at is not None:
+                wait = min(wait, expires_at - time.time())
+                if wait <= 0:
+                    # Nothing more goes out on a token that's no longer valid
+                    yield _frame(EXPIRED)
+                    return
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), wait)
+            except asyncio.TimeoutError:
+                if expires_at is None or time.time() < expires_at:
+                    yield ": ping\n\n"
+                continue
+
+            # Send whatever else has piled up along with it, with one set of totals for the lot
+            events = [event]
+            while not subscription.queue.empty():
+                events.append(subscription.queue.get_nowait())
+            if totals:
+                events[-1] = {**events[-1], "summary": await _current_summary(user_id, month, year)}
+            yield "".join(_frame(e) for e in events)
+    finally:
+        event_broker.unsubscribe(subscription)
+
+
+async def _current_summary(user_id: int, month: Optional[int], year: Optional[int]) -> dict:
+    # Same cache entry as GET /api/transactions/summary, so every open tab after a change shares one query
+    async with db_session() as db:
+        return await analytics_cache.aget_or_compute(
+            user_id, "summary", {"month": month, "year": year},
+            lambda: run_db(db, rollup.summary, user_id, month, year)
+        )
+
+
+def _frame(event: dict) -> str:
+    return f"data: {dumps(event).decode()}\n\n"
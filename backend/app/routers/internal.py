@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends
+from app.services.cache import analytics_cache
+from app.services.pool_metrics import pool_metrics
+from app.auth.auth import require_internal_token
+from app.auth.hashing import password_hasher
+from app.services.ai_service import transaction_parser
+from app.services.rate_limiter import ai_rate_limiter
+
+# Operational stats, kept out of the public API docs. Process-wide, so they
+# take the same token as /metrics rather than any user's login - and unlike
+# /metrics they stay closed while METRICS_TOKEN isn't set.
+router = APIRouter(
+    prefix="/api/internal", tags=["Internal"], include_in_schema=False,
+    dependencies=[Depends(require_internal_token)],
+)
+
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """Hit/miss/eviction counters for the analytics response cache"""
+    return analytics_cache.stats()
+
+
+@router.get("/pool-stats")
+async def get_pool_stats():
+    """Connection pool usage: checked-out connections, wait times, overflow and timeouts"""
+    return pool_metrics.stats()
+
+
+@router.get("/hasher-stats")
+async def get_hasher_stats():
+    """Password hashing pool: queued/running hashes and 503s handed out"""
+    return password_hasher.stats()
+
+
+@router.get("/ai-stats")
+async def get_ai_stats():
+    """AI parse cache hits/misses, coalesced duplicate requests, LLM calls made and limiter setup"""
+    return {**transaction_parser.stats(), "rate_limiter": ai_rate_limiter.stats()}
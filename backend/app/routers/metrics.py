@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from app.auth.auth import require_metrics_token
+from app.services.request_metrics import render_prometheus
+
+# Prometheus scrape target - no user auth, optionally a shared token (METRICS_TOKEN)
+router = APIRouter(tags=["Metrics"], include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+
+
+@router.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -1,111 +1,540 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from typing import BinaryIO, List, Literal, Optional
 from datetime import date
-from app.database import get_db
-from app.models.user import User
+from app.database import get_db, run_db, engine, SessionLocal, AsyncSessionLocal
 from app.models.transaction import Transaction
 from app.models.category import Category
-from app.schemas.transaction import TransactionCreate, TransactionUpdate, TransactionResponse
-from app.auth.auth import get_current_user
-from sqlalchemy import func, extract, case
-
-
-router = APIRouter(prefix="/api/transactions", tags=["Transactions"])
+from app.models.monthly_category_total import MonthlyCategoryTotal
+from app.schemas.transaction import (
+    TransactionCreate, TransactionUpdate, TransactionResponse, TransactionPage, ImportResult,
+    TransactionBatch, BatchResult,
+)
+from app.auth.auth import get_current_user, CurrentUser
+from app.config import (
+    MAX_PAGE_SIZE, AGGREGATE_MAX_BUCKETS, IMPORT_BATCH_SIZE, IMPORT_MAX_ERRORS, EXPORT_CHUNK_SIZE,
+)
+from app.services.pagination import encode_cursor, decode_cursor, encode_ranked_cursor, decode_ranked_cursor
+from app.services import rollup, importers, exporters, reads, aggregation, search, versions
+from app.services.cache import analytics_cache
+from app.services.events import event_broker
+from app.services.conditional import data_version_etag
+from app.responses import ORJSONResponse
+from sqlalchemy import func, case, tuple_, insert, select, update, delete
+
+
+# Every GET here answers 304 when the client's ETag is still current
+router = APIRouter(prefix="/api/transactions", tags=["Transactions"], dependencies=[Depends(data_version_etag)])
 
 
 @router.post("/", response_model=TransactionResponse)
-def create_transaction(
+async def create_transaction(
     data: TransactionCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
+    return await run_db(db, _create_transaction, current_user.id, data)
+
+
+def _create_transaction(db: Session, user_id: int, data: TransactionCreate) -> dict:
     category = db.query(Category).filter(
         Category.id == data.category_id,
-        Category.user_id == current_user.id
+        Category.user_id == user_id
     ).first()
 
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
 
-    transaction = Transaction(**data.model_dump(), user_id=current_user.id)
+    transaction = Transaction(**data.model_dump(), user_id=user_id)
     db.add(transaction)
+    rollup.record_added(db, transaction)
+    version = versions.bump(db, user_id)
     db.commit()
+    analytics_cache.bump_version(user_id)
     db.refresh(transaction)
+    event_broker.publish(user_id, "transaction.created", version, id=transaction.id)
 
     return _build_response(transaction, category)
 
 
+@router.post("/batch", response_model=BatchResult)
+async def batch_transactions(
+    batch: TransactionBatch,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Applies many create/update/delete operations in one database
+    transaction, e.g. for multi-select recategorize/delete and undo.
+    Returns one result per operation, in request order. Invalid
+    operations are reported and skipped, unless atomic=true, in which
+    case nothing is applied if any operation is invalid.
+    """
+    return await run_db(db, _apply_batch, current_user.id, batch)
+
+
+def _apply_batch(db: Session, user_id: int, batch: TransactionBatch) -> dict:
+    operations = batch.operations
+    results = [{"index": i, "op": op.op, "ok": False, "id": op.id, "error": None} for i, op in enumerate(operations)]
+    parsed = {}  # index -> TransactionCreate / TransactionUpdate / None for deletes
+
+    # Pass 1: shape checks that don't need the database
+    seen_ids = set()
+    for i, op in enumerate(operations):
+        try:
+            if op.op == "create":
+                parsed[i] = TransactionCreate(**(op.data or {}))
+                continue
+            if op.id is None:
+                raise ValueError("id is required")
+            if op.id in seen_ids:
+                raise ValueError("Transaction appears more than once in this batch")
+            seen_ids.add(op.id)
+            parsed[i] = TransactionUpdate(**(op.data or {})) if op.op == "update" else None
+            if parsed[i] is not None:
+                # description can be cleared like in PUT /{id}; these are NOT NULL columns
+                nulls = [f for f in ("amount", "date", "category_id") if f in parsed[i].model_fields_set
+                         and getattr(parsed[i], f) is None]
+                if nulls:
+                    raise ValueError(f"{nulls[0]} can't be null")
+        except ValidationError as e:
+            results[i]["error"] = e.errors()[0]["msg"]
+        except ValueError as e:
+            results[i]["error"] = str(e)
+
+    # Pass 2: one IN query each for category ownership and the existing rows
+    category_ids = {
+        parsed[i].category_id for i in parsed
+        if parsed[i] is not None and parsed[i].category_id is not None
+    }
+    owned = set()
+    if category_ids:
+        owned = set(db.scalars(
+            select(Category.id).where(Category.user_id == user_id, Category.id.in_(category_ids))
+        ))
+
+    transaction_ids = [operations[i].id for i in parsed if operations[i].op != "create"]
+    existing = {}
+    if transaction_ids:
+        rows = db.execute(
+            select(Transaction.id, Transaction.amount, Transaction.date, Transaction.category_id)
+            .where(Transaction.user_id == user_id, Transaction.id.in_(transaction_ids))
+        )
+        existing = {r.id: r._asdict() for r in rows}
+
+    for i, model in parsed.items():
+        op = operations[i]
+        if op.op != "create" and op.id not in existing:
+            results[i]["error"] = "Transaction not found"
+        elif model is not None and model.category_id is not None and model.category_id not in owned:
+            results[i]["error"] = "Category not found"
+
+    valid = [i for i in parsed if results[i]["error"] is None]
+    failed = len(operations) - len(valid)
+    if batch.atomic and failed:
+        for i in valid:
+            results[i]["error"] = "Not applied - other operations in this atomic batch failed"
+        return {"applied": 0, "failed": len(operations), "results": results}
+
+    # Pass 3: bulk statements, all inside the session's transaction
+    deltas = rollup.new_deltas()
+    creates, updates, deletes = [], [], []
+    for i in valid:
+        op, model = operations[i], parsed[i]
+        if op.op == "create":
+            values = {**model.model_dump(), "user_id": user_id}
+            creates.append((i, values))
+            rollup.add_to_deltas(deltas, values["category_id"], values["date"], values["amount"], 1)
+        elif op.op == "update":
+            old = existing[op.id]
+            # Same as PUT /{id}: whatever was sent, including an explicit null description
+            changes = model.model_dump(exclude_unset=True)
+            if changes:
+                new = {**old, **changes}
+                updates.append({"id": op.id, **changes})
+                rollup.add_to_deltas(deltas, old["category_id"], old["date"], -old["amount"], -1)
+                rollup.add_to_deltas(deltas, new["category_id"], new["date"], new["amount"], 1)
+        else:
+            old = existing[op.id]
+            deletes.append(op.id)
+            rollup.add_to_deltas(deltas, old["category_id"], old["date"], -old["amount"], -1)
+
+    if creates:
+        new_ids = db.scalars(
+            insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True),
+            [values for _, values in creates],
+        ).all()
+        for (i, _), new_id in zip(creates, new_ids):
+            results[i]["id"] = new_id
+    if updates:
+        # ORM bulk UPDATE by primary key - executemany, one round trip
+        db.execute(update(Transaction), updates)
+    if deletes:
+        db.execute(delete(Transaction).where(Transaction.user_id == user_id, Transaction.id.in_(deletes)))
+
+    rollup.apply_deltas(db, user_id, deltas)
+    if valid:
+        version = versions.bump(db, user_id)
+    db.commit()
+    if valid:
+        analytics_cache.bump_version(user_id)
+        event_broker.publish(user_id, "transactions.batch", version, ids=[results[i]["id"] for i in valid])
+
+    for i in valid:
+        results[i]["ok"] = True
+    return {"applied": len(valid), "failed": failed, "results": results}
+
+
+@router.post("/import", response_model=ImportResult)
+async def import_transactions(
+    file: UploadFile = File(...),
+    format: Optional[str] = Form(None),
+    expense_category_id: Optional[int] = Form(None),
+    income_category_id: Optional[int] = Form(None),
+    date_order: Optional[Literal["dmy", "mdy"]] = Form(None),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Bulk import from a bank export - CSV, QIF or OFX.
+    The format comes from the file extension unless `format` is given.
+
+    `date_order` says how to read slash dates like 03/04/2024: "dmy" or
+    "mdy". QIF defaults to "mdy"; otherwise the file has to settle it
+    with a date that reads only one way, or it's rejected.
+
+    Rows name their category by `category` (name) or `category_id`.
+    Rows without one go to expense_category_id when the amount is
+    negative and income_category_id otherwise; amounts are stored as
+    absolute values, like the rest of the app.
+
+    Bad rows are skipped and reported, good rows are imported in one
+    database transaction.
+    """
+    try:
+        fmt = importers.detect_format(file.filename, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if date_order is None and fmt == "qif":
+        date_order = "mdy"  # QIF comes from US software
+
+    # Parsing tens of thousands of rows is CPU work, so the import runs on
+    # the sync engine in a worker thread - in async mode too
+    return await run_in_threadpool(
+        _import_transactions, current_user.id, file.file, fmt, expense_category_id, income_category_id, date_order
+    )
+
+
+def _import_transactions(
+    user_id: int,
+    stream: BinaryIO,
+    fmt: str,
+    expense_category_id: Optional[int],
+    income_category_id: Optional[int],
+    date_order: Optional[str],
+) -> dict:
+    db = SessionLocal()
+    try:
+        # One category lookup for the whole file instead of one per row
+        categories = db.query(Category.id, Category.name).filter(Category.user_id == user_id).all()
+        owned_ids = {c.id for c in categories}
+        by_name = {c.name.lower(): c.id for c in categories}
+
+        for default_id in (expense_category_id, income_category_id):
+            if default_id is not None and default_id not in owned_ids:
+                raise HTTPException(status_code=404, detail="Category not found")
+
+        imported, failed, errors = 0, 0, []
+        batch = []
+        deltas = rollup.new_deltas()
+
+        try:
+            rows = importers.with_date_order(importers.PARSERS[fmt](stream), date_order)
+            for row_number, row, order in rows:
+                try:
+                    values = _parse_import_row(row, order, owned_ids, by_name, expense_category_id, income_category_id)
+                except (ValueError, ValidationError) as e:
+                    failed += 1
+                    if len(errors) < IMPORT_MAX_ERRORS:
+                        message = e.errors()[0]["msg"] if isinstance(e, ValidationError) else str(e)
+                        errors.append({"row": row_number, "error": message})
+                    continue
+
+                values["user_id"] = user_id
+                batch.append(values)
+                rollup.add_to_deltas(deltas, values["category_id"], values["date"], values["amount"], 1)
+
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    # executemany - one round trip per batch, not per row
+                    db.execute(insert(Transaction), batch)
+                    imported += len(batch)
+                    batch = []
+        except ValueError as e:
+            # The file itself is unreadable, e.g. a CSV without date/amount columns
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if batch:
+            db.execute(insert(Transaction), batch)
+            imported += len(batch)
+
+        rollup.apply_deltas(db, user_id, deltas)
+        if imported:
+            version = versions.bump(db, user_id)
+
+        db.commit()
+        if imported:
+            analytics_cache.bump_version(user_id)
+            event_broker.publish(user_id, "transactions.imported", version, count=imported)
+        return {"imported": imported, "failed": failed, "errors": errors}
+    finally:
+        db.close()
+
+
+def _parse_import_row(
+    row: dict,
+    date_order: Optional[str],
+    owned_ids: set,
+    by_name: dict,
+    expense_category_id: Optional[int],
+    income_category_id: Optional[int],
+) -> dict:
+    amount = importers.parse_amount(row.get("amount") or "")
+    on_date = importers.parse_date(row.get("date") or "", date_order)
+
+    if row.get("category_id"):
+        category_id = int(row["category_id"])
+        if category_id not in owned_ids:
+            raise ValueError("Category not found")
+    elif row.get("category"):
+        category_id = by_name.get(row["category"].strip().lower())
+        if category_id is None:
+            raise ValueError(f"Unknown category '{row['category']}'")
+    else:
+        category_id = expense_category_id if amount < 0 else income_category_id
+        if category_id is None:
+            raise ValueError("No category, and no default category for this amount's sign")
+
+    # Same rules as a single POST /api/transactions
+    data = TransactionCreate(
+        amount=abs(amount),
+        description=(row.get("description") or "").strip()[:500],
+        date=on_date,
+        category_id=category_id,
+    )
+    return data.model_dump()
+
+
 @router.get("/", response_model=List[TransactionResponse])
-def get_transactions(
+async def get_transactions(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     category_id: Optional[int] = Query(None),
     type: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     limit: int = Query(50),
-    offset: int = Query(0)
+    offset: int = Query(0),
+    q: Optional[str] = Query(None, max_length=200, description="Search descriptions; results come best match first"),
 ):
-    # Single query with JOIN — no N+1 problem
-    query = (
-        db.query(Transaction, Category)
-        .join(Category, Transaction.category_id == Category.id)
-        .filter(Transaction.user_id == current_user.id)
-    )
+    # Rows come from plain columns already in the response's shape (see
+    # services/reads) - sent as is rather than validated again against response_model
+    return ORJSONResponse(await run_db(
+        db, _list_transactions, current_user.id, category_id, type, start_date, end_date, limit, offset,
+        search.normalize(q),
+    ))
 
-    if category_id:
-        query = query.filter(Transaction.category_id == category_id)
-    if type:
-        query = query.filter(Category.type == type)
-    if start_date:
-        query = query.filter(Transaction.date >= start_date)
-    if end_date:
-        query = query.filter(Transaction.date <= end_date)
 
-    results = query.order_by(Transaction.date.desc()).offset(offset).limit(limit).all()
+def _list_transactions(db: Session, user_id, category_id, type, start_date, end_date, limit, offset, q=None) -> list:
+    query = _apply_filters(reads.transaction_select(), user_id, category_id, type, start_date, end_date)
 
-    return [_build_response(t, c) for t, c in results]
+    if q:
+        condition, rank = search.match(db.get_bind().dialect.name, q)
+        query = query.where(condition).order_by(rank.desc())
 
+    # id breaks ties between same-date rows so pages stay stable,
+    # and matches ix_transactions_user_id_date_id exactly
+    query = query.order_by(Transaction.date.desc(), Transaction.id.desc()).offset(offset).limit(limit)
 
-@router.get("/summary")
-def get_summary(
+    return reads.fetch_transactions(db, query)
+
+
+@router.get("/page", response_model=TransactionPage)
+async def get_transactions_page(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    month: Optional[int] = Query(None),
-    year: Optional[int] = Query(None)
+    current_user: CurrentUser = Depends(get_current_user),
+    category_id: Optional[int] = Query(None),
+    type: Optional[str] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    q: Optional[str] = Query(None, max_length=200, description="Search descriptions; see below for the order"),
 ):
-    # Single query with conditional aggregation instead of two separate queries
-    query = db.query(
-        func.coalesce(func.sum(
-            case((Category.type == "income", Transaction.amount), else_=0)
-        ), 0).label("total_income"),
-        func.coalesce(func.sum(
-            case((Category.type == "expense", Transaction.amount), else_=0)
-        ), 0).label("total_expense"),
-    ).join(Category, Transaction.category_id == Category.id).filter(
-        Transaction.user_id == current_user.id
-    )
+    """
+    Cursor-paginated version of the transaction list.
+    Pass back next_cursor to get the following page. Each page is an
+    index range scan that seeks past the last (date, id) seen, so deep
+    pages cost the same as the first one and same-date rows never get
+    duplicated or skipped. With q, Postgres pages go best match first and
+    seek past (rank, date, id); SQLite's bm25 rank moves with every write,
+    so there search results page by (date, id) like everything else.
+    A cursor only works with the q it came from.
+    """
+    q = search.normalize(q)
+    ranked = bool(q) and search.rank_is_stable(engine.dialect.name)
+    after = None
+    if cursor:
+        try:
+            after = decode_ranked_cursor(cursor) if ranked else decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # Same fast path as the list
+    return ORJSONResponse(await run_db(
+        db, _page_transactions, current_user.id, category_id, type, start_date, end_date, limit, after, q
+    ))
+
+
+def _page_transactions(db: Session, user_id, category_id, type, start_date, end_date, limit, after, q=None) -> dict:
+    query = _apply_filters(reads.transaction_select(), user_id, category_id, type, start_date, end_date)
+
+    if q:
+        dialect = db.get_bind().dialect.name
+        if search.rank_is_stable(dialect):
+            return _page_search(db, query, q, limit, after)
+        query = query.where(search.match(dialect, q)[0])
+
+    if after:
+        last_date, last_id = after
+        query = query.where(tuple_(Transaction.date, Transaction.id) < tuple_(last_date, last_id))
+
+    # Fetch one extra row to find out whether another page exists
+    query = query.order_by(Transaction.date.desc(), Transaction.id.desc()).limit(limit + 1)
+    results = reads.fetch_transactions(db, query)
+
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        next_cursor = encode_cursor(results[-1].date, results[-1].id)
 
-    if month and year:
-        query = query.filter(
-            extract("month", Transaction.date) == month,
-            extract("year", Transaction.date) == year
-        )
+    return {
+        "items": results,
+        "next_cursor": next_cursor,
+    }
 
-    result = query.one()
+
+def _page_search(db: Session, query, q: str, limit: int, after) -> dict:
+    condition, rank = search.match(db.get_bind().dialect.name, q)
+    query = query.where(condition)
+
+    if after:
+        query = query.where(tuple_(rank, Transaction.date, Transaction.id) < tuple_(*after))
+
+    # The rank rides along as an extra last column, for the cursor
+    query = query.add_columns(rank).order_by(rank.desc(), Transaction.date.desc(), Transaction.id.desc())
+    rows = db.execute(query.limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_ranked_cursor(last[-1], last.date, last.id)
 
     return {
-        "total_income": float(result.total_income),
-        "total_expense": float(result.total_expense),
-        "balance": float(result.total_income - result.total_expense)
+        "items": [reads.TransactionRow(*row[:-1]) for row in rows],
+        "next_cursor": next_cursor,
     }
 
 
+@router.get("/export")
+async def export_transactions(
+    current_user: CurrentUser = Depends(get_current_user),
+    format: str = Query("csv"),
+    category_id: Optional[int] = Query(None),
+    type: Optional[str] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    q: Optional[str] = Query(None, max_length=200),
+):
+    """
+    Streams every transaction matching the list filters as CSV, NDJSON
+    or Parquet (if pyarrow is installed), newest first.
+    Rows come off a server-side cursor EXPORT_CHUNK_SIZE at a time and
+    are encoded as they arrive, so memory stays flat for any history size.
+    """
+    try:
+        encoder = exporters.get_encoder(format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    query = select(
+        Transaction.id,
+        Transaction.date,
+        Transaction.amount,
+        Transaction.description,
+        Transaction.category_id,
+        Category.name,
+        Category.type,
+        Transaction.created_at,
+    ).join(Category, Transaction.category_id == Category.id)
+    query = _apply_filters(query, current_user.id, category_id, type, start_date, end_date)
+    q = search.normalize(q)
+    if q:
+        query = query.where(search.match(engine.dialect.name, q)[0])
+    query = query.order_by(Transaction.date.desc(), Transaction.id.desc())
+    # yield_per turns on server-side cursors (stream_results) where the driver has them
+    query = query.execution_options(yield_per=EXPORT_CHUNK_SIZE)
+
+    # The request's session is gone by the time the body streams,
+    # so the stream opens its own
+    stream = _stream_export_async if AsyncSessionLocal is not None else _stream_export
+    return StreamingResponse(
+        stream(query, encoder),
+        media_type=encoder.media_type,
+        headers={"Content-Disposition": f'attachment; filename="transactions.{encoder.extension}"'},
+    )
+
+
+def _stream_export(query, encoder):
+    # Sync generator - Starlette iterates it in the threadpool
+    db = SessionLocal()
+    try:
+        yield encoder.start()
+        for rows in db.execute(query).partitions():
+            yield encoder.batch(rows)
+        yield encoder.finish()
+    finally:
+        db.close()
+
+
+async def _stream_export_async(query, encoder):
+    async with AsyncSessionLocal() as db:
+        yield encoder.start()
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            yield encoder.batch(rows)
+        yield encoder.finish()
+
+
+@router.get("/summary")
+async def get_summary(
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    year: Optional[int] = Query(None)
+):
+    return await analytics_cache.aget_or_compute(
+        current_user.id, "summary", {"month": month, "year": year},
+        lambda: run_db(db, rollup.summary, current_user.id, month, year)
+    )
+
+
 @router.get("/monthly-breakdown")
-def get_monthly_breakdown(
+async def get_monthly_breakdown(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     year: Optional[int] = Query(None)
 ):
     from datetime import datetime
@@ -113,28 +542,35 @@ def get_monthly_breakdown(
     if not year:
         year = datetime.now().year
 
-    # Single query instead of 24 separate queries
+    return await analytics_cache.aget_or_compute(
+        current_user.id, "monthly-breakdown", {"year": year},
+        lambda: run_db(db, _monthly_breakdown, current_user.id, year)
+    )
+
+
+def _monthly_breakdown(db: Session, user_id: int, year: int) -> list:
+    # Single query over the rollup instead of 24 separate queries
     results = (
         db.query(
-            extract("month", Transaction.date).label("month"),
+            MonthlyCategoryTotal.month,
             func.coalesce(func.sum(
-                case((Category.type == "income", Transaction.amount), else_=0)
+                case((Category.type == "income", MonthlyCategoryTotal.total), else_=0)
             ), 0).label("income"),
             func.coalesce(func.sum(
-                case((Category.type == "expense", Transaction.amount), else_=0)
+                case((Category.type == "expense", MonthlyCategoryTotal.total), else_=0)
             ), 0).label("expense"),
         )
-        .join(Category, Transaction.category_id == Category.id)
+        .join(Category, MonthlyCategoryTotal.category_id == Category.id)
         .filter(
-            Transaction.user_id == current_user.id,
-            extract("year", Transaction.date) == year
+            MonthlyCategoryTotal.user_id == user_id,
+            MonthlyCategoryTotal.year == year
         )
-        .group_by(extract("month", Transaction.date))
+        .group_by(MonthlyCategoryTotal.month)
         .all()
     )
 
     # Build a lookup from query results
-    month_data = {int(r.month): {"income": float(r.income), "expense": float(r.expense)} for r in results}
+    month_data = {int(r.month): {"income": r.income, "expense": r.expense} for r in results}
 
     # Return all 12 months, filling in zeros for months with no data
     return [
@@ -148,10 +584,10 @@ def get_monthly_breakdown(
 
 
 @router.get("/category-breakdown")
-def get_category_breakdown(
+async def get_category_breakdown(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    month: Optional[int] = Query(None),
+    current_user: CurrentUser = Depends(get_current_user),
+    month: Optional[int] = Query(None, ge=1, le=12),
     year: Optional[int] = Query(None)
 ):
     from datetime import datetime
@@ -161,39 +597,82 @@ def get_category_breakdown(
     if not year:
         year = datetime.now().year
 
+    return await analytics_cache.aget_or_compute(
+        current_user.id, "category-breakdown", {"month": month, "year": year},
+        lambda: run_db(db, _category_breakdown, current_user.id, month, year)
+    )
+
+
+def _category_breakdown(db: Session, user_id: int, month: int, year: int) -> list:
     results = (
         db.query(
             Category.name,
             Category.icon,
             Category.type,
-            func.coalesce(func.sum(Transaction.amount), 0).label("total")
+            func.coalesce(func.sum(MonthlyCategoryTotal.total), 0).label("total")
         )
-        .join(Transaction, Transaction.category_id == Category.id)
+        .join(MonthlyCategoryTotal, MonthlyCategoryTotal.category_id == Category.id)
         .filter(
-            Transaction.user_id == current_user.id,
-            extract("month", Transaction.date) == month,
-            extract("year", Transaction.date) == year
+            MonthlyCategoryTotal.user_id == user_id,
+            MonthlyCategoryTotal.year == year,
+            MonthlyCategoryTotal.month == month
         )
         .group_by(Category.name, Category.icon, Category.type)
         .all()
     )
 
     return [
-        {"name": r.name, "icon": r.icon, "type": r.type, "total": float(r.total)}
+        {"name": r.name, "icon": r.icon, "type": r.type, "total": r.total}
         for r in results
     ]
 
 
+@router.get("/aggregate")
+async def get_aggregate(
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    granularity: Literal["day", "week", "month", "quarter", "year"] = Query("month"),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    group_by: Optional[Literal["category", "type"]] = Query(None)
+):
+    """
+    Income, expense, net and count per day, week, month, quarter or year
+    over any range (default: the last 12 months), optionally split by
+    category or type. Empty buckets come back as zeros, so every series
+    lines up with "buckets" - one request per chart.
+    """
+    end_date = end_date or date.today()
+    start_date = start_date or aggregation.next_bucket(date(end_date.year - 1, end_date.month, 1), "month")
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    if aggregation.bucket_count(start_date, end_date, granularity) > AGGREGATE_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many {granularity} buckets for this range (max {AGGREGATE_MAX_BUCKETS}). Use a coarser granularity.",
+        )
+
+    return await analytics_cache.aget_or_compute(
+        current_user.id, "aggregate",
+        {"granularity": granularity, "start_date": start_date, "end_date": end_date, "group_by": group_by},
+        lambda: run_db(db, aggregation.aggregate, current_user.id, granularity, start_date, end_date, group_by)
+    )
+
+
 @router.put("/{transaction_id}", response_model=TransactionResponse)
-def update_transaction(
+async def update_transaction(
     transaction_id: int,
     data: TransactionUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
+    return await run_db(db, _update_transaction, current_user.id, transaction_id, data)
+
+
+def _update_transaction(db: Session, user_id: int, transaction_id: int, data: TransactionUpdate) -> dict:
     transaction = db.query(Transaction).filter(
         Transaction.id == transaction_id,
-        Transaction.user_id == current_user.id
+        Transaction.user_id == user_id
     ).first()
 
     if not transaction:
@@ -204,40 +683,74 @@ def update_transaction(
     if "category_id" in update_data:
         category = db.query(Category).filter(
             Category.id == update_data["category_id"],
-            Category.user_id == current_user.id
+            Category.user_id == user_id
         ).first()
         if not category:
             raise HTTPException(status_code=404, detail="Category not found")
 
+    # Moving between months or categories shifts the amount between
+    # rollup buckets, so take it out of the old one and add it to the new
+    moves_rollup = any(k in update_data for k in ("amount", "date", "category_id"))
+    if moves_rollup:
+        rollup.record_removed(db, transaction)
     for key, value in update_data.items():
         setattr(transaction, key, value)
+    if moves_rollup:
+        rollup.record_added(db, transaction)
 
+    version = versions.bump(db, user_id)
     db.commit()
+    analytics_cache.bump_version(user_id)
     db.refresh(transaction)
+    event_broker.publish(user_id, "transaction.updated", version, id=transaction_id)
 
     category = db.query(Category).filter(Category.id == transaction.category_id).first()
     return _build_response(transaction, category)
 
 
 @router.delete("/{transaction_id}")
-def delete_transaction(
+async def delete_transaction(
     transaction_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
+    return await run_db(db, _delete_transaction, current_user.id, transaction_id)
+
+
+def _delete_transaction(db: Session, user_id: int, transaction_id: int) -> dict:
     transaction = db.query(Transaction).filter(
         Transaction.id == transaction_id,
-        Transaction.user_id == current_user.id
+        Transaction.user_id == user_id
     ).first()
 
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
 
+    rollup.record_removed(db, transaction)
     db.delete(transaction)
+    version = versions.bump(db, user_id)
     db.commit()
+    analytics_cache.bump_version(user_id)
+    event_broker.publish(user_id, "transaction.deleted", version, id=transaction_id)
     return {"message": "Transaction deleted successfully"}
 
 
+def _apply_filters(query, user_id, category_id, type, start_date, end_date):
+    """The transaction list filters. Works on a Query or a select() joined to Category."""
+    query = query.where(Transaction.user_id == user_id)
+
+    if category_id:
+        query = query.where(Transaction.category_id == category_id)
+    if type:
+        query = query.where(Category.type == type)
+    if start_date:
+        query = query.where(Transaction.date >= start_date)
+    if end_date:
+        query = query.where(Transaction.date <= end_date)
+
+    return query
+
+
 def _build_response(transaction: Transaction, category: Category) -> dict:
     return {
         "id": transaction.id,
@@ -249,4 +762,5 @@ def _build_response(transaction: Transaction, category: Category) -> dict:
         "category_icon": category.icon if category else None,
         "category_type": category.type if category else None,
         "created_at": transaction.created_at
-    }
\ No newline at end of file
+    }
+
@@ -1,11 +1,25 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, PlainSerializer, field_validator
 from datetime import date, datetime
-from typing import Optional
+from datetime import date as date_type
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Annotated, List, Literal, Optional
+from app.config import BATCH_MAX_OPERATIONS, AI_BATCH_MAX_LINES
+
+# Amounts are exact Decimals everywhere in Python and NUMERIC(14,2) in the DB.
+# They still go out as JSON numbers - a 14-digit, 2-place decimal survives
+# float repr exactly, and the frontend keeps getting numbers.
+Money = Annotated[Decimal, PlainSerializer(float, return_type=float, when_used="json")]
+
+CENT = Decimal("0.01")
+
+
+def to_cents(v: Decimal) -> Decimal:
+    return v.quantize(CENT, rounding=ROUND_HALF_UP)
 
 
 
 class TransactionCreate(BaseModel):
-    amount: float
+    amount: Decimal
     description: str
     date: date
     category_id: int
@@ -17,14 +31,14 @@ class TransactionCreate(BaseModel):
             raise ValueError('Amount must be greater than zero')
         if v > 10_000_000:
             raise ValueError('Amount seems unrealistically large')
-        return round(v, 2)
+        return to_cents(v)
 
 
 
 class TransactionUpdate(BaseModel):
-    amount: Optional[float] = None
+    amount: Optional[Decimal] = None
     description: Optional[str] = None
-    date: Optional[date] = None
+    date: Optional[date_type] = None  # `date` alone would resolve to this field
     category_id: Optional[int] = None
 
     @field_validator('amount')
@@ -35,15 +49,15 @@ class TransactionUpdate(BaseModel):
                 raise ValueError('Amount must be greater than zero')
             if v > 10_000_000:
                 raise ValueError('Amount seems unrealistically large')
-            return round(v, 2)
+            return to_cents(v)
         return v
 
 
 
 class TransactionResponse(BaseModel):
     id: int
-    amount: float
-    description: str
+    amount: Money
+    description: Optional[str]  # nullable column; PUT and batch can clear it
     date: date
     category_id: int
     category_name: Optional[str] = None
@@ -55,6 +69,49 @@ class TransactionResponse(BaseModel):
         from_attributes = True
 
 
+class TransactionPage(BaseModel):
+    items: List[TransactionResponse]
+    next_cursor: Optional[str] = None  # None means there are no more rows
+
+
+class ImportRowError(BaseModel):
+    row: int  # line number in CSV/QIF, transaction number in OFX
+    error: str
+
+
+class ImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ImportRowError]  # capped at IMPORT_MAX_ERRORS
+
+
+class BatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[int] = None  # required for update and delete
+    # TransactionCreate fields for create, TransactionUpdate fields for update.
+    # Validated per item, so one bad operation doesn't reject the whole batch.
+    data: Optional[dict] = None
+
+
+class TransactionBatch(BaseModel):
+    operations: List[BatchOperation] = Field(min_length=1, max_length=BATCH_MAX_OPERATIONS)
+    atomic: bool = False  # True: apply nothing unless every operation is valid
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    op: str
+    ok: bool
+    id: Optional[int] = None  # new id for creates
+    error: Optional[str] = None
+
+
+class BatchResult(BaseModel):
+    applied: int
+    failed: int
+    results: List[BatchItemResult]
+
+
 class AITransactionInput(BaseModel):
     text: str
 
@@ -66,4 +123,20 @@ class AITransactionInput(BaseModel):
             raise ValueError('Text too short')
         if len(v) > 500:
             raise ValueError('Text too long, keep it under 500 characters')
-        return v
\ No newline at end of file
+        return v
+
+
+class AIBatchInput(BaseModel):
+    # One transaction per line; blank lines are dropped
+    lines: List[str] = Field(min_length=1, max_length=AI_BATCH_MAX_LINES)
+
+    @field_validator('lines')
+    @classmethod
+    def lines_must_be_reasonable(cls, v):
+        lines = [line.strip() for line in v if line.strip()]
+        if not lines:
+            raise ValueError('No lines to parse')
+        for number, line in enumerate(lines, start=1):
+            if len(line) > 500:
+                raise ValueError(f'Line {number} is too long, keep it under 500 characters')
+        return lines
@@ -0,0 +1,156 @@
+"""
+Transaction totals per time bucket over any date range.
+
+One GROUP BY over the (user_id, date) index range does every bucket at
+once; buckets with no transactions are filled in here, so a chart gets
+aligned series from a single request. Bucket starts are truncated in
+SQL - date_trunc on Postgres, date() modifiers on SQLite - and weeks
+start on Monday in both.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import Date, Integer, cast, func, literal_column, select, type_coerce
+from sqlalchemy.orm import Session
+from app.models.transaction import Transaction
+from app.models.category import Category
+
+GRANULARITIES = ("day", "week", "month", "quarter", "year")
+GROUP_BYS = ("category", "type")
+
+
+def bucket_start(d: date, granularity: str) -> date:
+    if granularity == "day":
+        return d
+    if granularity == "week":
+        return d - timedelta(days=d.weekday())
+    if granularity == "month":
+        return d.replace(day=1)
+    if granularity == "quarter":
+        return d.replace(month=(d.month - 1) // 3 * 3 + 1, day=1)
+    return d.replace(month=1, day=1)
+
+
+def next_bucket(d: date, granularity: str) -> date:
+    if granularity == "day":
+        return d + timedelta(days=1)
+    if granularity == "week":
+        return d + timedelta(days=7)
+    months = {"month": 1, "quarter": 3, "year": 12}[granularity]
+    index = d.year * 12 + d.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def bucket_count(start: date, end: date, granularity: str) -> int:
+    """len(bucket_starts(...)) without building the list - for checking a range up front"""
+    first, last = bucket_start(start, granularity), bucket_start(end, granularity)
+    if granularity == "day":
+        return (last - first).days + 1
+    if granularity == "week":
+        return (last - first).days // 7 + 1
+    months = {"month": 1, "quarter": 3, "year": 12}[granularity]
+    return ((last.year - first.year) * 12 + last.month - first.month) // months + 1
+
+
+def bucket_starts(start: date, end: date, granularity: str) -> list[date]:
+    """Every bucket touching [start, end], in order"""
+    starts, current = [], bucket_start(start, granularity)
+    while current <= end:
+        starts.append(current)
+        current = next_bucket(current, granularity)
+    return starts
+
+
+def bucket_expression(dialect: str, granularity: str):
+    """Transaction.date truncated to its bucket's first day, as a Date. granularity must be one of GRANULARITIES."""
+    column = Transaction.date
+    if dialect == "postgresql":
+        # Inlined rather than bound: with server-side parameters ($1, $2) the
+        # SELECT and GROUP BY copies would otherwise count as different expressions
+        return cast(func.date_trunc(literal_column(f"'{granularity}'"), column), Date)
+
+    # SQLite: date() with modifiers returns 'YYYY-MM-DD' text - type_coerce parses it back into a date
+    if granularity == "day":
+        truncated = func.date(column)
+    elif granularity == "week":
+        # Forward to Sunday (or stay), then back six days: that week's Monday
+        truncated = func.date(column, "weekday 0", "-6 days")
+    elif granularity == "month":
+        truncated = func.date(column, "start of month")
+    elif granularity == "quarter":
+        months_into_quarter = (cast(func.strftime("%m", column), Integer) - 1) % 3
+        truncated = func.date(column, "start of month", func.printf("-%d months", months_into_quarter))
+    else:
+        truncated = func.date(column, "start of year")
+    return type_coerce(truncated, Date)
+
+
+def aggregate(
+    db: Session,
+    user_id: int,
+    granularity: str,
+    start: date,
+    end: date,
+    group_by: Optional[str] = None,
+) -> dict:
+    """
+    Returns the bucket starts plus income / expense / net / count series
+    aligned to them, and with group_by, one series per category or type.
+    """
+    bucket = bucket_expression(db.get_bind().dialect.name, granularity).label("bucket")
+    if group_by == "category":
+        keys = [Category.id, Category.name, Category.icon, Category.type]
+    else:
+        keys = [Category.type]  # needed to split income from expense either way
+
+    rows = db.execute(
+        select(bucket, *keys, func.sum(Transaction.amount), func.count(Transaction.id))
+        .join(Category, Transaction.category_id == Category.id)
+        .where(Transaction.user_id == user_id, Transaction.date >= start, Transaction.date <= end)
+        .group_by(bucket, *keys)
+    ).all()
+
+    starts = bucket_starts(start, end, granularity)
+    position = {s: i for i, s in enumerate(starts)}
+    zero = Decimal("0")
+
+    def series():
+        return {"total": [zero] * len(starts), "count": [0] * len(starts)}
+
+    by_type = {"income": series(), "expense": series()}
+    groups = defaultdict(series)
+    meta = {}
+    for row in rows:
+        i = position[row[0]]
+        *key, total, count = row[1:]
+        kind = key[-1]
+        if kind in by_type:
+            by_type[kind]["total"][i] += total
+            by_type[kind]["count"][i] += count
+        if group_by:
+            group = tuple(key)
+            groups[group]["total"][i] += total
+            groups[group]["count"][i] += count
+            meta[group] = (
+                {"category_id": key[0], "name": key[1], "icon": key[2], "type": key[3]}
+                if group_by == "category" else {"type": kind}
+            )
+
+    income, expense = by_type["income"]["total"], by_type["expense"]["total"]
+    result = {
+        "granularity": granularity,
+        "start_date": start,
+        "end_date": end,
+        "buckets": starts,
+        "income": income,
+        "expense": expense,
+        "net": [i - e for i, e in zip(income, expense)],
+        "count": [i + e for i, e in zip(by_type["income"]["count"], by_type["expense"]["count"])],
+    }
+    if group_by == "type":
+        result["groups"] = [{"type": kind, **values} for kind, values in by_type.items()]
+    elif group_by == "category":
+        ordered = sorted(groups.items(), key=lambda item: sum(item[1]["total"]), reverse=True)
+        result["groups"] = [{**meta[group], **values} for group, values in ordered]
+    return result
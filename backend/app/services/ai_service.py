@@ -1,28 +1,97 @@
-from groq import Groq
-from app.config import GROQ_API_KEY
-from datetime import date, timedelta
+import asyncio
 import json
+import random
+import re
+import time
+from datetime import date
+from typing import Optional, Protocol
+import httpx
+from app.config import (
+    AI_BASE_URL, AI_API_KEY, AI_MODEL, AI_TIMEOUT_SECONDS, AI_MAX_RETRIES,
+    AI_RETRY_BUDGET_SECONDS, AI_CACHE_TTL_SECONDS, AI_CACHE_MAX_ENTRIES,
+    AI_BATCH_TOKEN_BUDGET, AI_BATCH_CONCURRENCY,
+)
+from app.services.cache import LRUTTLCache, MISSING
 
-client = Groq(api_key=GROQ_API_KEY)
+DEFAULT_CATEGORIES = "Food, Transport, Shopping, Salary, Entertainment, Bills, Health, Other"
+SYSTEM_MESSAGE = "You are a JSON-only response bot. Return only valid JSON."
 
 
-def parse_transaction_text(text: str, categories: list[str]) -> dict:
-    """
-    Takes natural language like "spent 500 on groceries yesterday"
-    and returns structured transaction data.
-    
-    We pass the user's existing categories so the AI can 
-    match to one of them instead of inventing new ones.
-    """
-    today = date.today().isoformat()
+class ProviderError(Exception):
+    """Raised by providers. retryable=False for errors a retry won't fix (bad key, bad request)."""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class LLMProvider(Protocol):
+    async def complete(self, messages: list[dict], temperature: float, max_tokens: int, timeout: float) -> str:
+        """Returns the assistant message text"""
+        ...
+
+
+class GroqProvider:
+    def __init__(self, api_key: str, model: str):
+        from groq import AsyncGroq
+
+        # Retries are ours, so they share one budget with the timeouts
+        self.client = AsyncGroq(api_key=api_key, max_retries=0)
+        self.model = model
+
+    async def complete(self, messages: list[dict], temperature: float, max_tokens: int, timeout: float) -> str:
+        import groq
+
+        try:
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=timeout,
+            )
+        except (groq.APITimeoutError, groq.APIConnectionError, groq.RateLimitError, groq.InternalServerError) as e:
+            raise ProviderError(str(e))
+        except groq.APIError as e:
+            raise ProviderError(str(e), retryable=False)
+        return response.choices[0].message.content
+
+
+class OpenAICompatibleProvider:
+    """Any /v1/chat/completions endpoint - Groq's, a local model server, or a fake one in tests"""
+
+    def __init__(self, base_url: str, api_key: str, model: str, client: Optional[httpx.AsyncClient] = None):
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.model = model
+        self.client = client or httpx.AsyncClient()
+
+    async def complete(self, messages: list[dict], temperature: float, max_tokens: int, timeout: float) -> str:
+        try:
+            response = await self.client.post(
+                self.url,
+                headers=self.headers,
+                json={"model": self.model, "messages": messages,
+                      "temperature": temperature, "max_tokens": max_tokens},
+                timeout=timeout,
+            )
+        except httpx.HTTPError as e:
+            raise ProviderError(f"{type(e).__name__}: {e}")
+        if response.status_code == 429 or response.status_code >= 500:
+            raise ProviderError(f"LLM server returned {response.status_code}")
+        if response.status_code >= 400:
+            raise ProviderError(f"LLM server returned {response.status_code}", retryable=False)
+        return response.json()["choices"][0]["message"]["content"]
+
+
+def build_prompt(text: str, categories: list[str], today: str) -> str:
+    return f"""You are a financial transaction parser.
 
-    prompt = f"""You are a financial transaction parser. 
-    
 Today's date is {today}.
 
 The user said: "{text}"
 
-Available categories: {', '.join(categories) if categories else 'Food, Transport, Shopping, Salary, Entertainment, Bills, Health, Other'}
+Available categories: {', '.join(categories) if categories else DEFAULT_CATEGORIES}
 
 Extract the following and return ONLY valid JSON, no other text:
 {{
@@ -42,27 +111,274 @@ Rules:
 - Pick the closest matching category from the available list
 """
 
-    try:
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {"role": "system", "content": "You are a JSON-only response bot. Return only valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1,  # Low temperature = more predictable output
-            max_tokens=200
-        )
-
-        result_text = response.choices[0].message.content.strip()
-
-        # Clean up in case LLM wraps JSON in markdown backticks
-        if result_text.startswith("```"):
-            result_text = result_text.split("```")[1]
-            if result_text.startswith("json"):
-                result_text = result_text[4:]
-            result_text = result_text.strip()
-
-        return json.loads(result_text)
-
-    except Exception as e:
-        return {"error": str(e)}
\ No newline at end of file
+
+def build_batch_prompt(lines: list[str], categories: list[str], today: str) -> str:
+    numbered = "\n".join(f"{i}. {json.dumps(line, ensure_ascii=False)}" for i, line in enumerate(lines, start=1))
+    return f"""You are a financial transaction parser.
+
+Today's date is {today}.
+
+The user wrote these lines, one transaction each:
+{numbered}
+
+Available categories: {', '.join(categories) if categories else DEFAULT_CATEGORIES}
+
+Return ONLY a valid JSON array with one object per line, in the same order, no other text:
+[
+    {{
+        "line": <line number>,
+        "amount": <number>,
+        "description": "<short description>",
+        "category": "<best matching category from the list>",
+        "date": "<YYYY-MM-DD format>",
+        "type": "<income or expense>"
+    }}
+]
+
+Rules:
+- If a line says "yesterday", calculate the actual date from today
+- If a line says "today", use today's date
+- If no date mentioned, use today's date
+- If a line says "earned", "received", "salary", "got paid" — it's income
+- Otherwise assume expense
+- Pick the closest matching category from the available list
+"""
+
+
+# Rough token counts for packing batch prompts - ~4 characters per token
+_PROMPT_OVERHEAD_TOKENS = 250
+_TOKENS_PER_LINE = 12  # numbering and quoting
+_OUTPUT_TOKENS_PER_LINE = 60
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def chunk_by_tokens(lines: list[str], budget: int) -> list[list[int]]:
+    """Indexes of lines, grouped so each group's prompt stays under budget tokens"""
+    chunks, current, used = [], [], _PROMPT_OVERHEAD_TOKENS
+    for index, line in enumerate(lines):
+        cost = estimate_tokens(line) + _TOKENS_PER_LINE
+        if current and used + cost > budget:
+            chunks.append(current)
+            current, used = [], _PROMPT_OVERHEAD_TOKENS
+        current.append(index)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def extract_json(result_text: str):
+    result_text = result_text.strip()
+    # Clean up in case LLM wraps JSON in markdown backticks
+    if result_text.startswith("```"):
+        result_text = result_text.split("```")[1]
+        if result_text.startswith("json"):
+            result_text = result_text[4:]
+        result_text = result_text.strip()
+    return json.loads(result_text)
+
+
+def normalize_text(text: str) -> str:
+    """'  Coffee   4.50 ' and 'coffee 4.50' are the same request"""
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+class TransactionParser:
+    """
+    LLM-backed parsing with a result cache and single-flight dedup.
+
+    Cache key is (normalized text, category set, today) - relative dates
+    like "yesterday" mean a result is only good for the day it was made.
+    Concurrent identical requests share one in-flight LLM call.
+    Failed parses are never cached.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        timeout: float = AI_TIMEOUT_SECONDS,
+        max_retries: int = AI_MAX_RETRIES,
+        retry_budget: float = AI_RETRY_BUDGET_SECONDS,
+        cache: Optional[LRUTTLCache] = None,
+    ):
+        self.provider = provider
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_budget = retry_budget
+        self.cache = cache or LRUTTLCache(max_entries=AI_CACHE_MAX_ENTRIES, ttl_seconds=AI_CACHE_TTL_SECONDS)
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.llm_calls = 0
+
+    def _key(self, text: str, categories: list[str], today: str) -> tuple:
+        return (normalize_text(text), tuple(sorted(set(categories))), today)
+
+    def get_cached(self, text: str, categories: list[str], today: Optional[str] = None) -> Optional[dict]:
+        """A cached result (as a fresh copy), or None - lets callers skip rate limiting on a hit"""
+        value = self.cache.get(self._key(text, categories, today or date.today().isoformat()))
+        if value is MISSING:
+            return None
+        self.hits += 1
+        return dict(value)
+
+    async def parse(self, text: str, categories: list[str], today: Optional[str] = None) -> dict:
+        """Same shape as before: the parsed fields, or {"error": ...}. Always a fresh dict."""
+        today = today or date.today().isoformat()
+        key = self._key(text, categories, today)
+
+        value = self.cache.get(key)
+        if value is not MISSING:
+            self.hits += 1
+            return dict(value)
+
+        if key in self._inflight:
+            self.coalesced += 1
+            return dict(await asyncio.shield(self._inflight[key]))
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._call(text, categories, today)
+            if "error" not in result:
+                self.cache.set(key, result)
+            future.set_result(result)
+        except BaseException as e:
+            # Cancellation of the leader must not strand the followers
+            future.set_result({"error": f"{type(e).__name__}: {e}"})
+            raise
+        finally:
+            del self._inflight[key]
+        return dict(result)
+
+    async def complete(self, prompt: str, max_tokens: int = 200) -> str:
+        """
+        One prompt through the provider, with per-attempt timeouts and
+        jittered backoff. Stops at max_retries or when the retry budget
+        (wall time across all attempts) runs out, whichever comes first.
+        """
+        messages = [
+            {"role": "system", "content": SYSTEM_MESSAGE},
+            {"role": "user", "content": prompt},
+        ]
+        deadline = time.monotonic() + self.retry_budget
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            self.llm_calls += 1
+            try:
+                return await self.provider.complete(
+                    messages,
+                    temperature=0.1,  # Low temperature = more predictable output
+                    max_tokens=max_tokens,
+                    timeout=max(0.1, min(self.timeout, remaining)),
+                )
+            except ProviderError as e:
+                attempt += 1
+                backoff = min(2.0, 0.25 * 2 ** attempt) * random.uniform(0.5, 1.0)
+                if not e.retryable or attempt > self.max_retries or time.monotonic() + backoff >= deadline:
+                    raise
+                await asyncio.sleep(backoff)
+
+    async def _call(self, text: str, categories: list[str], today: str) -> dict:
+        try:
+            return extract_json(await self.complete(build_prompt(text, categories, today)))
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def parse_many(self, texts: list[str], categories: list[str], today: Optional[str] = None) -> list[dict]:
+        """
+        Parses many lines with as few LLM calls as the token budget allows.
+        Cached lines and repeats within the batch are answered once;
+        the rest are packed into prompts that run concurrently.
+        Returns one fresh dict per input, in order.
+        """
+        today = today or date.today().isoformat()
+        results: list[Optional[dict]] = [None] * len(texts)
+        pending: dict[tuple, list[int]] = {}  # cache key -> positions in texts
+
+        for i, text in enumerate(texts):
+            key = self._key(text, categories, today)
+            value = self.cache.get(key)
+            if value is not MISSING:
+                self.hits += 1
+                results[i] = dict(value)
+            else:
+                pending.setdefault(key, []).append(i)
+
+        keys = list(pending)
+        unique = [texts[pending[key][0]] for key in keys]
+        self.misses += len(unique)
+        semaphore = asyncio.Semaphore(AI_BATCH_CONCURRENCY)
+
+        async def run_chunk(indexes: list[int]) -> None:
+            async with semaphore:
+                parsed = await self._call_batch([unique[i] for i in indexes], categories, today)
+            for i, result in zip(indexes, parsed):
+                if "error" not in result:
+                    self.cache.set(keys[i], result)
+                for position in pending[keys[i]]:
+                    results[position] = dict(result)
+
+        await asyncio.gather(*(run_chunk(chunk) for chunk in chunk_by_tokens(unique, AI_BATCH_TOKEN_BUDGET)))
+        return results
+
+    async def _call_batch(self, lines: list[str], categories: list[str], today: str) -> list[dict]:
+        """One result per line; a line the model skipped or mangled gets its own error"""
+        if len(lines) == 1:
+            return [await self._call(lines[0], categories, today)]
+        try:
+            raw = await self.complete(
+                build_batch_prompt(lines, categories, today),
+                max_tokens=_OUTPUT_TOKENS_PER_LINE * len(lines) + 50,
+            )
+            items = extract_json(raw)
+            if not isinstance(items, list):
+                raise ValueError("Expected a JSON array")
+        except Exception as e:
+            return [{"error": str(e)}] * len(lines)
+
+        by_line = {}
+        for item in items:
+            if isinstance(item, dict) and isinstance(item.get("line"), int):
+                by_line[item.pop("line")] = item
+        # Fall back to position if the model left out the line numbers
+        if not by_line and len(items) == len(lines):
+            by_line = {n: item for n, item in enumerate(items, start=1) if isinstance(item, dict)}
+        return [by_line.get(n) or {"error": "No result for this line"} for n in range(1, len(lines) + 1)]
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "llm_calls": self.llm_calls,
+            "inflight": len(self._inflight),
+            "cache_evictions": self.cache.evictions,
+        }
+
+
+def _default_provider() -> LLMProvider:
+    if AI_BASE_URL:
+        return OpenAICompatibleProvider(AI_BASE_URL, AI_API_KEY, AI_MODEL)
+    return GroqProvider(AI_API_KEY, AI_MODEL)
+
+
+# Single instance used across the app; swap .provider to point it elsewhere
+transaction_parser = TransactionParser(_default_provider())
+
+
+async def parse_transaction_text(text: str, categories: list[str]) -> dict:
+    """
+    Takes natural language like "spent 500 on groceries yesterday"
+    and returns structured transaction data.
+
+    We pass the user's existing categories so the AI can
+    match to one of them instead of inventing new ones.
+    """
+    return await transaction_parser.parse(text, categories)
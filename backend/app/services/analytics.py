@@ -0,0 +1,360 @@
+"""
+Multi-year analytics over a user's whole history, vectorized with NumPy.
+
+A user's history is loaded once into a Ledger - parallel arrays of day
+numbers, amounts in cents and category codes, one entry per (day,
+category) the database has already summed - and every metric is a few
+array operations over those columns (bincount, cumsum, least squares)
+instead of a SQL query or a Python loop per month. Nothing here needs
+finer than a day, so the ledger's size is bounded by days x categories
+however many transactions there are. Ledgers are kept per
+(user, analytics_cache version), so all the analytics endpoints share one
+load until the user's data changes.
+
+Money is summed as integer cents and only turned into units for output.
+"""
+import calendar
+from itertools import chain
+from dataclasses import dataclass
+from datetime import date, timedelta
+import numpy as np
+from sqlalchemy import BigInteger, Date, Integer, cast, func, literal, select
+from sqlalchemy.orm import Session
+from app.config import ANALYTICS_LEDGER_CACHE_ENTRIES, CACHE_TTL_SECONDS
+from app.models.transaction import Transaction
+from app.services import reads
+from app.services.cache import LRUTTLCache, MISSING, analytics_cache
+
+_EPOCH = date(1970, 1, 1)
+
+
+@dataclass(slots=True)
+class Ledger:
+    days: np.ndarray       # int64, days since 1970-01-01
+    months: np.ndarray     # int64, months since 1970-01
+    cents: np.ndarray      # int64 day total, positive - direction comes from the category type
+    category: np.ndarray   # int64 index into categories
+    is_income: np.ndarray  # bool per entry
+    categories: list       # reads.CategoryRow, indexed by category code
+
+    def __len__(self) -> int:
+        return len(self.cents)
+
+
+def _day_number(dialect: str):
+    """Transaction.date as days since 1970-01-01, computed by the database"""
+    if dialect == "sqlite":
+        return cast(func.julianday(Transaction.date) - 2440587.5, Integer)
+    return cast(Transaction.date - literal(_EPOCH, Date), Integer)  # date - date is an integer in Postgres
+
+
+def load_ledger(db: Session, user_id: int) -> Ledger:
+    categories = sorted(reads.list_categories(db, user_id), key=lambda c: c.id)
+    # Summed per day and category in the database, and all plain integers -
+    # no date or Decimal objects to build per row
+    rows = db.execute(
+        select(
+            _day_number(db.get_bind().dialect.name),
+            cast(func.sum(cast(func.round(Transaction.amount * 100), BigInteger)), BigInteger),
+            Transaction.category_id,
+        )
+        .where(Transaction.user_id == user_id)
+        .group_by(Transaction.date, Transaction.category_id)
+    ).all()
+    columns = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=3 * len(rows)).reshape(-1, 3)
+
+    days = columns[:, 0]
+    category_ids_sorted = np.array([c.id for c in categories], dtype=np.int64)
+    category = np.searchsorted(category_ids_sorted, columns[:, 2])
+    income_categories = np.array([c.type == "income" for c in categories], dtype=bool)
+
+    return Ledger(
+        days=days,
+        months=days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64),
+        cents=columns[:, 1],
+        category=category,
+        is_income=income_categories[category],
+        categories=categories,
+    )
+
+
+_ledgers = LRUTTLCache(max_entries=ANALYTICS_LEDGER_CACHE_ENTRIES, ttl_seconds=CACHE_TTL_SECONDS)
+
+
+def get_ledger(db: Session, user_id: int) -> Ledger:
+    # Version read before loading, as in ResponseCache._key - a write landing
+    # mid-load leaves this ledger under the old version, never served again
+    key = f"{user_id}:{analytics_cache.get_version(user_id)}"
+    ledger = _ledgers.get(key)
+    if ledger is MISSING:
+        ledger = load_ledger(db, user_id)
+        _ledgers.set(key, ledger)
+    return ledger
+
+
+# --- array helpers ---
+
+def _month_index(d: date) -> int:
+    return (d.year - 1970) * 12 + d.month - 1
+
+
+def _month_label(index: int) -> str:
+    return f"{1970 + index // 12}-{index % 12 + 1:02d}"
+
+
+def _totals(keys: np.ndarray, weights: np.ndarray, mask: np.ndarray, first: int, length: int) -> np.ndarray:
+    """Sum of weights per key in [first, first + length), as int64 cents"""
+    selected = mask & (keys >= first) & (keys < first + length)
+    summed = np.bincount(keys[selected] - first, weights=weights[selected], minlength=length)
+    return np.rint(summed).astype(np.int64)
+
+
+def _income_expense(ledger: Ledger, keys: np.ndarray, first: int, length: int) -> tuple[np.ndarray, np.ndarray]:
+    return (
+        _totals(keys, ledger.cents, ledger.is_income, first, length),
+        _totals(keys, ledger.cents, ~ledger.is_income, first, length),
+    )
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean; NaN until a full window is available"""
+    out = np.full(len(values), np.nan)
+    if window <= len(values):
+        summed = np.cumsum(np.concatenate(([0.0], values)))
+        out[window - 1:] = (summed[window:] - summed[:-window]) / window
+    return out
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """numerator / denominator * 100, NaN where the denominator is 0"""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    out = np.full(np.broadcast(numerator, denominator).shape, np.nan)
+    np.divide(numerator * 100, denominator, out=out, where=denominator != 0)
+    return out
+
+
+def _change(new: np.ndarray, old: np.ndarray) -> np.ndarray:
+    """Percent change, NaN where there's nothing to compare against"""
+    return _ratio(np.asarray(new) - np.asarray(old), old)
+
+
+def _json(values: np.ndarray):
+    """Plain floats (a list for arrays), NaN as None"""
+    if values.ndim == 0:
+        value = values.item()
+        return None if value != value else value
+    return [None if v != v else v for v in values.tolist()]
+
+
+def _money(cents):
+    return _json(np.round(np.asarray(cents, dtype=float) / 100, 2))
+
+
+def _percent(values):
+    return _json(np.round(np.asarray(values, dtype=float), 1))
+
+
+def _slopes(matrix: np.ndarray) -> np.ndarray:
+    """Least-squares slope of each row against 0, 1, 2, ... - one matrix product for all rows"""
+    x = np.arange(matrix.shape[1], dtype=float)
+    x -= x.mean()
+    denominator = x @ x
+    return matrix @ x / denominator if denominator else np.zeros(matrix.shape[0])
+
+
+# --- metrics. Each takes a Ledger and today, and returns JSON-ready data ---
+
+def trends(ledger: Ledger, today: date, months: int = 24, window: int = 3) -> dict:
+    """
+    Monthly income, expense, net and savings rate for the last `months`
+    months (the current one is partial), with trailing `window`-month
+    averages and month-over-month / year-over-year changes.
+    """
+    end = _month_index(today)
+    lead = max(12, window - 1)  # earlier months the averages and YoY need
+    first = end - months + 1 - lead
+    income, expense = _income_expense(ledger, ledger.months, first, months + lead)
+    net = income - expense
+
+    shown = slice(lead, None)
+    previous = slice(lead - 1, -1)
+    year_ago = slice(lead - 12, lead - 12 + months)
+    return {
+        "window": window,
+        "partial_month": _month_label(end),
+        "months": [
+            dict(zip(
+                ("month", "income", "expense", "net", "savings_rate",
+                 "income_avg", "expense_avg", "net_avg",
+                 "income_mom_pct", "expense_mom_pct", "income_yoy_pct", "expense_yoy_pct"),
+                row,
+            ))
+            for row in zip(
+                [_month_label(m) for m in range(end - months + 1, end + 1)],
+                _money(income[shown]), _money(expense[shown]), _money(net[shown]),
+                _percent(_ratio(net[shown], income[shown])),
+                _money(_rolling_mean(income, window)[shown]),
+                _money(_rolling_mean(expense, window)[shown]),
+                _money(_rolling_mean(net, window)[shown]),
+                _percent(_change(income[shown], income[previous])),
+                _percent(_change(expense[shown], expense[previous])),
+                _percent(_change(income[shown], income[year_ago])),
+                _percent(_change(expense[shown], expense[year_ago])),
+            )
+        ],
+    }
+
+
+def daily(ledger: Ledger, today: date, days: int = 90, window: int = 7) -> dict:
+    """Income and expense per day for the last `days` days, with a trailing `window`-day expense average"""
+    end = (today - _EPOCH).days
+    lead = window - 1
+    first = end - days + 1 - lead
+    income, expense = _income_expense(ledger, ledger.days, first, days + lead)
+    start = today - timedelta(days=days - 1)
+    return {
+        "window": window,
+        "days": [
+            {"date": (start + timedelta(days=i)).isoformat(), "income": inc, "expense": exp, "expense_avg": avg}
+            for i, (inc, exp, avg) in enumerate(zip(
+                _money(income[lead:]), _money(expense[lead:]), _money(_rolling_mean(expense, window)[lead:]),
+            ))
+        ],
+    }
+
+
+def category_trends(ledger: Ledger, today: date, months: int = 12) -> dict:
+    """
+    Per category over the last `months` complete months: total, share of
+    its type's total, monthly average and trend (least-squares slope per
+    month), plus the latest month's change on the month and year before.
+    """
+    end = _month_index(today) - 1  # last complete month
+    first = end - months + 1
+    lead = 12
+    count = len(ledger.categories)
+    length = months + lead
+
+    # One bincount over category x month fills the whole matrix
+    keys = ledger.category * length + (ledger.months - (first - lead))
+    in_range = (ledger.months >= first - lead) & (ledger.months <= end)
+    matrix = np.bincount(keys[in_range], weights=ledger.cents[in_range], minlength=count * length)
+    matrix = np.rint(matrix).reshape(count, length)
+
+    window = matrix[:, lead:]
+    totals = window.sum(axis=1)
+    income_categories = np.array([c.type == "income" for c in ledger.categories], dtype=bool)
+    type_totals = np.where(income_categories, totals[income_categories].sum(), totals[~income_categories].sum())
+
+    latest, before, year_ago = matrix[:, -1], matrix[:, -2], matrix[:, -13]
+    columns = {
+        "total": _money(totals),
+        "share_pct": _percent(_ratio(totals, type_totals)),
+        "monthly_avg": _money(totals / months),
+        "trend_per_month": _money(_slopes(window)),
+        "latest_month": _money(latest),
+        "mom_pct": _percent(_change(latest, before)),
+        "yoy_pct": _percent(_change(latest, year_ago)),
+        "series": [_money(row) for row in window],
+    }
+    order = np.argsort(-totals, kind="stable")
+    return {
+        "from": _month_label(first),
+        "to": _month_label(end),
+        "categories": [
+            {
+                "category_id": ledger.categories[i].id,
+                "name": ledger.categories[i].name,
+                "icon": ledger.categories[i].icon,
+                "type": ledger.categories[i].type,
+                **{name: values[i] for name, values in columns.items()},
+            }
+            for i in order.tolist() if totals[i] or matrix[i].any()
+        ],
+    }
+
+
+def savings_rate(ledger: Ledger, today: date, months: int = 12) -> dict:
+    """
+    Share of income kept over the last `months` complete months, against
+    the same stretch just before it, plus the rate month by month.
+    """
+    end = _month_index(today) - 1
+    first = end - months + 1
+    income, expense = _income_expense(ledger, ledger.months, first - months, 2 * months)
+    current, previous = slice(months, None), slice(0, months)
+
+    rate = _ratio(income[current].sum() - expense[current].sum(), income[current].sum())
+    previous_rate = _ratio(income[previous].sum() - expense[previous].sum(), income[previous].sum())
+    monthly = _ratio(income[current] - expense[current], income[current])
+    return {
+        "from": _month_label(first),
+        "to": _month_label(end),
+        "income": _money(income[current].sum()),
+        "expense": _money(expense[current].sum()),
+        "savings_rate": _percent(rate),
+        "previous_savings_rate": _percent(previous_rate),
+        "change_pts": _percent(rate - previous_rate),
+        "average_monthly_rate": _percent(np.nanmean(monthly) if (~np.isnan(monthly)).any() else np.nan),
+        "months": [
+            {"month": _month_label(first + i), "savings_rate": value}
+            for i, value in enumerate(_percent(monthly))
+        ],
+    }
+
+
+def forecast(ledger: Ledger, today: date, months: int = 3, history: int = 12) -> dict:
+    """
+    Linear trend fitted to the last `history` complete months of income
+    and expense (both at once - polyfit takes one column per series),
+    projected `months` ahead with a ~95% band from the fit's residuals.
+    The current month also gets a run-rate projection from its days so far.
+    """
+    current = _month_index(today)
+    available = current - int(ledger.months.min()) if len(ledger) else 0
+    used = min(history, available)
+
+    days_in_month = calendar.monthrange(today.year, today.month)[1]
+    income_now, expense_now = _income_expense(ledger, ledger.months, current, 1)
+    result = {
+        "history_months": used,
+        "current_month": {
+            "month": _month_label(current),
+            "income_to_date": _money(income_now[0]),
+            "expense_to_date": _money(expense_now[0]),
+            "income_run_rate": _money(income_now[0] * days_in_month / today.day),
+            "expense_run_rate": _money(expense_now[0] * days_in_month / today.day),
+        },
+        "months": [],
+    }
+    if used < 2:
+        return result  # not enough complete months to fit a line
+
+    income, expense = _income_expense(ledger, ledger.months, current - used, used)
+    series = np.column_stack((income, expense)).astype(float)
+    x = np.arange(used, dtype=float)
+    coefficients = np.polyfit(x, series, 1)  # row 0: slopes, row 1: intercepts
+    residuals = series - (np.outer(x, coefficients[0]) + coefficients[1])
+    spread = 1.96 * (residuals.std(axis=0, ddof=2) if used > 2 else np.zeros(2))
+
+    ahead = np.arange(used, used + months + 1, dtype=float)  # the current month first
+    predicted = np.maximum(np.outer(ahead, coefficients[0]) + coefficients[1], 0)
+    low = np.maximum(predicted - spread, 0)
+    high = predicted + spread
+
+    result["current_month"]["income_trend"] = _money(predicted[0, 0])
+    result["current_month"]["expense_trend"] = _money(predicted[0, 1])
+    result["months"] = [
+        {
+            "month": _month_label(current + 1 + i),
+            "income": inc, "expense": exp, "net": net,
+            "income_low": inc_low, "income_high": inc_high,
+            "expense_low": exp_low, "expense_high": exp_high,
+        }
+        for i, (inc, exp, net, inc_low, inc_high, exp_low, exp_high) in enumerate(zip(
+            _money(predicted[1:, 0]), _money(predicted[1:, 1]), _money(predicted[1:, 0] - predicted[1:, 1]),
+            _money(low[1:, 0]), _money(high[1:, 0]), _money(low[1:, 1]), _money(high[1:, 1]),
+        ))
+    ]
+    return result
@@ -0,0 +1,231 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+from decimal import Decimal
+import json
+import threading
+import time
+from app.config import CACHE_BACKEND, CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, REDIS_URL
+
+# Returned by backends on a miss, so a cached None/[]/0 still counts as a hit
+MISSING = object()
+
+
+class LRUTTLCache:
+    """
+    Thread-safe in-process cache.
+    Entries expire after ttl_seconds, and once max_entries is reached
+    the least recently used entry is evicted to make room.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl_seconds if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[Any], bool]) -> int:
+        """Drops every entry whose value matches. O(n) - meant for rare invalidations."""
+        with self._lock:
+            keys = [k for k, (_, v) in self._data.items() if predicate(v)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class InMemoryBackend:
+    """
+    Default backend. Fast, but every worker process has its own copy -
+    with several workers, use the Redis backend so a write in one
+    worker invalidates the others.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.values = LRUTTLCache(max_entries, ttl_seconds)
+        # Versions are bounded too (least recently used go first), but a
+        # dropped counter must never come back at a number it had before,
+        # or it could resurrect entries cached under that number. So every
+        # incr takes the next value of one process-wide sequence, and a
+        # key without a counter reads as the sequence value at the last
+        # eviction - a number no entry for it can have been cached under
+        # since it was dropped.
+        self.counters = OrderedDict()
+        self.max_counters = max_entries
+        self._sequence = 0
+        self._floor = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        return self.values.get(key)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.values.set(key, value, ttl)
+
+    def get_counter(self, key: str) -> int:
+        with self.lock:
+            value = self.counters.get(key)
+            if value is None:
+                return self._floor
+            self.counters.move_to_end(key)
+            return value
+
+    def incr(self, key: str) -> int:
+        with self.lock:
+            self._sequence += 1
+            self.counters[key] = self._sequence
+            self.counters.move_to_end(key)
+            while len(self.counters) > self.max_counters:
+                self.counters.popitem(last=False)
+                self._floor = self._sequence
+            return self._sequence
+
+    def evictions(self) -> int:
+        return self.values.evictions
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+class RedisBackend:
+    """
+    Shared backend for multi-worker deployments.
+    Takes any client with the redis-py interface (get/set/incr),
+    so a fake client can be dropped in for local testing.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, key: str) -> Any:
+        raw = self.client.get(key)
+        if raw is None:
+            return MISSING
+        # Cached numbers are money - read them back as Decimal, same as a fresh compute
+        return json.loads(raw, parse_float=Decimal)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.client.set(key, json.dumps(value, default=_json_default), ex=max(1, int(ttl)))
+
+    def get_counter(self, key: str) -> int:
+        raw = self.client.get(key)
+        return int(raw) if raw is not None else 0
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(key))
+
+    def evictions(self) -> int:
+        # Redis evicts on its own (maxmemory-policy) and reports it in INFO
+        try:
+            return int(self.client.info("stats").get("evicted_keys", 0))
+        except Exception:
+            return 0
+
+
+class ResponseCache:
+    """
+    Caches computed responses per (user_id, endpoint, params).
+
+    Every user has a version counter that the write endpoints bump.
+    The version is part of each key, so a bump makes all of that
+    user's old entries unreachable at once - they just age out.
+    """
+
+    def __init__(self, backend, ttl_seconds: float = 300):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    def get_version(self, user_id: int) -> int:
+        return self.backend.get_counter(f"version:{user_id}")
+
+    def bump_version(self, user_id: int) -> int:
+        """Call after committing any change to the user's data."""
+        return self.backend.incr(f"version:{user_id}")
+
+    def _key(self, user_id: int, endpoint: str, params: dict) -> str:
+        # Read the version once, before computing. If a write lands
+        # mid-compute, the result is stored under the old version
+        # and never served again.
+        version = self.get_version(user_id)
+        return f"response:{user_id}:{version}:{endpoint}:{json.dumps(params, sort_keys=True, default=str)}"
+
+    def _lookup(self, key: str) -> Any:
+        value = self.backend.get(key)
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def get_or_compute(self, user_id: int, endpoint: str, params: dict, compute: Callable[[], Any]) -> Any:
+        key = self._key(user_id, endpoint, params)
+        value = self._lookup(key)
+        if value is MISSING:
+            value = compute()
+            self.backend.set(key, value, self.ttl_seconds)
+        return value
+
+    async def aget_or_compute(
+        self, user_id: int, endpoint: str, params: dict, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Same as get_or_compute, for a compute that has to be awaited (e.g. run_db)"""
+        key = self._key(user_id, endpoint, params)
+        value = self._lookup(key)
+        if value is MISSING:
+            value = await compute()
+            self.backend.set(key, value, self.ttl_seconds)
+        return value
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.backend.evictions(),
+        }
+
+
+def _build_backend():
+    if CACHE_BACKEND == "redis":
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis needs the redis package (pip install redis)")
+        return RedisBackend(redis.Redis.from_url(REDIS_URL))
+    return InMemoryBackend(max_entries=CACHE_MAX_ENTRIES, ttl_seconds=CACHE_TTL_SECONDS)
+
+
+# Single instance used across the app
+analytics_cache = ResponseCache(_build_backend(), ttl_seconds=CACHE_TTL_SECONDS)
@@ -0,0 +1,94 @@
+"""
+Conditional GET for the per-user read endpoints.
+
+Every write to a user's transactions or categories bumps their data
+version in the same transaction (services/versions), so (user, version,
+path, query) pins down what a GET returns. The dependencies here turn
+that into a weak ETag and, when the client's If-None-Match already has
+it, answer 304 before the endpoint runs - one primary key lookup, no
+endpoint query, no serialization.
+
+The version is read before the endpoint reads its data. A write landing
+in between gets the newer body tagged with the older version; the next
+request sees the bump and refetches, so a stale body is never confirmed.
+"""
+from datetime import date
+import hashlib
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+from app.auth.auth import get_current_user, CurrentUser
+from app.database import get_db, run_db
+from app.services import versions
+
+# Per-user data, so nothing shared may store it; no-cache makes the browser
+# revalidate every time, which the ETag makes cheap
+CACHE_CONTROL = "private, no-cache"
+
+
+def etag(*parts) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    # Weak: equal data, not promised byte-for-byte equal bodies
+    return f'W/"{digest}"'
+
+
+def _matches(if_none_match: str, tag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    opaque = tag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def check(request: Request, tag: str) -> None:
+    """304s if the client already has tag, otherwise has it sent with the response"""
+    headers = {"ETag": tag, "Cache-Control": CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, tag):
+        raise HTTPException(status_code=304, headers=headers)
+    # Stamped onto the response by ConditionalGetMiddleware - endpoints
+    # that return a Response themselves would drop a Response parameter's headers
+    request.state.cache_headers = headers
+
+
+async def data_version_etag(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> None:
+    """Router dependency: conditional GET keyed on the user's data version. Other methods pass through."""
+    if request.method != "GET":
+        return
+    check(request, etag(
+        current_user.id,
+        await run_db(db, versions.current, current_user.id),
+        # Defaults like "the last 12 months" move with the date
+        date.today().isoformat(),
+        request.url.path,
+        sorted(request.query_params.multi_items()),
+    ))
+
+
+async def user_etag(request: Request, current_user: CurrentUser = Depends(get_current_user)) -> None:
+    """For /me: keyed on the user snapshot itself"""
+    check(request, etag("me", current_user.id, current_user.name, current_user.email))
+
+
+class ConditionalGetMiddleware:
+    """Adds the headers check() left in request.state to successful responses"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                cache_headers = scope.get("state", {}).get("cache_headers")
+                if cache_headers:
+                    headers = list(message.get("headers", []))
+                    headers += [(name.lower().encode(), value.encode()) for name, value in cache_headers.items()]
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,214 @@
+"""
+Per-user change events for the live update stream (/api/events).
+
+The write endpoints publish one event after each commit. Every open
+stream has its own bounded queue; a stream that falls behind has its
+backlog replaced by a single "resync" event, so one stalled client can't
+grow memory and the client still learns it has to refetch.
+
+With EVENTS_BACKEND=postgres, events go out through NOTIFY and come back
+in through LISTEN, so a write on any worker reaches streams on all of
+them. Otherwise delivery stays within this process.
+"""
+import asyncio
+import json
+import logging
+import os
+import queue
+import select
+import threading
+from typing import Optional
+from app.config import CACHE_BACKEND, EVENTS_BACKEND, EVENTS_QUEUE_SIZE, DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "finance_events"
+RESYNC = {"type": "resync"}
+
+
+class Subscription:
+    """One open stream: its user, its queue, and the event loop the queue belongs to"""
+    __slots__ = ("user_id", "queue", "loop")
+
+    def __init__(self, user_id: int, maxsize: int):
+        self.user_id = user_id
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.loop = asyncio.get_running_loop()
+
+
+class EventBroker:
+    """
+    In-process pub/sub keyed by user id. publish() is thread-safe and
+    never blocks - it's called from the sync router helpers, which may
+    be running in the threadpool.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self.fanout: Optional["PostgresFanout"] = None
+        self.published = 0
+        self.dropped = 0
+        self._subscribers = {}  # user_id -> set of Subscription
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> Subscription:
+        """Call from the event loop that will read the queue"""
+        subscription = Subscription(user_id, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[subscription.user_id]
+
+    def connections(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subscribers.values())
+
+    def publish(self, user_id: int, type: str, version: int, **data) -> None:
+        """Call after committing a change to the user's data"""
+        self.published += 1
+        event = {"type": type, "version": version, **data}
+        if self.fanout is not None:
+            # Comes back to this process through LISTEN, like everyone else's
+            self.fanout.send(user_id, event)
+        else:
+            self.deliver(user_id, event)
+
+    def deliver(self, user_id: int, event: dict) -> None:
+        """Hands an event to this process's streams for user_id"""
+        with self._lock:
+            subscriptions = list(self._subscribers.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(self._put, subscription, event)
+            except RuntimeError:
+                pass  # its loop has closed; the stream is going away
+
+    def deliver_to_all(self, event: dict) -> None:
+        with self._lock:
+            user_ids = list(self._subscribers)
+        for user_id in user_ids:
+            self.deliver(user_id, event)
+
+    def _put(self, subscription: Subscription, event: dict) -> None:
+        # Runs on the subscription's loop, so nothing else touches the queue meanwhile
+        try:
+            subscription.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += subscription.queue.qsize()
+            while not subscription.queue.empty():
+                subscription.queue.get_nowait()
+            subscription.queue.put_nowait(RESYNC)
+
+    def start(self) -> None:
+        if EVENTS_BACKEND == "postgres":
+            if not DATABASE_URL.startswith(("postgresql", "postgres")):
+                raise RuntimeError("EVENTS_BACKEND=postgres needs a Postgres DATABASE_URL")
+            # Streams attach totals from the analytics cache; a per-process cache
+            # never hears about another worker's write and would push stale ones
+            if CACHE_BACKEND != "redis":
+                raise RuntimeError("EVENTS_BACKEND=postgres needs CACHE_BACKEND=redis")
+            self.fanout = PostgresFanout(DATABASE_URL, self)
+            self.fanout.start()
+
+    def stop(self) -> None:
+        if self.fanout is not None:
+            self.fanout.stop()
+            self.fanout = None
+
+
+class PostgresFanout:
+    """
+    Relays events between workers with LISTEN/NOTIFY. One background
+    thread owns one dedicated connection (not from the pool): it sends
+    queued NOTIFYs and hands incoming notifications to the broker.
+    Reconnects on failure, then tells every local stream to resync,
+    since anything sent meanwhile was missed.
+    """
+
+    def __init__(self, database_url: str, broker: EventBroker, reconnect_seconds: float = 2):
+        from sqlalchemy.engine import make_url
+        url = make_url(database_url).set(drivername="postgresql")
+        self.dsn = url.render_as_string(hide_password=False)
+        self.broker = broker
+        self.reconnect_seconds = reconnect_seconds
+        self._outbox = queue.SimpleQueue()
+        self._wake_read, self._wake_write = os.pipe()
+        os.set_blocking(self._wake_write, False)
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="events-fanout", daemon=True)
+
+    def send(self, user_id: int, event: dict) -> None:
+        self._outbox.put(json.dumps({"user_id": user_id, "event": event}, default=str))
+        self._wake()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wake()
+        self._thread.join(timeout=5)
+
+    def _wake(self) -> None:
+        try:
+            os.write(self._wake_write, b"\0")
+        except BlockingIOError:
+            pass  # already plenty of wake-ups pending
+
+    def _run(self) -> None:
+        connected_before = False
+        while not self._stopping.is_set():
+            try:
+                self._listen(resync=connected_before)
+            except Exception:
+                logger.exception("Event fan-out connection failed; reconnecting")
+            connected_before = True
+            self._stopping.wait(self.reconnect_seconds)
+
+    def _listen(self, resync: bool) -> None:
+        import psycopg2
+        connection = psycopg2.connect(self.dsn)
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+            if resync:
+                self.broker.deliver_to_all(RESYNC)
+
+            while not self._stopping.is_set():
+                readable, _, _ = select.select([connection, self._wake_read], [], [], 30)
+                if self._wake_read in readable:
+                    os.read(self._wake_read, 4096)
+                self._flush_outbox(connection)
+                connection.poll()  # also notices a dropped connection
+                while connection.notifies:
+                    self._dispatch(connection.notifies.pop(0).payload)
+        finally:
+            connection.close()
+
+    def _flush_outbox(self, connection) -> None:
+        with connection.cursor() as cursor:
+            while True:
+                try:
+                    payload = self._outbox.get_nowait()
+                except queue.Empty:
+                    return
+                cursor.execute("SELECT pg_notify(%s, %s)", (NOTIFY_CHANNEL, payload))
+
+    def _dispatch(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            self.broker.deliver(int(message["user_id"]), message["event"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed event notification: %.200s", payload)
+
+
+# Single instance used across the app
+event_broker = EventBroker(queue_size=EVENTS_QUEUE_SIZE)
@@ -0,0 +1,136 @@
+"""
+Incremental encoders for transaction exports.
+
+Each encoder turns batches of rows into bytes as they arrive, so an
+export can be streamed out without ever holding the full result set.
+Rows are tuples in EXPORT_COLUMNS order.
+"""
+import csv
+import io
+import json
+from decimal import Decimal
+
+EXPORT_COLUMNS = (
+    "id", "date", "amount", "description",
+    "category_id", "category_name", "category_type", "created_at",
+)
+
+
+class CsvEncoder:
+    media_type = "text/csv"
+    extension = "csv"
+
+    def start(self) -> bytes:
+        return self._encode([EXPORT_COLUMNS])
+
+    def batch(self, rows) -> bytes:
+        return self._encode(rows)
+
+    def finish(self) -> bytes:
+        return b""
+
+    def _encode(self, rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+
+class NdjsonEncoder:
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def start(self) -> bytes:
+        return b""
+
+    def batch(self, rows) -> bytes:
+        lines = (json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=_json_default) for row in rows)
+        return ("\n".join(lines) + "\n").encode() if rows else b""
+
+    def finish(self) -> bytes:
+        return b""
+
+
+def _json_default(value):
+    # Amounts stay JSON numbers; NUMERIC(14,2) values round-trip through float repr exactly
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+class _ChunkSink:
+    """File-like object that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.buffer += data
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+class ParquetEncoder:
+    """One Parquet row group per batch. Needs pyarrow."""
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.schema = pa.schema([
+            ("id", pa.int64()),
+            ("date", pa.date32()),
+            ("amount", pa.decimal128(14, 2)),
+            ("description", pa.string()),
+            ("category_id", pa.int64()),
+            ("category_name", pa.string()),
+            ("category_type", pa.string()),
+            ("created_at", pa.timestamp("us", tz="UTC")),
+        ])
+        self.sink = _ChunkSink()
+        self.writer = pq.ParquetWriter(self.sink, self.schema)
+
+    def start(self) -> bytes:
+        return self.sink.drain()
+
+    def batch(self, rows) -> bytes:
+        if rows:
+            columns = list(zip(*rows))
+            arrays = [self.pa.array(values, type=field.type) for values, field in zip(columns, self.schema)]
+            self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+        return self.sink.drain()
+
+    def finish(self) -> bytes:
+        self.writer.close()
+        return self.sink.drain()
+
+
+ENCODERS = {"csv": CsvEncoder, "ndjson": NdjsonEncoder, "parquet": ParquetEncoder}
+
+
+def get_encoder(fmt: str):
+    """Raises ValueError for unknown formats, or parquet without pyarrow installed"""
+    if fmt not in ENCODERS:
+        raise ValueError(f"Unsupported format '{fmt}'. Use one of: {', '.join(ENCODERS)}")
+    try:
+        return ENCODERS[fmt]()
+    except ImportError:
+        raise ValueError("Parquet export needs pyarrow installed on the server")
@@ -0,0 +1,217 @@
+"""
+Streaming parsers for bank exports.
+
+Each parser reads the file incrementally and yields (row_number, row)
+pairs, where row is a dict with raw "date", "amount", "description"
+and "category" values. Nothing here touches the database or validates
+business rules - that happens in the import endpoint.
+"""
+import csv
+import io
+import re
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Iterator, Optional
+
+# Header names banks commonly use, mapped to our field names
+CSV_ALIASES = {
+    "date": "date", "transaction date": "date", "posted date": "date", "booking date": "date",
+    "amount": "amount", "value": "amount", "transaction amount": "amount",
+    "description": "description", "memo": "description", "payee": "description",
+    "details": "description", "narrative": "description", "name": "description",
+    "category": "category", "category_name": "category",
+    "category_id": "category_id",
+}
+
+# Formats that can only be read one way
+DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%d.%m.%Y", "%d-%m-%Y")
+
+# 03/04/2024 is 3 April to most banks and March 4 to US ones, so slash
+# dates are read in a date order: "dmy" or "mdy"
+DATE_ORDERS = ("dmy", "mdy")
+_SLASH_DATE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4}|\d{2})")
+
+# Rows held back waiting for a date that settles the file's order
+MAX_UNSETTLED_ROWS = 1000
+
+
+def _slash_readings(value: str) -> Optional[dict]:
+    """{order: date} for every order a slash date is valid in, or None if it isn't a slash date"""
+    match = _SLASH_DATE.fullmatch(value)
+    if not match:
+        return None
+    first, second, year = match.groups()
+    year_format = "%Y" if len(year) == 4 else "%y"
+    readings = {}
+    for order, (day, month) in (("dmy", (first, second)), ("mdy", (second, first))):
+        try:
+            readings[order] = datetime.strptime(f"{day}/{month}/{year}", f"%d/%m/{year_format}").date()
+        except ValueError:
+            continue
+    return readings
+
+
+def date_order(value: str) -> Optional[str]:
+    """
+    The order a date has to be read in: "dmy" or "mdy", "either" when
+    both readings are valid and differ, None when the order doesn't matter.
+    """
+    readings = _slash_readings(value.strip())
+    if not readings:
+        return None
+    if len(readings) == 1:
+        return next(iter(readings))
+    return "either" if len(set(readings.values())) == 2 else None
+
+
+def parse_date(value: str, order: Optional[str] = None) -> date:
+    value = value.strip()
+    readings = _slash_readings(value)
+    if readings is not None:
+        if order is not None:
+            readings = {order: readings[order]} if order in readings else {}
+        if len(set(readings.values())) == 1:
+            return next(iter(readings.values()))
+        if readings:
+            raise ValueError(f"Ambiguous date '{value}' - could be day/month or month/day")
+        raise ValueError(f"Unrecognized date '{value}'")
+
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date '{value}'")
+
+
+def with_date_order(rows: Iterator[tuple[int, dict]], order: Optional[str]) -> Iterator[tuple[int, dict, Optional[str]]]:
+    """
+    Adds the date order to each (row_number, row). Without one, it comes
+    from the file: rows whose date reads both ways are held back until a
+    date that reads only one way settles it. A file that never settles
+    it is rejected, rather than guessing.
+    """
+    unsettled = []
+    for row_number, row in rows:
+        if order is None:
+            seen = date_order(row.get("date") or "")
+            if seen == "either":
+                unsettled.append((row_number, row))
+                if len(unsettled) > MAX_UNSETTLED_ROWS:
+                    break
+                continue
+            if seen is not None:
+                order = seen
+                for held_number, held_row in unsettled:
+                    yield held_number, held_row, order
+                unsettled = []
+        yield row_number, row, order
+
+    if unsettled:
+        raise ValueError(
+            f"Can't tell whether dates like '{unsettled[0][1]['date'].strip()}' are day/month or month/day - "
+            "pass date_order (dmy or mdy)"
+        )
+
+
+def parse_amount(value: str) -> Decimal:
+    """Handles currency symbols, thousands separators and (123.45) negatives"""
+    cleaned = re.sub(r"[^\d.,()\-+]", "", value.strip())
+    negative = cleaned.startswith("(") and cleaned.endswith(")")
+    cleaned = cleaned.strip("()").replace(",", "")
+    if not cleaned:
+        raise ValueError(f"Unrecognized amount '{value}'")
+    try:
+        amount = Decimal(cleaned)
+    except InvalidOperation:
+        raise ValueError(f"Unrecognized amount '{value}'")
+    return -amount if negative else amount
+
+
+def _text(stream: BinaryIO) -> io.TextIOWrapper:
+    # utf-8-sig drops the BOM that spreadsheet exports like to add
+    return io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline="")
+
+
+def iter_csv(stream: BinaryIO) -> Iterator[tuple[int, dict]]:
+    reader = csv.reader(_text(stream))
+    header = next(reader, None)
+    if header is None:
+        return
+    fields = [CSV_ALIASES.get(h.strip().lower()) for h in header]
+    if "date" not in fields or "amount" not in fields:
+        raise ValueError("CSV needs at least 'date' and 'amount' columns")
+
+    for row_number, values in enumerate(reader, start=2):
+        if not any(v.strip() for v in values):
+            continue
+        yield row_number, {f: v for f, v in zip(fields, values) if f}
+
+
+def iter_qif(stream: BinaryIO) -> Iterator[tuple[int, dict]]:
+    """QIF: one field per line (D=date, T=amount, P=payee, M=memo, L=category), '^' ends a record"""
+    record, start_line = {}, None
+    for line_number, line in enumerate(_text(stream), start=1):
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("!"):
+            continue
+        code, value = line[0], line[1:].strip()
+        if code == "^":
+            if record:
+                yield start_line, record
+            record, start_line = {}, None
+            continue
+        start_line = start_line or line_number
+        if code == "D":
+            # QIF dates look like 12/31'24 or 12/31/2024 - month first, see import_transactions
+            record["date"] = value.replace("'", "/").replace(" ", "0")
+        elif code in ("T", "U"):
+            record["amount"] = value
+        elif code == "P":
+            record["description"] = value
+        elif code == "M":
+            record.setdefault("description", value)
+        elif code == "L":
+            record["category"] = value
+    if record:
+        yield start_line, record
+
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def iter_ofx(stream: BinaryIO) -> Iterator[tuple[int, dict]]:
+    """
+    OFX 1.x (SGML, unclosed tags) and 2.x (XML) statements.
+    Yields one row per <STMTTRN>, numbered by its position in the file.
+    """
+    record, count = None, 0
+    for line in _text(stream):
+        for closing, tag, value in _OFX_TAG.findall(line):
+            tag, value = tag.upper(), value.strip()
+            if tag == "STMTTRN":
+                if closing and record is not None:
+                    count += 1
+                    yield count, record
+                    record = None
+                elif not closing:
+                    record = {}
+            elif record is not None and not closing and value:
+                if tag == "DTPOSTED":
+                    record["date"] = f"{value[0:4]}-{value[4:6]}-{value[6:8]}"
+                elif tag == "TRNAMT":
+                    record["amount"] = value
+                elif tag == "NAME":
+                    record["description"] = value
+                elif tag == "MEMO":
+                    record.setdefault("description", value)
+
+
+PARSERS = {"csv": iter_csv, "qif": iter_qif, "ofx": iter_ofx, "qfx": iter_ofx}
+
+
+def detect_format(filename: Optional[str], explicit: Optional[str]) -> str:
+    fmt = (explicit or (filename or "").rsplit(".", 1)[-1]).lower()
+    if fmt not in PARSERS:
+        raise ValueError(f"Unsupported format '{fmt}'. Use one of: csv, qif, ofx")
+    return fmt
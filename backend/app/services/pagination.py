@@ -0,0 +1,39 @@
+import base64
+from datetime import date
+
+
+def encode_cursor(last_date: date, last_id: int) -> str:
+    """
+    Builds an opaque continuation token from the last row of a page.
+    Clients just pass it back - they shouldn't rely on what's inside.
+    """
+    raw = f"{last_date.isoformat()}|{last_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[date, int]:
+    """Reverses encode_cursor. Raises ValueError on a malformed token."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        last_date, last_id = raw.split("|")
+        return date.fromisoformat(last_date), int(last_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def encode_ranked_cursor(rank: float, last_date: date, last_id: int) -> str:
+    """encode_cursor for search results, which are ordered by rank first"""
+    raw = f"{rank!r}|{last_date.isoformat()}|{last_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_ranked_cursor(cursor: str) -> tuple[float, date, int]:
+    """Reverses encode_ranked_cursor. Raises ValueError on a malformed token."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        rank, last_date, last_id = raw.split("|")
+        return float(rank), date.fromisoformat(last_date), int(last_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
@@ -0,0 +1,95 @@
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.services.metrics import Histogram
+from app.services.request_metrics import record_pool_wait
+
+
+class PoolMetrics:
+    """Connection pool counters shared by every engine the app builds"""
+
+    def __init__(self):
+        self.wait_time = Histogram()
+        self.checkouts = 0
+        self.overflow_checkouts = 0  # checkouts that needed a connection beyond pool_size
+        self.timeouts = 0  # gave up after pool_timeout - the "QueuePool limit" errors
+        self.connects = 0
+        self.invalidations = 0  # dropped connections, e.g. failed pre-ping after a DB restart
+        self.engines = []
+        self._lock = threading.Lock()
+
+    def _record_checkout(self, pool, waited: float) -> None:
+        self.wait_time.observe(waited)
+        record_pool_wait(waited)
+        with self._lock:
+            self.checkouts += 1
+            if pool.checkedout() > pool.size():
+                self.overflow_checkouts += 1
+
+    def _record_timeout(self, waited: float) -> None:
+        self.wait_time.observe(waited)
+        record_pool_wait(waited)
+        with self._lock:
+            self.timeouts += 1
+
+    def instrument(self, engine) -> None:
+        """Attach connect/invalidate listeners to a (sync) engine and report its pool"""
+        self.engines.append(engine)
+
+        @event.listens_for(engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            with self._lock:
+                self.connects += 1
+
+        @event.listens_for(engine, "invalidate")
+        def _on_invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.invalidations += 1
+
+    def stats(self) -> dict:
+        pools = []
+        for engine in self.engines:
+            pool = engine.pool
+            pools.append({
+                "url": engine.url.render_as_string(hide_password=True),
+                "class": type(pool).__name__,
+                "size": pool.size() if hasattr(pool, "size") else None,
+                "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+                "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            })
+        return {
+            "pools": pools,
+            "checkouts": self.checkouts,
+            "overflow_checkouts": self.overflow_checkouts,
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "wait_seconds": self.wait_time.snapshot(),
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class _TimedCheckout:
+    # Pool events fire only once a connection is in hand, so the wait
+    # itself is measured by wrapping the pool's checkout hook
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics._record_timeout(time.perf_counter() - start)
+            raise
+        pool_metrics._record_checkout(self, time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
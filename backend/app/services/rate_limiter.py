@@ -1,61 +1,244 @@
-from datetime import datetime, timedelta
-from collections import defaultdict
+"""
+Daily AI credit limits, with swappable storage.
+
+Usage is counted per (user, UTC day) window. Two policies read those
+counters differently:
+
+- "daily": fixed window, everyone resets at midnight UTC.
+- "sliding": rolling 24 hours, estimated as yesterday's count weighted
+  by how much of it still falls inside the window, plus today's.
+
+Backends only store window counters, so every policy works on each:
+in-process memory, Redis (shared, atomic via Lua) or the app database
+(shared and restart-safe without extra infrastructure).
+"""
+from datetime import datetime, timezone
 import threading
+import time
+from starlette.concurrency import run_in_threadpool
+from app.config import RATE_LIMIT_BACKEND, RATE_LIMIT_POLICY, AI_DAILY_LIMIT, REDIS_URL
+from app.models.ai_usage_window import AIUsageWindow
+
+WINDOW_SECONDS = 86_400
+
+
+class MemoryBackend:
+    """
+    Per-process counters. Fine for one worker; with several, each has
+    its own counts and the effective limit multiplies.
+    Writes take a lock; reads don't - a dict lookup is atomic.
+    """
+    blocking = False
+
+    def __init__(self):
+        self.counts: dict[tuple[int, int], int] = {}
+        self.lock = threading.Lock()
+        self._swept_window = None
+
+    def consume(self, user_id: int, window: int, cost: int, limit: int, previous_weight: float) -> tuple[bool, float]:
+        with self.lock:
+            if window != self._swept_window:
+                self._sweep(window)
+            current = self.counts.get((user_id, window), 0)
+            used = self.counts.get((user_id, window - 1), 0) * previous_weight + current
+            if used + cost > limit:
+                return False, used
+            self.counts[(user_id, window)] = current + cost
+            return True, used + cost
+
+    def peek(self, user_id: int, window: int) -> tuple[int, int]:
+        return self.counts.get((user_id, window), 0), self.counts.get((user_id, window - 1), 0)
+
+    def _sweep(self, window: int) -> None:
+        # Only today and yesterday are ever read - drop everything older
+        for key in [k for k in self.counts if k[1] < window - 1]:
+            del self.counts[key]
+        self._swept_window = window
+
+
+# KEYS: current window, previous window. ARGV: cost, limit, previous weight, ttl
+_CONSUME_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local used = previous * tonumber(ARGV[3]) + current
+if used + tonumber(ARGV[1]) > tonumber(ARGV[2]) then
+    return {0, tostring(used)}
+end
+redis.call('INCRBY', KEYS[1], ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return {1, tostring(used + tonumber(ARGV[1]))}
+"""
+
+
+class RedisBackend:
+    """
+    Shared across workers and restarts. Check-and-increment runs as one
+    Lua script, so concurrent requests can't both take the last credit.
+    Takes any client with the redis-py interface.
+    """
+    blocking = False  # same trade-off as the analytics cache: one fast round trip
+
+    def __init__(self, client, prefix: str = "ratelimit:ai"):
+        self.client = client
+        self.prefix = prefix
+        self.script = client.register_script(_CONSUME_SCRIPT)
+
+    def _keys(self, user_id: int, window: int) -> list[str]:
+        return [f"{self.prefix}:{user_id}:{window}", f"{self.prefix}:{user_id}:{window - 1}"]
+
+    def consume(self, user_id: int, window: int, cost: int, limit: int, previous_weight: float) -> tuple[bool, float]:
+        allowed, used = self.script(
+            keys=self._keys(user_id, window),
+            args=[cost, limit, previous_weight, 2 * WINDOW_SECONDS],
+        )
+        return bool(int(allowed)), float(used)
+
+    def peek(self, user_id: int, window: int) -> tuple[int, int]:
+        current, previous = self.client.mget(self._keys(user_id, window))
+        return int(current or 0), int(previous or 0)
+
+
+class DatabaseBackend:
+    """
+    Counters in the ai_usage_windows table, for deployments with
+    several workers but no Redis. One conditional upsert per check:
+    the row only changes if the credits fit, so it's atomic without
+    an explicit lock.
+    """
+    blocking = True
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+
+    def consume(self, user_id: int, window: int, cost: int, limit: int, previous_weight: float) -> tuple[bool, float]:
+        table = AIUsageWindow.__table__
+        db = self.session_factory()
+        try:
+            dialect = db.get_bind().dialect.name
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as upsert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as upsert
+
+            previous = db.query(AIUsageWindow.count).filter_by(user_id=user_id, day=window - 1).scalar() or 0
+            # Credits this window may still take before the check fails
+            room = limit - previous * previous_weight - cost
+            if room < 0:
+                current = db.query(AIUsageWindow.count).filter_by(user_id=user_id, day=window).scalar() or 0
+                return False, previous * previous_weight + current
+
+            stmt = upsert(table).values(user_id=user_id, day=window, count=cost)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_id", "day"],
+                set_={"count": table.c.count + cost},
+                where=table.c.count <= room,
+            ).returning(table.c.count)
+            count = db.execute(stmt).scalar()
+            db.commit()
+            if count is None:
+                current = db.query(AIUsageWindow.count).filter_by(user_id=user_id, day=window).scalar() or 0
+                return False, previous * previous_weight + current
+            return True, previous * previous_weight + count
+        finally:
+            db.close()
+
+    def peek(self, user_id: int, window: int) -> tuple[int, int]:
+        db = self.session_factory()
+        try:
+            rows = dict(
+                db.query(AIUsageWindow.day, AIUsageWindow.count)
+                .filter(AIUsageWindow.user_id == user_id, AIUsageWindow.day.in_([window, window - 1]))
+                .all()
+            )
+            return rows.get(window, 0), rows.get(window - 1, 0)
+        finally:
+            db.close()
 
 
 class RateLimiter:
     """
-    Simple in-memory rate limiter.
-    Tracks usage per user_id with a daily limit.
-    Resets at midnight UTC.
+    Tracks AI usage per user_id against a daily limit.
+    Storage is pluggable (see module docstring); backends that block
+    on I/O run in the threadpool.
     """
 
-    def __init__(self, daily_limit: int = 20):
+    def __init__(self, backend, daily_limit: int = 20, policy: str = "daily"):
+        if policy not in ("daily", "sliding"):
+            raise ValueError(f"Unknown rate limit policy '{policy}'. Use 'daily' or 'sliding'.")
+        self.backend = backend
         self.daily_limit = daily_limit
-        self.usage = defaultdict(lambda: {"count": 0, "reset_date": None})
-        self.lock = threading.Lock()
+        self.policy = policy
 
-    def _get_today(self):
-        return datetime.utcnow().date()
+    def _now(self) -> float:
+        return time.time()
 
-    def check_and_increment(self, user_id: int) -> dict:
-        """
-        Returns {"allowed": True/False, "remaining": int, "resets_at": str}
-        """
-        with self.lock:
-            today = self._get_today()
-            user_data = self.usage[user_id]
+    def _window(self, now: float) -> tuple[int, float]:
+        """(window index, weight of the previous window's count)"""
+        window, into = divmod(now, WINDOW_SECONDS)
+        weight = 1 - into / WINDOW_SECONDS if self.policy == "sliding" else 0.0
+        return int(window), weight
 
-            # Reset if it's a new day
-            if user_data["reset_date"] != today:
-                user_data["count"] = 0
-                user_data["reset_date"] = today
+    async def _call(self, fn, *args):
+        if self.backend.blocking:
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
 
-            if user_data["count"] >= self.daily_limit:
-                tomorrow = datetime.combine(today + timedelta(days=1), datetime.min.time())
-                return {
-                    "allowed": False,
-                    "remaining": 0,
-                    "resets_at": tomorrow.isoformat() + "Z",
-                }
+    def _resets_at(self, now: float, window: int, current: int, previous: int, cost: int) -> str:
+        """When a request of this cost would next fit"""
+        next_window = (window + 1) * WINDOW_SECONDS
+        at = next_window
+        if self.policy == "sliding":
+            room = self.daily_limit - cost - current
+            if room >= 0 and previous:
+                # previous * (1 - t/W) + current + cost <= limit  =>  t >= W * (1 - room/previous)
+                at = window * WINDOW_SECONDS + WINDOW_SECONDS * (1 - room / previous)
+            elif current:
+                # Not today - wait for today's count to decay as tomorrow's "previous"
+                at = next_window + WINDOW_SECONDS * max(0.0, 1 - (self.daily_limit - cost) / current)
+        stamp = datetime.fromtimestamp(max(at, now), tz=timezone.utc).replace(tzinfo=None)
+        return stamp.isoformat(timespec="seconds") + "Z"
 
-            user_data["count"] += 1
-            remaining = self.daily_limit - user_data["count"]
+    async def check_and_increment(self, user_id: int, cost: int = 1) -> dict:
+        """
+        Uses up cost credits at once, or none if fewer are left.
+        Returns {"allowed": True/False, "remaining": int, "resets_at": str}
+        """
+        now = self._now()
+        window, weight = self._window(now)
+        allowed, used = await self._call(self.backend.consume, user_id, window, cost, self.daily_limit, weight)
+        remaining = max(0, int(self.daily_limit - used))
 
+        if not allowed:
+            current, previous = await self._call(self.backend.peek, user_id, window)
             return {
-                "allowed": True,
+                "allowed": False,
                 "remaining": remaining,
-                "resets_at": None,
+                "resets_at": self._resets_at(now, window, current, previous, cost),
             }
+        return {"allowed": True, "remaining": remaining, "resets_at": None}
 
-    def get_remaining(self, user_id: int) -> int:
-        with self.lock:
-            today = self._get_today()
-            user_data = self.usage[user_id]
-            if user_data["reset_date"] != today:
-                return self.daily_limit
-            return max(0, self.daily_limit - user_data["count"])
+    async def get_remaining(self, user_id: int) -> int:
+        """Read-only - never takes the write path, so polling /usage doesn't contend with parses"""
+        window, weight = self._window(self._now())
+        current, previous = await self._call(self.backend.peek, user_id, window)
+        return max(0, int(self.daily_limit - (previous * weight + current)))
+
+    def stats(self) -> dict:
+        return {"backend": type(self.backend).__name__, "policy": self.policy, "daily_limit": self.daily_limit}
+
+
+def _build_backend():
+    if RATE_LIMIT_BACKEND == "redis":
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis needs the redis package (pip install redis)")
+        return RedisBackend(redis.Redis.from_url(REDIS_URL))
+    if RATE_LIMIT_BACKEND == "database":
+        from app.database import SessionLocal
+        return DatabaseBackend(SessionLocal)
+    return MemoryBackend()
 
 
 # Single instance used across the app
-ai_rate_limiter = RateLimiter(daily_limit=20)
\ No newline at end of file
+ai_rate_limiter = RateLimiter(_build_backend(), daily_limit=AI_DAILY_LIMIT, policy=RATE_LIMIT_POLICY)
@@ -0,0 +1,67 @@
+"""
+Read-only queries for the hot list endpoints.
+
+They select only the columns a response needs and return small
+__slots__ dataclasses instead of ORM entities: no identity map, no
+attribute instrumentation, nothing for the unit of work to track.
+orjson serializes the dataclasses as they are. Anything that writes
+still goes through the models.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.transaction import Transaction
+from app.models.category import Category
+
+
+@dataclass(slots=True)
+class TransactionRow:
+    """Same fields, in the same order, as TransactionResponse"""
+    id: int
+    amount: Decimal
+    description: Optional[str]
+    date: date
+    category_id: int
+    category_name: str
+    category_icon: Optional[str]
+    category_type: str
+    created_at: Optional[datetime]
+
+
+@dataclass(slots=True)
+class CategoryRow:
+    """Same fields, in the same order, as CategoryResponse"""
+    id: int
+    name: str
+    type: str
+    icon: Optional[str]
+    created_at: Optional[datetime]
+
+
+def transaction_select():
+    """TransactionRow's columns, with the category JOINed in (no N+1). Add filters and ordering, then fetch."""
+    return select(
+        Transaction.id,
+        Transaction.amount,
+        Transaction.description,
+        Transaction.date,
+        Transaction.category_id,
+        Category.name,
+        Category.icon,
+        Category.type,
+        Transaction.created_at,
+    ).join(Category, Transaction.category_id == Category.id)
+
+
+def fetch_transactions(db: Session, query) -> list[TransactionRow]:
+    return [TransactionRow(*row) for row in db.execute(query)]
+
+
+def list_categories(db: Session, user_id: int) -> list[CategoryRow]:
+    query = select(Category.id, Category.name, Category.type, Category.icon, Category.created_at).where(
+        Category.user_id == user_id
+    )
+    return [CategoryRow(*row) for row in db.execute(query)]
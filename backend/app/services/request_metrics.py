@@ -0,0 +1,232 @@
+"""
+Per-request performance numbers: latency, SQL statements, DB time and
+pool waits, broken down by route.
+
+The middleware opens a RequestStats for each request and parks it in a
+contextvar. SQLAlchemy cursor events and the pool checkout hook add to
+whatever stats are current - contextvars follow the request into
+run_in_threadpool and AsyncSession.run_sync, so that works in both DB
+modes. Everything is rendered as Prometheus text by render_prometheus.
+"""
+from contextvars import ContextVar
+from typing import Optional
+import logging
+import threading
+import time
+from sqlalchemy import event
+from app.config import SERVER_TIMING, SLOW_QUERY_MS
+from app.services.metrics import Histogram
+
+logger = logging.getLogger("app.slow_query")
+
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class RequestStats:
+    __slots__ = ("scope", "queries", "db_seconds", "pool_wait_seconds")
+
+    def __init__(self, scope: dict):
+        self.scope = scope  # routing fills in scope["route"] once it has matched
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class _RouteMetrics:
+    __slots__ = ("latency", "db_time", "queries", "statuses")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.db_time = Histogram()
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.statuses: dict[int, int] = {}
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.routes: dict[tuple[str, str], _RouteMetrics] = {}
+        self.query_time = Histogram()
+        self.slow_queries = 0
+        self._lock = threading.Lock()
+
+    def record_request(self, method: str, route: str, status: int, elapsed: float, stats: RequestStats) -> None:
+        key = (method, route)
+        metrics = self.routes.get(key)
+        if metrics is None:
+            with self._lock:
+                metrics = self.routes.setdefault(key, _RouteMetrics())
+        metrics.latency.observe(elapsed)
+        metrics.db_time.observe(stats.db_seconds)
+        metrics.queries.observe(stats.queries)
+        with self._lock:
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def record_query(self, elapsed: float, statement: str) -> None:
+        self.query_time.observe(elapsed)
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+        if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+            with self._lock:
+                self.slow_queries += 1
+            # Statement only - parameters can hold user data
+            logger.warning(
+                "slow query %.1fms route=%s: %s",
+                elapsed * 1000, _route_of(stats.scope) if stats else None, " ".join(statement.split())[:1000],
+            )
+
+    def instrument(self, engine) -> None:
+        """Attach cursor timing to a (sync) engine"""
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            self.record_query(time.perf_counter() - conn.info["query_start"].pop(), statement)
+
+        @event.listens_for(engine, "handle_error")
+        def _error(exception_context):
+            # A failed statement never reaches after_cursor_execute
+            conn = exception_context.connection
+            if conn is not None and conn.info.get("query_start"):
+                conn.info["query_start"].pop()
+
+
+request_metrics = RequestMetrics()
+
+
+def _route_of(scope: dict) -> str:
+    # Template, not the raw path - /api/transactions/{transaction_id}, not one series per id
+    return getattr(scope.get("route"), "path", "unmatched")
+
+
+def record_pool_wait(waited: float) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.pool_wait_seconds += waited
+
+
+def _server_timing(stats: RequestStats, elapsed: float) -> bytes:
+    return (
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries", '
+        f"pool;dur={stats.pool_wait_seconds * 1000:.1f}, "
+        f"app;dur={elapsed * 1000:.1f}"
+    ).encode()
+
+
+class RequestMetricsMiddleware:
+    """
+    Plain ASGI middleware (BaseHTTPMiddleware would buffer streaming
+    responses and run the app in a separate task, losing the contextvar).
+    Server-Timing is added when SERVER_TIMING is on; for streamed
+    responses it covers the work done before the first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if SERVER_TIMING:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(stats, time.perf_counter() - start)))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            request_metrics.record_request(
+                scope["method"], _route_of(scope), status, time.perf_counter() - start, stats,
+            )
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def _histogram(lines: list, name: str, snapshot: dict, **labels) -> None:
+    base = _labels(**labels)
+    for bound, count in snapshot["buckets"].items():
+        le = f'le="{bound}"'
+        lines.append(f"{name}_bucket{{{base + ',' + le if base else le}}} {count}")
+    suffix = f"{{{base}}}" if base else ""
+    lines.append(f"{name}_sum{suffix} {snapshot['sum']}")
+    lines.append(f"{name}_count{suffix} {snapshot['count']}")
+
+
+def render_prometheus() -> str:
+    """Prometheus text exposition format, version 0.0.4"""
+    from app.services.pool_metrics import pool_metrics
+    from app.services.cache import analytics_cache
+
+    lines = []
+    routes = sorted(request_metrics.routes.items())
+
+    lines += ["# HELP http_requests_total Requests handled, by route and status",
+              "# TYPE http_requests_total counter"]
+    for (method, route), metrics in routes:
+        for status, count in sorted(dict(metrics.statuses).items()):
+            lines.append(f"http_requests_total{{{_labels(method=method, route=route, status=status)}}} {count}")
+
+    for name, attr, help_text in (
+        ("http_request_duration_seconds", "latency", "Request latency"),
+        ("http_request_db_seconds", "db_time", "Time spent in SQL statements per request"),
+        ("http_request_queries", "queries", "SQL statements issued per request"),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for (method, route), metrics in routes:
+            _histogram(lines, name, getattr(metrics, attr).snapshot(), method=method, route=route)
+
+    lines += ["# HELP db_query_duration_seconds Duration of individual SQL statements",
+              "# TYPE db_query_duration_seconds histogram"]
+    _histogram(lines, "db_query_duration_seconds", request_metrics.query_time.snapshot())
+    lines += ["# HELP db_slow_queries_total Statements slower than SLOW_QUERY_MS",
+              "# TYPE db_slow_queries_total counter",
+              f"db_slow_queries_total {request_metrics.slow_queries}"]
+
+    pool = pool_metrics.stats()
+    lines += ["# HELP db_pool_wait_seconds Time spent waiting for a pooled connection",
+              "# TYPE db_pool_wait_seconds histogram"]
+    _histogram(lines, "db_pool_wait_seconds", pool["wait_seconds"])
+    for name, key, help_text in (
+        ("db_pool_checkouts_total", "checkouts", "Connections checked out of the pool"),
+        ("db_pool_overflow_checkouts_total", "overflow_checkouts", "Checkouts beyond pool_size"),
+        ("db_pool_timeouts_total", "timeouts", "Checkouts that gave up after pool_timeout"),
+        ("db_pool_invalidations_total", "invalidations", "Connections dropped as dead"),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter", f"{name} {pool[key]}"]
+    lines += ["# HELP db_pool_checked_out Connections currently checked out", "# TYPE db_pool_checked_out gauge"]
+    for entry in pool["pools"]:
+        if entry["checked_out"] is not None:
+            lines.append(f"db_pool_checked_out{{{_labels(pool=entry['url'])}}} {entry['checked_out']}")
+
+    cache = analytics_cache.stats()
+    lines += ["# HELP analytics_cache_requests_total Analytics cache lookups",
+              "# TYPE analytics_cache_requests_total counter",
+              f'analytics_cache_requests_total{{result="hit"}} {cache["hits"]}',
+              f'analytics_cache_requests_total{{result="miss"}} {cache["misses"]}']
+
+    return "\n".join(lines) + "\n"
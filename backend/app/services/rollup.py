@@ -0,0 +1,175 @@
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import Integer, case, cast, extract, func, insert, delete
+from sqlalchemy.orm import Session
+from app.models.transaction import Transaction
+from app.models.category import Category
+from app.models.monthly_category_total import MonthlyCategoryTotal
+
+
+def apply_delta(
+    db: Session,
+    user_id: int,
+    category_id: int,
+    on_date: date,
+    amount: Decimal,
+    count: int,
+) -> None:
+    """
+    Adds amount/count to one (user, month, category) bucket.
+    Runs on the caller's session, so it commits or rolls back
+    together with the transaction write that caused it.
+    """
+    key = {
+        "user_id": user_id,
+        "year": on_date.year,
+        "month": on_date.month,
+        "category_id": category_id,
+    }
+    table = MonthlyCategoryTotal.__table__
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+
+        stmt = upsert(table).values(**key, total=amount, count=count)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key),
+            set_={
+                "total": table.c.total + stmt.excluded.total,
+                "count": table.c.count + stmt.excluded.count,
+            },
+        )
+        db.execute(stmt)
+    else:
+        row = db.get(MonthlyCategoryTotal, key, with_for_update=True)
+        if row:
+            row.total += amount
+            row.count += count
+        else:
+            db.add(MonthlyCategoryTotal(**key, total=amount, count=count))
+        db.flush()
+
+    # Drop buckets that no longer have any transactions in them
+    if count < 0:
+        db.execute(
+            delete(MonthlyCategoryTotal).filter_by(**key).where(MonthlyCategoryTotal.count <= 0)
+        )
+
+
+def record_added(db: Session, transaction: Transaction) -> None:
+    apply_delta(db, transaction.user_id, transaction.category_id, transaction.date, transaction.amount, 1)
+
+
+def record_removed(db: Session, transaction: Transaction) -> None:
+    apply_delta(db, transaction.user_id, transaction.category_id, transaction.date, -transaction.amount, -1)
+
+
+def new_deltas() -> defaultdict:
+    """Accumulator for apply_deltas: (category_id, year, month) -> [total, count]"""
+    return defaultdict(lambda: [Decimal(0), 0])
+
+
+def add_to_deltas(deltas: defaultdict, category_id: int, on_date: date, amount: Decimal, count: int) -> None:
+    bucket = deltas[(category_id, on_date.year, on_date.month)]
+    bucket[0] += amount
+    bucket[1] += count
+
+
+def apply_deltas(db: Session, user_id: int, deltas: defaultdict) -> None:
+    """
+    Applies changes collected from many rows with one upsert per
+    touched bucket, rather than one per row. Used by bulk writes.
+    """
+    for (category_id, year, month), (total, count) in deltas.items():
+        if count or total:
+            apply_delta(db, user_id, category_id, date(year, month, 1), total, count)
+
+
+def rebuild(db: Session, user_id: Optional[int] = None) -> None:
+    """
+    Recomputes the rollup from the transactions table.
+    Pass user_id to repair one account, or None for everyone.
+    Does not commit - the caller decides.
+    """
+    year = cast(extract("year", Transaction.date), Integer)
+    month = cast(extract("month", Transaction.date), Integer)
+
+    source = db.query(
+        Transaction.user_id,
+        year,
+        month,
+        Transaction.category_id,
+        func.sum(Transaction.amount),
+        func.count(Transaction.id),
+    )
+    clear = delete(MonthlyCategoryTotal)
+
+    if user_id is not None:
+        source = source.filter(Transaction.user_id == user_id)
+        clear = clear.where(MonthlyCategoryTotal.user_id == user_id)
+
+    source = source.group_by(Transaction.user_id, year, month, Transaction.category_id)
+
+    db.execute(clear)
+    db.execute(
+        insert(MonthlyCategoryTotal).from_select(
+            ["user_id", "year", "month", "category_id", "total", "count"],
+            source.statement,
+        )
+    )
+
+
+def summary(db: Session, user_id: int, month: Optional[int], year: Optional[int]) -> dict:
+    """
+    Income, expense and balance for a month, or all time without one.
+    Reads the rollup - at most (months x categories) rows, no matter
+    how many transactions the user has.
+    """
+    query = db.query(
+        func.coalesce(func.sum(
+            case((Category.type == "income", MonthlyCategoryTotal.total), else_=0)
+        ), 0).label("total_income"),
+        func.coalesce(func.sum(
+            case((Category.type == "expense", MonthlyCategoryTotal.total), else_=0)
+        ), 0).label("total_expense"),
+    ).join(Category, MonthlyCategoryTotal.category_id == Category.id).filter(
+        MonthlyCategoryTotal.user_id == user_id
+    )
+
+    if month and year:
+        query = query.filter(
+            MonthlyCategoryTotal.year == year,
+            MonthlyCategoryTotal.month == month
+        )
+
+    result = query.one()
+
+    return {
+        "total_income": result.total_income,
+        "total_expense": result.total_expense,
+        "balance": result.total_income - result.total_expense
+    }
+
+
+if __name__ == "__main__":
+    # python -m app.services.rollup [--user-id N]
+    import argparse
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild the monthly_category_totals rollup")
+    parser.add_argument("--user-id", type=int, default=None, help="only rebuild this user")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rebuild(db, args.user_id)
+        db.commit()
+        print("Rollup rebuilt" + (f" for user {args.user_id}" if args.user_id else ""))
+    finally:
+        db.close()
@@ -0,0 +1,258 @@
+"""
+Deterministic parser for the easy cases of parse-transaction.
+
+Inputs like "spent 500 on groceries yesterday" don't need an LLM: an
+amount, a relative date, a keyword or two and a category name cover
+most of what users type. This answers those in microseconds and says
+how sure it is, so the caller can fall back to the LLM when it isn't.
+"""
+import difflib
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from datetime import date, timedelta
+from typing import Optional
+
+INCOME_WORDS = {
+    "earned", "earn", "received", "receive", "salary", "income", "refund", "refunded",
+    "bonus", "credited", "dividend", "dividends", "interest", "freelance", "stipend", "cashback",
+    "sold", "reimbursed", "reimbursement", "allowance", "wage", "wages",
+}
+# "paid" and "got" alone are ambiguous ("paid rent", "got pizza") - only these phrases mean income
+INCOME_PHRASES = ("got paid", "was paid", "paid me", "got my salary", "got salary")
+EXPENSE_WORDS = {
+    "spent", "spend", "paid", "pay", "bought", "buy", "purchased", "cost", "costs",
+    "ordered", "bill", "fee", "fees", "rent", "subscription",
+}
+
+
+@lru_cache(maxsize=4096)
+def _bigrams(word: str) -> frozenset:
+    return frozenset(word[i:i + 2] for i in range(len(word) - 1))
+
+
+def _singular(word: str) -> str:
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+# Common words for the default categories, so "uber 300" finds Transport
+CATEGORY_HINTS = {
+    "food": {"food", "grocery", "groceries", "lunch", "dinner", "breakfast", "coffee", "tea", "snack",
+             "snacks", "restaurant", "pizza", "burger", "swiggy", "zomato", "meal", "cafe", "drinks"},
+    "transport": {"uber", "ola", "taxi", "cab", "bus", "metro", "train", "fuel", "petrol", "diesel",
+                  "gas", "parking", "auto", "rickshaw", "flight", "toll"},
+    "shopping": {"shopping", "clothes", "shoes", "amazon", "flipkart", "shirt", "jeans", "gadget", "mall"},
+    "salary": {"salary", "paycheck", "wage", "wages", "stipend"},
+    "entertainment": {"movie", "movies", "netflix", "spotify", "concert", "game", "games", "cinema", "party"},
+    "bills": {"bill", "bills", "electricity", "water", "internet", "wifi", "phone", "mobile", "recharge",
+              "rent", "subscription", "emi", "insurance"},
+    "health": {"doctor", "medicine", "medicines", "pharmacy", "hospital", "gym", "dentist", "clinic", "health"},
+}
+
+_HINT_STEMS = {name: {_singular(h) for h in hints} for name, hints in CATEGORY_HINTS.items()}
+
+FILLER_WORDS = {
+    "i", "me", "my", "on", "for", "at", "in", "to", "from", "the", "a", "an", "of", "and", "with",
+    "rs", "inr", "usd", "eur", "rupees", "dollars", "bucks", "today", "yesterday", "ago", "day", "days",
+    "before", "last", "this", "morning", "evening", "night", "tonight", "just", "some", "got", "was",
+}
+
+_NOT_CATEGORY_WORDS = FILLER_WORDS | INCOME_WORDS | EXPENSE_WORDS
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+_AMOUNT = re.compile(
+    r"(?<![\w./-])(?:(?:rs\.?|inr|usd|eur|[₹$€£])\s*)?"
+    r"(\d{1,3}(?:,\d{2,3})+(?:\.\d+)?|\d+(?:\.\d+)?)"
+    r"\s*(k|lakh|lakhs)?(?:\s*(?:rs|inr|rupees|dollars|bucks|usd|eur)\b)?(?![\w/-])",
+    re.IGNORECASE,
+)
+_ISO_DATE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+_DAYS_AGO = re.compile(r"\b(\d+|a|one|two|three|four|five|six|seven)\s+days?\s+ago\b", re.IGNORECASE)
+_WORD = re.compile(r"[a-z]+")
+
+# "N days ago" further back than this isn't a date we trust - leave the input to the LLM
+MAX_DAYS_AGO = 3650
+_NUMBER_WORDS = {"a": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7}
+_MULTIPLIERS = {"k": 1_000, "lakh": 100_000, "lakhs": 100_000}
+
+
+@dataclass(slots=True)
+class RuleParse:
+    amount: Optional[float]
+    description: str
+    category: Optional[str]
+    date: str
+    type: str
+    confidence: float
+
+    def as_result(self) -> dict:
+        return {
+            "amount": self.amount,
+            "description": self.description,
+            "category": self.category,
+            "date": self.date,
+            "type": self.type,
+        }
+
+
+def _find_amount(text: str) -> tuple[Optional[float], int, Optional[tuple[int, int]]]:
+    """(amount, candidates seen, span of the chosen one)"""
+    candidates = []
+    for m in _AMOUNT.finditer(text):
+        value = float(m.group(1).replace(",", ""))
+        if m.group(2):
+            value *= _MULTIPLIERS[m.group(2).lower()]
+        # A currency marker makes this the amount even if other numbers are around
+        marked = m.group(0).strip() != m.group(1) + (m.group(2) or "")
+        candidates.append((marked, value, m.span()))
+    if not candidates:
+        return None, 0, None
+    marked = [c for c in candidates if c[0]]
+    chosen = marked[0] if len(marked) == 1 else candidates[0]
+    return round(chosen[1], 2), len(candidates) if len(marked) != 1 else 1, chosen[2]
+
+
+def _find_date(lowered: str, today: date) -> tuple[Optional[date], list[str]]:
+    """(date, words used to express it). None: a date was given, but not one we can use."""
+    m = _ISO_DATE.search(lowered)
+    if m:
+        try:
+            return date(int(m.group(1)), int(m.group(2)), int(m.group(3))), []
+        except ValueError:
+            # e.g. 2026-13-45 - a date was meant, just not a valid one
+            return None, []
+    if "day before yesterday" in lowered:
+        return today - timedelta(days=2), []
+    m = _DAYS_AGO.search(lowered)
+    if m:
+        n = m.group(1)
+        days = int(n) if n.isdigit() else _NUMBER_WORDS[n]
+        if days > MAX_DAYS_AGO:
+            return None, []
+        return today - timedelta(days=days), []
+    if "yesterday" in lowered or "last night" in lowered:
+        return today - timedelta(days=1), []
+    for index, name in enumerate(WEEKDAYS):
+        if re.search(rf"\b{name}\b", lowered):
+            # Most recent past occurrence; "last monday" on a Monday means a week ago
+            back = (today.weekday() - index) % 7 or 7
+            return today - timedelta(days=back), [name]
+    return today, []
+
+
+def _find_type(lowered: str, words: set[str]) -> tuple[str, bool]:
+    """(type, whether a keyword decided it)"""
+    if any(phrase in lowered for phrase in INCOME_PHRASES):
+        return "income", True
+    income = words & INCOME_WORDS
+    expense = words & EXPENSE_WORDS
+    if income and not expense:
+        return "income", True
+    if expense and not income:
+        return "expense", True
+    return "expense", not income  # no keywords at all: expense, like the LLM prompt says
+
+
+def _match_category(
+    words: list[str], categories: list[tuple[str, Optional[str]]], kind: str
+) -> tuple[Optional[str], float]:
+    """(category name, match quality 0-1). Only categories of the right type are considered."""
+    eligible = [(name, ctype) for name, ctype in categories if ctype in (None, kind)] or categories
+    if not eligible:
+        return None, 0.0
+    stems = {_singular(w) for w in words}
+
+    # 1. The category's own name appears in the text, or 2. a known hint word
+    # for a category with a standard name does. "hospital bill" points at both
+    # Health and Bills - that's for the LLM to settle.
+    named, hinted = [], []
+    for name, _ in eligible:
+        name_words = {_singular(w) for w in _WORD.findall(name.lower())}
+        if name_words and name_words <= stems:
+            named.append(name)
+        elif stems & _HINT_STEMS.get(name.lower(), set()):
+            hinted.append(name)
+    if named or hinted:
+        if len(named) + len(hinted) > 1:
+            return (named or hinted)[0], 0.3
+        return (named or hinted)[0], 1.0 if named else 0.9
+
+    # 3. Close spelling ("grocries", "restuarant")
+    candidates = [(w, _bigrams(w)) for w in stems if len(w) >= 4 and w not in _NOT_CATEGORY_WORDS]
+    best, best_ratio = None, 0.0
+    matcher = difflib.SequenceMatcher()
+    for name, _ in eligible:
+        for target in {name.lower()} | CATEGORY_HINTS.get(name.lower(), set()):
+            target_grams = _bigrams(target)
+            for word, grams in candidates:
+                # Shared letter pairs are a cheap filter - most pairs never reach difflib
+                if 4 * len(grams & target_grams) < len(grams) + len(target_grams):
+                    continue
+                matcher.set_seqs(word, target)
+                ratio = matcher.ratio()
+                if ratio > best_ratio:
+                    best, best_ratio = name, ratio
+    if best_ratio >= 0.8:
+        return best, 0.75
+    return None, 0.0
+
+
+def _describe(text: str, amount_span: Optional[tuple[int, int]], skip: set[str]) -> str:
+    if amount_span:
+        text = text[:amount_span[0]] + " " + text[amount_span[1]:]
+    text = _ISO_DATE.sub(" ", text)
+    kept = [
+        w for w in re.findall(r"[A-Za-z][A-Za-z'&-]*", text)
+        if w.lower() not in FILLER_WORDS and w.lower() not in skip
+    ]
+    return " ".join(kept)[:100].strip().capitalize()
+
+
+def parse(
+    text: str,
+    categories: list[tuple[str, Optional[str]]],
+    today: Optional[date] = None,
+) -> RuleParse:
+    """
+    categories are (name, type) pairs; type may be None if unknown.
+    Confidence is 0 without an amount or with a date too far back, and
+    drops for ambiguous amounts, guessed types and weak or missing
+    category matches.
+    """
+    today = today or date.today()
+    lowered = text.lower()
+    word_list = _WORD.findall(lowered)
+    words = set(word_list)
+
+    # "3 days ago" is not an amount - blank it out, keeping offsets intact
+    amount, candidates, amount_span = _find_amount(_DAYS_AGO.sub(lambda m: " " * len(m.group(0)), text))
+    on_date, date_words = _find_date(lowered, today)
+    date_ok = on_date is not None
+    on_date = on_date or today
+    kind, kind_decided = _find_type(lowered, words)
+    category, match = _match_category(word_list, categories, kind)
+
+    skip = (INCOME_WORDS | EXPENSE_WORDS | set(date_words)) - set(CATEGORY_HINTS.get((category or "").lower(), ()))
+    description = _describe(text, amount_span, skip) or (category or "")
+
+    if amount is None or amount <= 0 or not date_ok:
+        confidence = 0.0
+    else:
+        confidence = 1.0
+        if candidates > 1:
+            confidence -= 0.4
+        if not kind_decided:
+            confidence -= 0.3
+        confidence -= (1.0 - match) * 0.5
+        if not description:
+            confidence -= 0.2
+
+    return RuleParse(
+        amount=amount,
+        description=description,
+        category=category,
+        date=on_date.isoformat(),
+        type=kind,
+        confidence=round(max(confidence, 0.0), 2),
+    )
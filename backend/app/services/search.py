@@ -0,0 +1,85 @@
+"""
+Search over transaction descriptions, served by an index on both databases.
+
+Postgres: a tsvector match (every word, each as a prefix) OR a pg_trgm
+match - substring via ILIKE, misspellings via word similarity - each
+backed by a GIN index, so the planner ORs bitmap index scans instead of
+reading every row. Ranked by ts_rank plus word similarity.
+
+SQLite: the transactions_fts FTS5 table (every word, each as a prefix),
+ranked by bm25. No fuzzy matching - it's there so local runs and tests
+behave like production for the common case. bm25 depends on the whole
+table, so it's only good for ordering a single response, not for a
+page cursor (see rank_is_stable).
+
+The indexes and the FTS5 table come from the migration, and from the
+DDL in app.models.transaction for create_all().
+"""
+import re
+from typing import Optional
+from sqlalchemy import Double, cast, column, func, literal, literal_column, select, table
+from app.models.transaction import Transaction
+
+MAX_TERMS = 8
+# ILIKE below this many characters can't use the trigram index
+MIN_SUBSTRING_LENGTH = 3
+
+_WORD = re.compile(r"[^\W_]+")  # letters and digits
+_fts = table("transactions_fts", column("rowid"))
+
+
+def normalize(q: Optional[str]) -> Optional[str]:
+    """The search text to use, or None if q has nothing to search for (no letters or digits)"""
+    if not q or not _WORD.search(q):
+        return None
+    return q.strip()[:200]
+
+
+def _terms(q: str) -> list[str]:
+    return _WORD.findall(q.lower())[:MAX_TERMS]
+
+
+def rank_is_stable(dialect: str) -> bool:
+    """
+    Whether a row's rank depends only on the row and q, so a page cursor
+    can seek past it. bm25 shifts whenever any row is written (term and
+    length statistics cover the whole FTS table), which would repeat or
+    skip rows between pages.
+    """
+    return dialect == "postgresql"
+
+
+def match(dialect: str, q: str):
+    """
+    (condition, rank) for a normalized q: add the condition to a
+    transaction query's WHERE, order by rank descending.
+    """
+    terms = _terms(q)
+    if dialect == "postgresql":
+        # Same expression, inlined, as ix_transactions_description_fts - a bound
+        # 'simple' wouldn't match the index
+        vector = func.to_tsvector(
+            literal_column("'simple'"), func.coalesce(Transaction.description, literal_column("''"))
+        )
+        # Letters and digits only, so nothing in here is tsquery syntax
+        query = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{t}:*" for t in terms))
+        conditions = vector.op("@@")(query) | literal(q).op("<%")(Transaction.description)
+        if len(q) >= MIN_SUBSTRING_LENGTH:
+            conditions = conditions | Transaction.description.icontains(q, autoescape=True)
+        # real -> double precision, so the value a client gets back in a cursor compares exactly
+        rank = cast(
+            func.ts_rank(vector, query) + func.word_similarity(q, func.coalesce(Transaction.description, "")),
+            Double,
+        )
+        return conditions, rank
+
+    fts_query = " ".join(f'"{t}"*' for t in terms)
+    matched = literal_column("transactions_fts").op("MATCH")(fts_query)
+    condition = Transaction.id.in_(select(_fts.c.rowid).where(matched))
+    # bm25 is lower-is-better; negated so both dialects sort rank descending
+    rank = (
+        select(-func.bm25(literal_column("transactions_fts")))
+        .where(_fts.c.rowid == Transaction.id, matched)
+        .scalar_subquery()
+    )
+    return condition, rank
@@ -0,0 +1,27 @@
+"""
+The per-user data version behind the conditional GETs (services/conditional)
+and the versions on live update events (/api/events).
+
+It lives in users.data_version and is bumped inside the write's own
+transaction, so it's shared by every worker, survives restarts and only
+moves if the write commits. analytics_cache's version can't be used
+for this: with the memory backend it's per process and starts over on
+restart, so a version could come around again for different data and
+a 304 would confirm a stale body.
+"""
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.models.user import User
+
+
+def bump(db: Session, user_id: int) -> int:
+    """Call before committing a change to the user's transactions or categories; returns the new version"""
+    # Also row-locks the user until commit, so one user's writes take turns
+    return db.execute(
+        update(User).where(User.id == user_id).values(data_version=User.data_version + 1).returning(User.data_version),
+        execution_options={"synchronize_session": False},
+    ).scalar_one()
+
+
+def current(db: Session, user_id: int) -> int:
+    return db.scalar(select(User.data_version).where(User.id == user_id)) or 0
@@ -0,0 +1,219 @@
+"""
+API load test: latency percentiles and throughput per scenario.
+
+By default it runs the app in-process on a throwaway SQLite database
+that it seeds first (see benchmarks.seed), with the AI provider pointed
+at benchmarks.fake_llm. With --base-url it targets a running server
+instead, which must already be seeded and, for the AI scenarios, started
+with AI_BASE_URL at a fake_llm instance and a high AI_DAILY_LIMIT.
+
+Writes one JSON report; pass an earlier report as --baseline to get
+the change per scenario.
+
+    cd backend
+    python -m benchmarks.api_load --output before.json
+    python -m benchmarks.api_load --baseline before.json --scenarios summary,transactions
+    python -m benchmarks.api_load --base-url http://localhost:8000 --users 100 --duration 30
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date
+
+from benchmarks.common import percentiles, run_info
+from benchmarks.seed import BENCH_EMAIL, BENCH_PASSWORD
+
+TODAY = date.today()
+
+
+def _no_digits(n: int) -> str:
+    # Unique text the rule parser can't answer (no amount), so each request reaches the LLM
+    return "".join("abcdefghij"[int(d)] for d in str(n))
+
+
+# name -> (method, path, request kwargs for the n-th request)
+SCENARIOS = {
+    "transactions": lambda n: ("GET", "/api/transactions/", {"params": {"limit": 50, "offset": 50 * (n % 10)}}),
+    "transactions_range": lambda n: ("GET", "/api/transactions/", {"params": {
+        "start_date": date(TODAY.year - 1, 1 + n % 12, 1).isoformat(), "end_date": TODAY.isoformat(),
+    }}),
+    "summary": lambda n: ("GET", "/api/transactions/summary", {"params": {"month": 1 + n % 12, "year": TODAY.year}}),
+    "monthly_breakdown": lambda n: ("GET", "/api/transactions/monthly-breakdown",
+                                    {"params": {"year": TODAY.year - n % 3}}),
+    "category_breakdown": lambda n: ("GET", "/api/transactions/category-breakdown",
+                                     {"params": {"month": 1 + n % 12, "year": TODAY.year}}),
+    "login": None,  # needs the user's credentials, built in _request
+    "ai_parse_rules": lambda n: ("POST", "/api/ai/parse-transaction", {"json": {"text": f"spent {100 + n % 900} on groceries"}}),
+    "ai_parse_llm": lambda n: ("POST", "/api/ai/parse-transaction",
+                               {"json": {"text": f"the usual thing at the corner place {_no_digits(n)}"}}),
+}
+
+
+def _request(scenario: str, n: int, user: int, token: str) -> tuple[str, str, dict]:
+    if scenario == "login":
+        return "POST", "/api/auth/login", {"json": {"email": BENCH_EMAIL.format(user), "password": BENCH_PASSWORD}}
+    method, path, kwargs = SCENARIOS[scenario](n)
+    return method, path, {**kwargs, "headers": {"Authorization": f"Bearer {token}"}}
+
+
+async def run_scenario(client, scenario: str, tokens: list[str], concurrency: int, duration: float, limit: int) -> dict:
+    counter = itertools.count()
+    latencies, statuses = [], Counter()
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            n = next(counter)
+            if limit and n >= limit:
+                return
+            user = n % len(tokens)
+            method, path, kwargs = _request(scenario, n, user, tokens[user])
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                statuses[str(response.status_code)] += 1
+            except Exception as e:  # keep going - a failed request is a data point too
+                statuses[type(e).__name__] += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    completed = sum(statuses.values())
+    ok = statuses.get("200", 0)
+    return {
+        "requests": completed,
+        "errors": completed - ok,
+        "statuses": dict(statuses),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(completed / elapsed, 2) if elapsed else None,
+        "latency_ms": {**percentiles(latencies, 1e3), "max": round(max(latencies) * 1e3, 3)} if latencies else None,
+    }
+
+
+async def _login_all(client, users: int) -> list[str]:
+    async def login(user):
+        response = await client.post("/api/auth/login", json={"email": BENCH_EMAIL.format(user), "password": BENCH_PASSWORD})
+        if response.status_code != 200:
+            raise SystemExit(f"Login failed for {BENCH_EMAIL.format(user)}: {response.status_code} {response.text[:200]}")
+        return response.json()["access_token"]
+
+    tokens = []
+    for start in range(0, users, 16):
+        tokens += await asyncio.gather(*(login(u) for u in range(start, min(users, start + 16))))
+    return tokens
+
+
+def compare(report: dict, baseline: dict) -> dict:
+    """Relative change per scenario; negative latency and positive throughput are improvements"""
+    def change(new, old):
+        return round((new - old) / old * 100, 1) if new is not None and old else None
+
+    result = {"baseline_commit": baseline.get("run", {}).get("commit")}
+    for name, current in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or not current["latency_ms"] or not before.get("latency_ms"):
+            continue
+        result[name] = {
+            f"{p}_change_pct": change(current["latency_ms"][p], before["latency_ms"][p]) for p in ("p50", "p95", "p99")
+        }
+        result[name]["throughput_change_pct"] = change(current["throughput_rps"], before["throughput_rps"])
+    return result
+
+
+async def main(args) -> dict:
+    import httpx
+
+    scenarios = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}. Choose from: {', '.join(SCENARIOS)}")
+
+    report = {"run": run_info(), "config": {
+        "target": args.base_url or "in-process",
+        "users": args.users,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "requests_per_scenario": args.requests,
+    }}
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60,
+                                   limits=httpx.Limits(max_connections=args.concurrency))
+    else:
+        from benchmarks.seed import seed
+        from benchmarks.fake_llm import create_app
+        from app.main import app
+        from app.database import DB_ASYNC
+        from app.services.ai_service import transaction_parser, OpenAICompatibleProvider
+
+        print("Seeding...", file=sys.stderr)
+        report["dataset"] = seed(args.users, args.categories, args.transactions)
+        report["config"].update({"database": report["dataset"]["database"], "db_async": DB_ASYNC,
+                                 "llm_latency_ms": args.llm_latency_ms})
+        fake_llm = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app(args.llm_latency_ms / 1000)))
+        transaction_parser.provider = OpenAICompatibleProvider("http://fake-llm/v1", "", "fake", client=fake_llm)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    report["scenarios"] = {}
+    async with client:
+        tokens = await _login_all(client, args.users)
+        for scenario in scenarios:
+            print(f"Running {scenario}...", file=sys.stderr)
+            # A few untimed requests first, so connection set-up and cold caches don't skew the run
+            await run_scenario(client, scenario, tokens, min(args.concurrency, 4), 60, 4 * min(args.concurrency, 4))
+            report["scenarios"][scenario] = await run_scenario(
+                client, scenario, tokens, args.concurrency, args.duration, args.requests,
+            )
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["compare"] = compare(report, json.load(f))
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the API and report latency percentiles")
+    parser.add_argument("--base-url", help="target a running server instead of the in-process app")
+    parser.add_argument("--scenarios", help=f"comma separated, default all: {','.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per scenario")
+    parser.add_argument("--requests", type=int, default=0, help="stop a scenario after this many requests (0: no cap)")
+    parser.add_argument("--users", type=int, default=5, help="seeded users to spread requests over")
+    parser.add_argument("--categories", type=int, default=8, help="in-process only: categories per user")
+    parser.add_argument("--transactions", type=int, default=20_000, help="in-process only: transactions per user")
+    parser.add_argument("--llm-latency-ms", type=float, default=300, help="in-process only: fake LLM delay")
+    parser.add_argument("--no-analytics-cache", action="store_true",
+                        help="in-process only: time the analytics queries rather than cache hits")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--output", help="write the report here instead of stdout")
+    args = parser.parse_args()
+
+    if not args.base_url:
+        os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='api-bench-')}/bench.db")
+        os.environ.setdefault("SECRET_KEY", "benchmark")
+        # Measure the endpoints, not the limits in front of them
+        os.environ.setdefault("AI_DAILY_LIMIT", str(10**9))
+        os.environ.setdefault("BCRYPT_ROUNDS", "10")
+        if args.no_analytics_cache:
+            os.environ["CACHE_TTL_SECONDS"] = "0"
+
+    try:
+        report = asyncio.run(main(args))
+    finally:
+        if not args.base_url:
+            from app.auth.hashing import password_hasher
+            password_hasher.shutdown()
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
@@ -0,0 +1,28 @@
+"""Helpers shared by the benchmark scripts"""
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+def percentiles(samples: list[float], scale: float) -> dict:
+    ordered = sorted(samples)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * scale, 3)  # noqa: E731
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "mean": round(statistics.mean(ordered) * scale, 3)}
+
+
+def run_info() -> dict:
+    """Which code produced a report, so runs can be compared across commits"""
+    def git(*args):
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=Path(__file__).parent, capture_output=True, text=True, timeout=5,
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
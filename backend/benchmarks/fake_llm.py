@@ -0,0 +1,71 @@
+"""
+Stand-in for Groq: an OpenAI-compatible /v1/chat/completions that
+answers after a fixed delay, so AI parse benchmarks measure our side
+(rate limiting, caching, prompt building) rather than a remote model.
+
+Answers single-line prompts with one object and batch prompts with an
+array, amount taken from the last number in each line.
+
+    cd backend
+    python -m benchmarks.fake_llm --port 8765 --latency-ms 300
+    AI_BASE_URL=http://localhost:8765/v1 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import re
+from datetime import date
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+_SINGLE = re.compile(r'The user said: "(.*)"')
+_BATCH_LINE = re.compile(r"^(\d+)\. (.*)$", re.MULTILINE)
+_CATEGORIES = re.compile(r"Available categories: (.*)")
+_TODAY = re.compile(r"Today's date is (\S+)\.")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def _answer(text: str, categories: list[str], today: str) -> dict:
+    numbers = _NUMBER.findall(text.replace(",", ""))
+    return {
+        "amount": float(numbers[-1]) if numbers else 0,
+        "description": text[:40],
+        "category": categories[0] if categories else "Other",
+        "date": today,
+        "type": "expense",
+    }
+
+
+def create_app(latency: float = 0.3) -> Starlette:
+    async def chat(request: Request):
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        await asyncio.sleep(latency)
+
+        found = _CATEGORIES.search(prompt)
+        categories = [c.strip() for c in found.group(1).split(",")] if found else []
+        found = _TODAY.search(prompt)
+        today = found.group(1) if found else date.today().isoformat()
+        single = _SINGLE.search(prompt)
+        if single:
+            content = _answer(single.group(1), categories, today)
+        else:
+            content = [
+                {"line": int(number), **_answer(json.loads(text), categories, today)}
+                for number, text in _BATCH_LINE.findall(prompt)
+            ]
+        return JSONResponse({"choices": [{"message": {"role": "assistant", "content": json.dumps(content)}}]})
+
+    return Starlette(routes=[Route("/v1/chat/completions", chat, methods=["POST"])])
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible LLM for benchmarks")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency_ms / 1000), port=args.port, log_level="warning")
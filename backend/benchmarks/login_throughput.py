@@ -0,0 +1,102 @@
+"""
+Login throughput benchmark.
+
+Runs the app in-process against a throwaway SQLite database, fires
+concurrent logins at it and reports logins/second overall and per
+hashing worker, plus how long a cheap endpoint takes while the burst
+is in flight (it should stay flat - that's the point of the pool).
+
+    cd backend
+    python -m benchmarks.login_throughput --logins 200 --concurrency 32
+    BCRYPT_ROUNDS=10 BCRYPT_WORKERS=4 python -m benchmarks.login_throughput
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="login-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("GROQ_API_KEY", "unused")
+
+import httpx  # noqa: E402
+from app.main import app  # noqa: E402
+from app.database import Base, engine  # noqa: E402
+from app.auth.hashing import password_hasher  # noqa: E402
+from app.config import BCRYPT_ROUNDS  # noqa: E402
+
+USER = {"name": "bench", "email": "bench@example.com", "password": "benchmark-password"}
+
+
+async def _timed(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> tuple[int, float]:
+    started = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    return response.status_code, time.perf_counter() - started
+
+
+async def run(logins: int, concurrency: int) -> dict:
+    Base.metadata.create_all(engine)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/api/auth/register", json=USER)
+        # Warm the pool so worker start-up isn't counted
+        await asyncio.gather(*(
+            client.post("/api/auth/login", json={"email": USER["email"], "password": USER["password"]})
+            for _ in range(password_hasher.workers)
+        ))
+
+        semaphore = asyncio.Semaphore(concurrency)
+        done = asyncio.Event()
+
+        async def login():
+            async with semaphore:
+                return await _timed(client, "POST", "/api/auth/login",
+                                    json={"email": USER["email"], "password": USER["password"]})
+
+        async def probe():
+            latencies = []
+            while not done.is_set():
+                latencies.append((await _timed(client, "GET", "/"))[1])
+                await asyncio.sleep(0.01)
+            return latencies
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        results = await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        probe_latencies = await probe_task
+
+    ok = [t for code, t in results if code == 200]
+    rejected = sum(1 for code, _ in results if code == 503)
+    rate = len(ok) / elapsed
+    return {
+        "bcrypt_rounds": BCRYPT_ROUNDS,
+        "workers": password_hasher.workers,
+        "logins": logins,
+        "concurrency": concurrency,
+        "succeeded": len(ok),
+        "rejected_503": rejected,
+        "elapsed_s": round(elapsed, 3),
+        "logins_per_s": round(rate, 2),
+        "logins_per_s_per_worker": round(rate / password_hasher.workers, 2),
+        "login_p50_ms": round(statistics.median(ok) * 1000, 1) if ok else None,
+        "probe_p50_ms": round(statistics.median(probe_latencies) * 1000, 2) if probe_latencies else None,
+        "probe_max_ms": round(max(probe_latencies) * 1000, 2) if probe_latencies else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure login throughput")
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    try:
+        print(json.dumps(asyncio.run(run(args.logins, args.concurrency)), indent=2))
+    finally:
+        password_hasher.shutdown()
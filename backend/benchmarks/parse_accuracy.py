@@ -0,0 +1,124 @@
+"""
+Accuracy and latency of the parse-transaction tiers.
+
+Scores the rule parser (and, with --llm, the LLM tier) against
+parse_corpus.jsonl. A row counts as correct when amount, type,
+category and date all match. The rules tier is also scored on
+coverage: how many rows it is confident enough to answer alone.
+
+    cd backend
+    python -m benchmarks.parse_accuracy
+    AI_BASE_URL=http://localhost:8001/v1 python -m benchmarks.parse_accuracy --llm
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.config import RULE_PARSER_MIN_CONFIDENCE  # noqa: E402
+from app.services import rule_parser  # noqa: E402
+from benchmarks.common import percentiles  # noqa: E402
+
+CORPUS = Path(__file__).with_name("parse_corpus.jsonl")
+TODAY = date(2026, 10, 18)  # fixed, so weekday and "days ago" rows stay valid
+CATEGORIES = [
+    ("Food", "expense"), ("Transport", "expense"), ("Shopping", "expense"),
+    ("Entertainment", "expense"), ("Bills", "expense"), ("Health", "expense"),
+    ("Other", "expense"), ("Salary", "income"),
+]
+
+
+def load_corpus() -> list[dict]:
+    with open(CORPUS, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def is_correct(result: dict, expected: dict) -> bool:
+    try:
+        amount_ok = abs(float(result.get("amount")) - expected["amount"]) < 0.005
+    except (TypeError, ValueError):
+        return False
+    return (
+        amount_ok
+        and result.get("type") == expected["type"]
+        and (result.get("category") or "").lower() == expected["category"].lower()
+        and result.get("date") == (TODAY - timedelta(days=expected["days_ago"])).isoformat()
+    )
+
+
+def bench_rules(corpus: list[dict], repeat: int) -> tuple[dict, list]:
+    parses, timings = [], []
+    for row in corpus:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            parsed = rule_parser.parse(row["text"], CATEGORIES, TODAY)
+            timings.append(time.perf_counter() - started)
+        parses.append(parsed)
+
+    answered = [(p, row) for p, row in zip(parses, corpus) if p.confidence >= RULE_PARSER_MIN_CONFIDENCE]
+    return {
+        "rows": len(corpus),
+        "min_confidence": RULE_PARSER_MIN_CONFIDENCE,
+        "accuracy_all_rows": round(sum(is_correct(p.as_result(), r) for p, r in zip(parses, corpus)) / len(corpus), 3),
+        "coverage": round(len(answered) / len(corpus), 3),
+        "accuracy_when_answered": round(sum(is_correct(p.as_result(), r) for p, r in answered) / max(1, len(answered)), 3),
+        "latency_us": percentiles(timings, 1e6),
+    }, parses
+
+
+async def bench_llm(corpus: list[dict]) -> tuple[dict, list]:
+    from app.services.ai_service import transaction_parser
+
+    names = [name for name, _ in CATEGORIES]
+    results, timings = [], []
+    for row in corpus:
+        transaction_parser.cache.delete(transaction_parser._key(row["text"], names, TODAY.isoformat()))
+        started = time.perf_counter()
+        results.append(await transaction_parser.parse(row["text"], names, today=TODAY.isoformat()))
+        timings.append(time.perf_counter() - started)
+
+    return {
+        "rows": len(corpus),
+        "accuracy_all_rows": round(sum(is_correct(r, row) for r, row in zip(results, corpus)) / len(corpus), 3),
+        "errors": sum(1 for r in results if "error" in r),
+        "latency_ms": percentiles(timings, 1e3),
+    }, results
+
+
+async def main(use_llm: bool, repeat: int, show_misses: bool) -> dict:
+    corpus = load_corpus()
+    report = {}
+    report["rules"], parses = bench_rules(corpus, repeat)
+
+    if use_llm:
+        report["llm"], llm_results = await bench_llm(corpus)
+        # What the endpoint would do: rules when confident, LLM otherwise
+        tiered = [
+            p.as_result() if p.confidence >= RULE_PARSER_MIN_CONFIDENCE else r
+            for p, r in zip(parses, llm_results)
+        ]
+        report["tiered"] = {
+            "accuracy_all_rows": round(sum(is_correct(t, row) for t, row in zip(tiered, corpus)) / len(corpus), 3),
+            "llm_calls_saved": report["rules"]["coverage"],
+        }
+
+    if show_misses:
+        report["rules_misses"] = [
+            {"text": row["text"], "got": p.as_result(), "confidence": p.confidence}
+            for p, row in zip(parses, corpus) if not is_correct(p.as_result(), row)
+        ]
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score the parse-transaction tiers")
+    parser.add_argument("--llm", action="store_true", help="also run the LLM tier (needs a key or AI_BASE_URL)")
+    parser.add_argument("--repeat", type=int, default=200, help="rule-parser timing repetitions per row")
+    parser.add_argument("--show-misses", action="store_true")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.llm, args.repeat, args.show_misses)), indent=2, ensure_ascii=False))
@@ -0,0 +1,109 @@
+"""
+ORM entities against column-projected DTOs on the list read paths.
+
+For the transaction list and the category list, times the query and
+measures what it allocates (tracemalloc peak, and what is still held
+once it returns - the result, plus the identity map for ORM) three ways:
+
+    orm:  db.query(Transaction, Category) / db.query(Category)
+    rows: select() of the needed columns, plain Row tuples
+    dto:  app.services.reads - the same select, as __slots__ dataclasses
+
+    cd backend
+    python -m benchmarks.read_paths --rows 500 --repeat 200
+"""
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='read-paths-bench-')}/bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from benchmarks.common import percentiles, run_info  # noqa: E402
+from benchmarks.seed import seed  # noqa: E402
+
+
+def _measure(db, fn, repeat: int) -> dict:
+    fn()  # warm statement caches
+    db.expunge_all()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+        db.expunge_all()  # every request starts with an empty session
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.expunge_all()
+
+    return {
+        "latency_ms": percentiles(timings, 1e3),
+        "peak_alloc_kb": round((peak - before) / 1024, 1),
+        "retained_kb": round((retained - before) / 1024, 1),
+        "rows": len(result),
+    }
+
+
+def bench(rows: int, repeat: int) -> dict:
+    from sqlalchemy import select
+    from app.database import SessionLocal
+    from app.models.transaction import Transaction
+    from app.models.category import Category
+    from app.services import reads
+
+    newest_first = (Transaction.date.desc(), Transaction.id.desc())
+    category_columns = (Category.id, Category.name, Category.type, Category.icon, Category.created_at)
+
+    paths = {
+        "transactions": {
+            "orm": lambda db: db.query(Transaction, Category)
+            .join(Category, Transaction.category_id == Category.id)
+            .filter(Transaction.user_id == 1).order_by(*newest_first).limit(rows).all(),
+            "rows": lambda db: db.execute(
+                reads.transaction_select().where(Transaction.user_id == 1).order_by(*newest_first).limit(rows)
+            ).all(),
+            "dto": lambda db: reads.fetch_transactions(
+                db, reads.transaction_select().where(Transaction.user_id == 1).order_by(*newest_first).limit(rows)
+            ),
+        },
+        "categories": {
+            "orm": lambda db: db.query(Category).filter(Category.user_id == 1).all(),
+            "rows": lambda db: db.execute(select(*category_columns).where(Category.user_id == 1)).all(),
+            "dto": lambda db: reads.list_categories(db, 1),
+        },
+    }
+
+    report = {}
+    db = SessionLocal()
+    try:
+        for endpoint, variants in paths.items():
+            report[endpoint] = {name: _measure(db, lambda fn=fn: fn(db), repeat) for name, fn in variants.items()}
+            orm, dto = report[endpoint]["orm"], report[endpoint]["dto"]
+            report[endpoint]["dto_vs_orm"] = {
+                "latency_p50": round(dto["latency_ms"]["p50"] / orm["latency_ms"]["p50"], 2),
+                "peak_alloc": round(dto["peak_alloc_kb"] / orm["peak_alloc_kb"], 2) if orm["peak_alloc_kb"] else None,
+            }
+    finally:
+        db.close()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare ORM entity loading with column-projected reads")
+    parser.add_argument("--rows", type=int, default=500, help="transaction page size")
+    parser.add_argument("--categories", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    seed(users=1, categories=args.categories, transactions=max(args.rows, 2_000))
+    print(json.dumps({"run": run_info(), "rows": args.rows, **bench(args.rows, args.repeat)}, indent=2))
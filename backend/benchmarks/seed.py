@@ -0,0 +1,147 @@
+"""
+Synthetic dataset for benchmarks.
+
+Seeds N users x M categories x K transactions per user into whatever
+DATABASE_URL points at (Postgres or SQLite), then rebuilds the monthly
+rollup. Output is deterministic for a given --seed, so two runs on
+different commits see the same data.
+
+Every user is bench<i>@example.com with password BENCH_PASSWORD.
+
+    cd backend
+    DATABASE_URL=postgresql://... python -m benchmarks.seed --users 100 --transactions 20000
+    python -m benchmarks.seed --users 1 --transactions 2000000 --database-url sqlite:////tmp/big.db
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+BENCH_PASSWORD = "benchmark-password"
+BENCH_EMAIL = "bench{}@example.com"
+CHUNK = 10_000
+
+EXPENSE_CATEGORIES = [
+    ("Food", "🍔", ["Groceries", "Lunch", "Dinner out", "Coffee", "Snacks"]),
+    ("Transport", "🚗", ["Uber", "Metro card", "Fuel", "Parking", "Train ticket"]),
+    ("Shopping", "🛍️", ["Clothes", "Shoes", "Headphones", "Books", "Gift"]),
+    ("Entertainment", "🎬", ["Movie", "Netflix", "Concert", "Games", "Party"]),
+    ("Bills", "📄", ["Electricity", "Internet", "Phone recharge", "Rent", "Insurance"]),
+    ("Health", "💊", ["Pharmacy", "Doctor", "Gym", "Dentist"]),
+]
+INCOME_CATEGORIES = [
+    ("Salary", "💼", ["Monthly salary", "Bonus"]),
+    ("Freelance", "💻", ["Client payment", "Consulting"]),
+]
+
+
+def category_specs(count: int) -> list[tuple[str, str, str, list[str]]]:
+    """count categories, roughly one in four income; extra ones get numbered names"""
+    income = max(1, count // 4) if count > 1 else 0
+    specs = []
+    for i in range(count - income):
+        name, icon, words = EXPENSE_CATEGORIES[i % len(EXPENSE_CATEGORIES)]
+        specs.append((name if i < len(EXPENSE_CATEGORIES) else f"{name} {i}", "expense", icon, words))
+    for i in range(income):
+        name, icon, words = INCOME_CATEGORIES[i % len(INCOME_CATEGORIES)]
+        specs.append((name if i < len(INCOME_CATEGORIES) else f"{name} {i}", "income", icon, words))
+    return specs
+
+
+def _transactions(rng: random.Random, user_id: int, categories: list, count: int, start: date, days: int):
+    """categories: (id, type, words). Expenses are ~90% of rows, like a real ledger."""
+    expenses = [c for c in categories if c[1] == "expense"] or categories
+    incomes = [c for c in categories if c[1] == "income"] or categories
+    for _ in range(count):
+        category_id, kind, words = rng.choice(incomes if rng.random() < 0.1 else expenses)
+        cents = int(rng.lognormvariate(10.5, 0.6)) if kind == "income" else int(rng.lognormvariate(7, 1.2))
+        yield {
+            "user_id": user_id,
+            "category_id": category_id,
+            "amount": Decimal(max(cents, 1)) / 100,
+            "description": rng.choice(words),
+            "date": start + timedelta(days=rng.randrange(days)),
+        }
+
+
+def seed(users: int, categories: int, transactions: int, days: int = 3 * 365, rng_seed: int = 42) -> dict:
+    from sqlalchemy import insert
+    from app.database import Base, SessionLocal, engine
+    from app.models.user import User
+    from app.models.category import Category
+    from app.models.transaction import Transaction
+    from app.auth.hashing import hash_password
+    from app.services import rollup
+
+    Base.metadata.create_all(engine)
+    rng = random.Random(rng_seed)
+    specs = category_specs(categories)
+    start = date.today() - timedelta(days=days - 1)
+    password_hash = hash_password(BENCH_PASSWORD)  # one hash for everyone - bcrypt isn't what's being seeded
+    started = time.perf_counter()
+    inserted = 0
+
+    db = SessionLocal()
+    try:
+        first = db.query(User.id).filter(User.email.like("bench%@example.com")).first()
+        if first:
+            raise SystemExit("Benchmark users already exist here - seed into an empty database")
+
+        for u in range(users):
+            user_id = db.execute(
+                insert(User).values(name=f"Bench {u}", email=BENCH_EMAIL.format(u), password_hash=password_hash)
+                .returning(User.id)
+            ).scalar_one()
+            category_rows = []
+            for name, kind, icon, words in specs:
+                category_id = db.execute(
+                    insert(Category).values(name=name, type=kind, icon=icon, user_id=user_id).returning(Category.id)
+                ).scalar_one()
+                category_rows.append((category_id, kind, words))
+
+            # Plain executemany in chunks - the ORM unit of work would dominate at this size
+            rows = _transactions(rng, user_id, category_rows, transactions, start, days)
+            while chunk := [row for _, row in zip(range(CHUNK), rows)]:
+                db.execute(insert(Transaction), chunk)
+                inserted += len(chunk)
+                db.commit()
+                print(f"\r{inserted:,} transactions", end="", file=sys.stderr)
+
+        rollup.rebuild(db)
+        db.commit()
+    finally:
+        db.close()
+    print(file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "database": engine.url.render_as_string(hide_password=True),
+        "users": users,
+        "categories_per_user": len(specs),
+        "transactions_per_user": transactions,
+        "transactions": inserted,
+        "first_date": start.isoformat(),
+        "seed": rng_seed,
+        "elapsed_s": round(elapsed, 2),
+        "rows_per_s": round(inserted / elapsed) if elapsed else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed a synthetic dataset for benchmarks")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--categories", type=int, default=8, help="per user")
+    parser.add_argument("--transactions", type=int, default=10_000, help="per user")
+    parser.add_argument("--days", type=int, default=3 * 365, help="spread transactions over this many days")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    print(json.dumps(seed(args.users, args.categories, args.transactions, args.days, args.seed), indent=2))
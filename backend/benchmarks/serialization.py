@@ -0,0 +1,111 @@
+"""
+Transaction list serialization: the old pipeline against the fast path.
+
+    old:  ORM entities -> _build_response dicts -> response_model
+          validation -> stdlib json
+    fast: column select -> row dicts -> orjson
+
+Both run on the same page of a seeded SQLite database, stage by stage,
+then the whole endpoint is timed in-process.
+
+    cd backend
+    python -m benchmarks.serialization --rows 500 --repeat 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='serialization-bench-')}/bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("BCRYPT_WORKERS", "0")
+
+from typing import List  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from benchmarks.common import percentiles, run_info  # noqa: E402
+from benchmarks.seed import seed, BENCH_EMAIL, BENCH_PASSWORD  # noqa: E402
+
+
+def _timed(fn, repeat: int) -> tuple[dict, object]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return percentiles(timings, 1e3), result
+
+
+def bench_stages(rows: int, repeat: int) -> dict:
+    from app.database import SessionLocal
+    from app.models.transaction import Transaction
+    from app.models.category import Category
+    from app.routers.transaction import _build_response, _list_transactions
+    from app.schemas.transaction import TransactionResponse
+    from app.responses import dumps
+
+    adapter = TypeAdapter(List[TransactionResponse])
+    db = SessionLocal()
+    try:
+        def old_query():
+            results = (
+                db.query(Transaction, Category).join(Category, Transaction.category_id == Category.id)
+                .filter(Transaction.user_id == 1)
+                .order_by(Transaction.date.desc(), Transaction.id.desc())
+                .limit(rows).all()
+            )
+            db.expunge_all()  # a request gets a fresh session, so don't let the identity map help
+            return [_build_response(t, c) for t, c in results]
+
+        def fast_query():
+            return _list_transactions(db, 1, None, None, None, None, rows, 0)
+
+        old = {}
+        old["query_ms"], built = _timed(old_query, repeat)
+        old["validate_ms"], validated = _timed(lambda: adapter.dump_python(adapter.validate_python(built), mode="json"), repeat)
+        # What Starlette's JSONResponse does
+        old["encode_ms"], body = _timed(lambda: json.dumps(
+            validated, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8"), repeat)
+
+        fast = {}
+        fast["query_ms"], built = _timed(fast_query, repeat)
+        fast["encode_ms"], fast_body = _timed(lambda: dumps(built), repeat)
+
+        assert json.loads(body) == json.loads(fast_body), "the two paths disagree"
+        return {"old": old, "fast": fast, "body_bytes": len(fast_body)}
+    finally:
+        db.close()
+
+
+async def bench_endpoint(rows: int, repeat: int) -> dict:
+    import httpx
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        login = await client.post("/api/auth/login", json={"email": BENCH_EMAIL.format(0), "password": BENCH_PASSWORD})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = await client.get("/api/transactions/", params={"limit": rows}, headers=headers)
+            timings.append(time.perf_counter() - started)
+            assert response.status_code == 200 and len(response.json()) == rows
+    return percentiles(timings, 1e3)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare transaction list serialization paths")
+    parser.add_argument("--rows", type=int, default=500, help="page size")
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    seed(users=1, categories=8, transactions=max(args.rows, 2_000))
+    report = {"run": run_info(), "rows": args.rows, **bench_stages(args.rows, args.repeat)}
+    report["speedup"] = round(
+        sum(v["p50"] for v in report["old"].values()) / sum(v["p50"] for v in report["fast"].values()), 2
+    )
+    report["endpoint_ms"] = asyncio.run(bench_endpoint(args.rows, args.repeat))
+    print(json.dumps(report, indent=2))
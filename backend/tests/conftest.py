@@ -0,0 +1,72 @@
+import os
+import tempfile
+import uuid
+
+# Configuration is read at import time - point everything at a throwaway
+# SQLite file and in-process backends before the app is imported
+_db_dir = tempfile.mkdtemp(prefix="finance-tests-")
+DB_PATH = os.path.join(_db_dir, "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["DB_ASYNC"] = "false"  # the async mode is switched on per test (see db_mode)
+os.environ["SECRET_KEY"] = "test-secret-key"
+os.environ["BCRYPT_WORKERS"] = "0"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["CACHE_BACKEND"] = "memory"
+os.environ["RATE_LIMIT_BACKEND"] = "memory"
+os.environ["EVENTS_BACKEND"] = "memory"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+from app.main import app  # noqa: E402
+from app import database  # noqa: E402
+from app.routers import transaction  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    database.Base.metadata.create_all(database.engine)
+    yield
+    database.Base.metadata.drop_all(database.engine)
+
+
+@pytest.fixture(params=["sync", "async"])
+def db_mode(request, monkeypatch):
+    """
+    Runs a test against the sync Session and again against an AsyncSession
+    on aiosqlite - what DB_ASYNC=true sets up - over the same database file.
+    """
+    if request.param == "async":
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{DB_PATH}", poolclass=NullPool)
+        session_factory = async_sessionmaker(async_engine, autoflush=False)
+        monkeypatch.setattr(database, "AsyncSessionLocal", session_factory)
+        monkeypatch.setattr(transaction, "AsyncSessionLocal", session_factory)
+    return request.param
+
+
+@pytest.fixture
+def client(db_mode):
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def register(client) -> dict:
+    """Registers and logs in a fresh user; returns their Authorization header"""
+    email = f"user-{uuid.uuid4().hex[:12]}@example.com"
+    response = client.post("/api/auth/register", json={"name": "Test", "email": email, "password": "password123"})
+    assert response.status_code == 200, response.text
+    response = client.post("/api/auth/login", json={"email": email, "password": "password123"})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def auth(client) -> dict:
+    return register(client)
+
+
+@pytest.fixture
+def make_user(client):
+    """For tests that need a second user"""
+    return lambda: register(client)
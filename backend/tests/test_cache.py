@@ -0,0 +1,72 @@
+from decimal import Decimal
+import fakeredis
+import pytest
+from app.services.cache import InMemoryBackend, RedisBackend, ResponseCache, MISSING
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "redis":
+        return RedisBackend(fakeredis.FakeRedis())
+    return InMemoryBackend(max_entries=100, ttl_seconds=60)
+
+
+def test_miss_is_distinct_from_cached_empty_values(backend):
+    assert backend.get("absent") is MISSING
+    backend.set("empty", [], 60)
+    assert backend.get("empty") == []
+
+
+def test_redis_round_trips_money_as_decimal():
+    backend = RedisBackend(fakeredis.FakeRedis())
+    backend.set("k", {"total": Decimal("1234.56"), "rows": [{"amount": Decimal("0.10")}], "count": 3}, 60)
+    value = backend.get("k")
+    assert value == {"total": Decimal("1234.56"), "rows": [{"amount": Decimal("0.10")}], "count": 3}
+    assert isinstance(value["total"], Decimal) and isinstance(value["count"], int)
+
+
+def test_bump_version_invalidates_only_that_user(backend):
+    cache = ResponseCache(backend, ttl_seconds=60)
+    calls = []
+
+    def compute(user_id):
+        calls.append(user_id)
+        return {"user": user_id, "calls": len(calls)}
+
+    first = cache.get_or_compute(1, "summary", {"month": 3}, lambda: compute(1))
+    assert cache.get_or_compute(1, "summary", {"month": 3}, lambda: compute(1)) == first
+    cache.get_or_compute(2, "summary", {"month": 3}, lambda: compute(2))
+    assert calls == [1, 2]
+
+    cache.bump_version(1)
+    assert cache.get_or_compute(1, "summary", {"month": 3}, lambda: compute(1)) != first
+    cache.get_or_compute(2, "summary", {"month": 3}, lambda: compute(2))
+    assert calls == [1, 2, 1]
+
+
+def test_different_params_are_different_entries(backend):
+    cache = ResponseCache(backend, ttl_seconds=60)
+    assert cache.get_or_compute(1, "summary", {"month": 3}, lambda: "march") == "march"
+    assert cache.get_or_compute(1, "summary", {"month": 4}, lambda: "april") == "april"
+
+
+def test_memory_counters_are_bounded():
+    backend = InMemoryBackend(max_entries=10, ttl_seconds=60)
+    for user_id in range(1000):
+        backend.incr(f"version:{user_id}")
+    assert len(backend.counters) == 10
+
+
+def test_evicted_counter_never_repeats_a_version():
+    backend = InMemoryBackend(max_entries=2, ttl_seconds=60)
+    cache = ResponseCache(backend, ttl_seconds=60)
+    seen = {cache.get_version(1)}
+    cache.get_or_compute(1, "summary", {}, lambda: "stale")
+    for _ in range(3):
+        seen.add(cache.bump_version(1))
+    # Push user 1's counter out, then read it back
+    cache.bump_version(2)
+    cache.bump_version(3)
+    assert "version:1" not in backend.counters
+    assert cache.get_version(1) not in seen
+    assert cache.get_or_compute(1, "summary", {}, lambda: "fresh") == "fresh"
@@ -0,0 +1,49 @@
+from app.services import cache
+from app.services.cache import analytics_cache
+from tests.test_db_modes import _category, _transaction
+
+
+def _get(client, auth, path, etag=None):
+    headers = {**auth, "If-None-Match": etag} if etag else auth
+    return client.get(path, headers=headers)
+
+
+def test_unchanged_data_gets_304(client, auth):
+    _category(client, auth)
+    first = _get(client, auth, "/api/categories/")
+    assert first.status_code == 200 and first.headers["Cache-Control"] == "private, no-cache"
+
+    again = _get(client, auth, "/api/categories/", first.headers["ETag"])
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["ETag"] == first.headers["ETag"]
+
+
+def test_write_changes_the_tag(client, auth):
+    food = _category(client, auth)
+    etag = _get(client, auth, "/api/transactions/").headers["ETag"]
+
+    _transaction(client, auth, food["id"])
+    response = _get(client, auth, "/api/transactions/", etag)
+    assert response.status_code == 200 and len(response.json()) == 1
+    assert response.headers["ETag"] != etag
+
+
+def test_tags_are_per_user_and_per_query(client, auth, make_user):
+    _category(client, auth)
+    etag = _get(client, auth, "/api/categories/").headers["ETag"]
+
+    assert _get(client, make_user(), "/api/categories/", etag).status_code == 200
+    assert _get(client, auth, "/api/categories/?x=1", etag).status_code == 200
+
+
+def test_tag_outlives_the_process_local_cache(client, auth, monkeypatch):
+    # What a restart (or another worker) looks like with the memory cache backend:
+    # its version counters start over
+    food = _category(client, auth)
+    etag = _get(client, auth, "/api/transactions/").headers["ETag"]
+    monkeypatch.setattr(analytics_cache, "backend", cache.InMemoryBackend(max_entries=10, ttl_seconds=60))
+
+    assert _get(client, auth, "/api/transactions/", etag).status_code == 304
+
+    _transaction(client, auth, food["id"])
+    assert _get(client, auth, "/api/transactions/", etag).status_code == 200
@@ -0,0 +1,161 @@
+"""Transaction and category routes against the sync Session and the AsyncSession (aiosqlite)."""
+import asyncio
+import uuid
+from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app import database
+from app.auth import hashing
+from app.models.category import Category
+from app.models.user import User
+
+
+def _category(client, auth, name="Food", type="expense") -> dict:
+    response = client.post("/api/categories/", json={"name": name, "type": type}, headers=auth)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _transaction(client, auth, category_id, amount="12.50", on="2026-03-15", description="Lunch") -> dict:
+    response = client.post("/api/transactions/", headers=auth, json={
+        "amount": amount, "description": description, "date": on, "category_id": category_id,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_session_matches_mode(db_mode):
+    async def open_session():
+        async with database.db_session() as db:
+            count = await database.run_db(db, lambda session: session.query(Category).count())
+            return type(db), count
+
+    session_type, count = asyncio.run(open_session())
+    assert issubclass(session_type, AsyncSession if db_mode == "async" else Session)
+    assert count >= 0
+
+
+def test_category_crud(client, auth):
+    category = _category(client, auth, "Travel")
+    assert client.get("/api/categories/", headers=auth).json() == [category]
+
+    response = client.put(f"/api/categories/{category['id']}", json={"name": "Trips"}, headers=auth)
+    assert response.status_code == 200 and response.json()["name"] == "Trips"
+
+    assert client.delete(f"/api/categories/{category['id']}", headers=auth).status_code == 200
+    assert client.get("/api/categories/", headers=auth).json() == []
+
+
+def test_categories_are_per_user(client, auth, make_user):
+    category = _category(client, auth)
+    other = make_user()
+    assert client.get("/api/categories/", headers=other).json() == []
+    assert client.put(f"/api/categories/{category['id']}", json={"name": "x"}, headers=other).status_code == 404
+
+
+def test_transaction_crud_and_summary(client, auth):
+    food = _category(client, auth)
+    salary = _category(client, auth, "Salary", "income")
+    lunch = _transaction(client, auth, food["id"])
+    _transaction(client, auth, salary["id"], amount="1000", description="March pay")
+
+    assert lunch["amount"] == 12.5 and lunch["category_name"] == "Food"
+    summary = client.get("/api/transactions/summary", params={"month": 3, "year": 2026}, headers=auth).json()
+    assert summary == {"total_income": 1000.0, "total_expense": 12.5, "balance": 987.5}
+
+    response = client.put(f"/api/transactions/{lunch['id']}", json={"amount": "20"}, headers=auth)
+    assert response.status_code == 200 and response.json()["amount"] == 20.0
+    summary = client.get("/api/transactions/summary", params={"month": 3, "year": 2026}, headers=auth).json()
+    assert summary["total_expense"] == 20.0
+
+    assert client.delete(f"/api/transactions/{lunch['id']}", headers=auth).status_code == 200
+    listed = client.get("/api/transactions/", headers=auth).json()
+    assert [t["description"] for t in listed] == ["March pay"]
+
+
+def test_list_filters_and_cursor_pages(client, auth):
+    food = _category(client, auth)
+    ids = [_transaction(client, auth, food["id"], on=f"2026-01-{day:02d}")["id"] for day in range(1, 8)]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/transactions/page", params=params, headers=auth).json()
+        seen += [t["id"] for t in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert seen == ids[::-1]
+
+    ranged = client.get("/api/transactions/", params={"start_date": "2026-01-03", "end_date": "2026-01-05"}, headers=auth)
+    assert [t["date"] for t in ranged.json()] == ["2026-01-05", "2026-01-04", "2026-01-03"]
+
+
+def test_batch_and_export(client, auth):
+    food = _category(client, auth)
+    existing = _transaction(client, auth, food["id"])
+    response = client.post("/api/transactions/batch", headers=auth, json={"operations": [
+        {"op": "create", "data": {"amount": "5", "description": "Tea", "date": "2026-02-01", "category_id": food["id"]}},
+        {"op": "update", "id": existing["id"], "data": {"amount": "7"}},
+        {"op": "delete", "id": 999_999},
+    ]})
+    assert response.status_code == 200
+    assert response.json()["applied"] == 2 and response.json()["failed"] == 1
+
+    export = client.get("/api/transactions/export", params={"format": "ndjson"}, headers=auth)
+    assert export.status_code == 200
+    assert len(export.text.strip().splitlines()) == 2
+
+
+def test_batch_update_applies_null_like_put(client, auth):
+    food = _category(client, auth)
+    first = _transaction(client, auth, food["id"], description="First")
+    second = _transaction(client, auth, food["id"], description="Second")
+
+    assert client.put(f"/api/transactions/{first['id']}", json={"description": None}, headers=auth).status_code == 200
+    response = client.post("/api/transactions/batch", headers=auth, json={"operations": [
+        {"op": "update", "id": second["id"], "data": {"description": None}},
+        {"op": "update", "id": first["id"], "data": {"amount": None}},
+    ]})
+    results = response.json()["results"]
+    assert results[0]["ok"] and results[1]["error"] == "amount can't be null"
+
+    rows = {t["id"]: t for t in client.get("/api/transactions/page", headers=auth).json()["items"]}
+    assert rows[first["id"]]["description"] is None and rows[second["id"]]["description"] is None
+    assert rows[first["id"]]["amount"] == 12.5
+
+
+def test_search_pages_survive_writes_between_pages(client, auth):
+    # bm25 moves with every write, so SQLite search pages by (date, id)
+    food = _category(client, auth)
+    for day in range(1, 7):
+        _transaction(client, auth, food["id"], on=f"2026-03-{day:02d}", description=f"Coffee beans {'x ' * day}")
+
+    first = client.get("/api/transactions/page", params={"q": "coffee", "limit": 3}, headers=auth).json()
+    # Shifts every row's bm25 score
+    _transaction(client, auth, food["id"], on="2026-02-01", description="Coffee")
+    second = client.get(
+        "/api/transactions/page", params={"q": "coffee", "limit": 10, "cursor": first["next_cursor"]}, headers=auth
+    ).json()
+
+    dates = [t["date"] for t in first["items"] + second["items"]]
+    assert dates == sorted(dates, reverse=True)
+    assert len(dates) == len(set(dates)) == 7
+    assert second["next_cursor"] is None
+
+
+def test_login_after_rounds_change_rehashes(client, monkeypatch):
+    email = f"rehash-{uuid.uuid4().hex[:12]}@example.com"
+    credentials = {"email": email, "password": "password123"}
+    assert client.post("/api/auth/register", json={"name": "Test", **credentials}).status_code == 200
+
+    # What raising BCRYPT_ROUNDS and restarting does
+    monkeypatch.setattr(hashing, "pwd_context", CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5))
+    response = client.post("/api/auth/login", json=credentials)
+    assert response.status_code == 200, response.text
+    assert response.json()["user"]["email"] == email
+
+    with database.SessionLocal() as db:
+        stored = db.query(User.password_hash).filter(User.email == email).scalar()
+    assert stored.startswith("$2b$05$")
+    assert client.post("/api/auth/login", json=credentials).status_code == 200
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import threading
+import time
+import pytest
+from jose import jwt
+from app import database
+from app.config import ALGORITHM, SECRET_KEY
+from app.routers import events
+from app.services import events as events_service, versions
+from app.services.events import event_broker
+from tests.test_db_modes import _category, _transaction
+
+
+def _frames(body: str) -> list:
+    return [json.loads(line[6:]) for line in body.splitlines() if line.startswith("data: ")]
+
+
+def test_stream_ends_when_the_token_expires(client, auth):
+    user_id = client.get("/api/auth/me", headers=auth).json()["id"]
+    token = jwt.encode({"sub": str(user_id), "exp": int(time.time()) + 2}, SECRET_KEY, algorithm=ALGORITHM)
+
+    started = time.monotonic()
+    response = client.get("/api/events/", params={"access_token": token})
+
+    assert response.status_code == 200
+    assert [f["type"] for f in _frames(response.text)] == ["ready", "expired"]
+    assert time.monotonic() - started < 5
+
+
+def test_stream_delivers_events_until_expiry():
+    async def run():
+        stream = events._stream(999_001, False, None, None, expires_at=time.time() + 0.5)
+        frames = [await anext(stream)]
+        event_broker.publish(999_001, "transaction.created", 7, ids=[1])
+        async for frame in stream:
+            frames.append(frame)
+        return _frames("".join(frames))
+
+    assert [(f["type"], f.get("version")) for f in asyncio.run(run())] == [
+        ("ready", 0), ("transaction.created", 7), ("expired", None),
+    ]
+    assert event_broker.connections() == 0
+
+
+def test_event_versions_are_the_users_data_version(client, auth):
+    user_id = client.get("/api/auth/me", headers=auth).json()["id"]
+
+    async def run():
+        stream = events._stream(user_id, False, None, None, expires_at=time.time() + 1)
+        frames = [await anext(stream)]
+        # Written through the API from another thread, like a request on another worker
+        await asyncio.to_thread(client.post, "/api/categories/", json={"name": "Food", "type": "expense"}, headers=auth)
+        async for frame in stream:
+            frames.append(frame)
+        return _frames("".join(frames))
+
+    ready, created, _ = asyncio.run(run())
+    with database.SessionLocal() as db:
+        stored = versions.current(db, user_id)
+    assert created["type"] == "category.created"
+    assert created["version"] == ready["version"] + 1 == stored
+
+
+def test_postgres_fanout_needs_a_shared_cache(monkeypatch):
+    monkeypatch.setattr(events_service, "EVENTS_BACKEND", "postgres")
+    monkeypatch.setattr(events_service, "DATABASE_URL", "postgresql://localhost/finance")
+    monkeypatch.setattr(events_service, "CACHE_BACKEND", "memory")
+    with pytest.raises(RuntimeError, match="CACHE_BACKEND=redis"):
+        events_service.EventBroker().start()
+
+
+def _stream_while(client, auth, write, seconds=1.0, **params) -> list:
+    """Opens a stream over HTTP that ends after `seconds`, runs write() on another connection meanwhile"""
+    user_id = client.get("/api/auth/me", headers=auth).json()["id"]
+    token = jwt.encode({"sub": str(user_id), "exp": time.time() + seconds}, SECRET_KEY, algorithm=ALGORITHM)
+
+    def write_once_subscribed():
+        deadline = time.monotonic() + seconds
+        while event_broker.connections() == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        write()
+
+    writer = threading.Thread(target=write_once_subscribed)
+    writer.start()
+    response = client.get("/api/events/", params={"access_token": token, **params})
+    writer.join()
+    assert response.status_code == 200
+    return _frames(response.text)
+
+
+def test_write_on_another_connection_reaches_the_stream(client, auth):
+    frames = _stream_while(client, auth, lambda: _category(client, auth))
+
+    assert [f["type"] for f in frames] == ["ready", "category.created", "expired"]
+    assert frames[1]["version"] == frames[0]["version"] + 1
+
+
+def test_stream_only_gets_its_own_users_writes(client, auth, make_user):
+    other = make_user()
+    frames = _stream_while(client, auth, lambda: _category(client, other))
+
+    assert [f["type"] for f in frames] == ["ready", "expired"]
+
+
+def test_stream_attaches_totals_after_the_write(client, auth):
+    food = _category(client, auth)
+    frames = _stream_while(
+        client, auth, lambda: _transaction(client, auth, food["id"], amount="20.00", on="2026-03-15"),
+        totals="true", month=3, year=2026,
+    )
+
+    ready, created, _ = frames
+    assert ready["summary"]["total_expense"] == 0
+    assert created["type"] == "transaction.created"
+    assert created["summary"]["total_expense"] == 20
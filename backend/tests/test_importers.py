@@ -0,0 +1,79 @@
+from datetime import date
+import io
+import pytest
+from app.services import importers
+from tests.test_db_modes import _category
+
+
+@pytest.mark.parametrize("value, order, expected", [
+    ("03/04/2024", "dmy", date(2024, 4, 3)),
+    ("03/04/2024", "mdy", date(2024, 3, 4)),
+    ("12/31/24", "mdy", date(2024, 12, 31)),
+    ("31/12/2024", None, date(2024, 12, 31)),
+    ("05/05/2024", None, date(2024, 5, 5)),  # same either way
+    ("2024-03-04", None, date(2024, 3, 4)),
+    ("04.03.2024", None, date(2024, 3, 4)),
+])
+def test_parse_date(value, order, expected):
+    assert importers.parse_date(value, order) == expected
+
+
+@pytest.mark.parametrize("value, order", [("03/04/2024", None), ("31/12/2024", "mdy"), ("13/13/2024", None)])
+def test_parse_date_rejects(value, order):
+    with pytest.raises(ValueError):
+        importers.parse_date(value, order)
+
+
+def test_file_settles_the_date_order():
+    rows = [(2, {"date": "03/04/2024"}), (3, {"date": "2024-01-01"}), (4, {"date": "04/25/2024"})]
+    assert [(n, order) for n, _, order in importers.with_date_order(iter(rows), None)] == [
+        (3, None), (2, "mdy"), (4, "mdy"),
+    ]
+
+
+def test_file_that_never_settles_the_order_is_rejected():
+    rows = [(2, {"date": "03/04/2024"}), (3, {"date": "05/05/2024"})]
+    with pytest.raises(ValueError, match="date_order"):
+        list(importers.with_date_order(iter(rows), None))
+    assert len(list(importers.with_date_order(iter(rows), "dmy"))) == 2
+
+
+def _import(client, auth, content: str, filename: str, **form):
+    return client.post(
+        "/api/transactions/import", headers=auth, data=form,
+        files={"file": (filename, io.BytesIO(content.encode()), "text/plain")},
+    )
+
+
+def _dates(client, auth) -> list:
+    return sorted(t["date"] for t in client.get("/api/transactions/", headers=auth).json())
+
+
+def test_ambiguous_csv_needs_a_date_order(client, auth):
+    food = _category(client, auth)
+    content = f"date,amount,description,category_id\n03/04/2024,10,Lunch,{food['id']}\n"
+
+    response = _import(client, auth, content, "bank.csv")
+    assert response.status_code == 400 and "date_order" in response.json()["detail"]
+    assert _dates(client, auth) == []
+
+    assert _import(client, auth, content, "bank.csv", date_order="dmy").json()["imported"] == 1
+    assert _dates(client, auth) == ["2024-04-03"]
+
+
+def test_csv_order_comes_from_an_unambiguous_row(client, auth):
+    food = _category(client, auth)
+    content = (
+        "date,amount,description,category_id\n"
+        f"03/04/2024,10,Lunch,{food['id']}\n"
+        f"25/04/2024,10,Dinner,{food['id']}\n"
+    )
+    assert _import(client, auth, content, "bank.csv").json()["imported"] == 2
+    assert _dates(client, auth) == ["2024-04-03", "2024-04-25"]
+
+
+def test_qif_dates_are_month_first(client, auth):
+    _category(client, auth, name="Groceries")
+    content = "!Type:Bank\nD03/04'24\nT-10.00\nPShop\nLGroceries\n^\n"
+    assert _import(client, auth, content, "bank.qif").json()["imported"] == 1
+    assert _dates(client, auth) == ["2024-03-04"]
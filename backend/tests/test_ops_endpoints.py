@@ -0,0 +1,22 @@
+import pytest
+from app.auth import auth as auth_module
+
+OPS_PATHS = ["/metrics", "/api/internal/cache-stats", "/api/internal/pool-stats",
+             "/api/internal/hasher-stats", "/api/internal/ai-stats"]
+
+
+@pytest.mark.parametrize("path", OPS_PATHS)
+def test_ops_endpoints_need_the_metrics_token(client, auth, monkeypatch, path):
+    monkeypatch.setattr(auth_module, "METRICS_TOKEN", "ops-secret")
+    # A user's login isn't enough
+    assert client.get(path, headers=auth).status_code == 401
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers={"Authorization": "Bearer ops-secret"}).status_code == 200
+
+
+def test_without_a_token_metrics_is_open_and_internal_is_closed(client, auth, monkeypatch):
+    monkeypatch.setattr(auth_module, "METRICS_TOKEN", None)
+    assert client.get("/metrics").status_code == 200
+    for path in OPS_PATHS[1:]:
+        assert client.get(path).status_code == 404
+        assert client.get(path, headers=auth).status_code == 404
@@ -0,0 +1,61 @@
+import asyncio
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+import fakeredis
+import pytest
+from app.database import SessionLocal
+from app.services.rate_limiter import MemoryBackend, RedisBackend, DatabaseBackend, RateLimiter
+
+LIMIT = 20
+WINDOW = 20_000
+_user_ids = itertools.count(10_000)  # the database backend shares the test database
+
+
+@pytest.fixture(params=["memory", "redis", "database"])
+def backend(request):
+    if request.param == "redis":
+        return RedisBackend(fakeredis.FakeRedis())
+    if request.param == "database":
+        return DatabaseBackend(SessionLocal)
+    return MemoryBackend()
+
+
+def test_concurrent_consumes_never_exceed_the_limit(backend):
+    user_id = next(_user_ids)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda _: backend.consume(user_id, WINDOW, 1, LIMIT, 0.0), range(60)))
+
+    assert sum(allowed for allowed, _ in results) == LIMIT
+    assert backend.peek(user_id, WINDOW) == (LIMIT, 0)
+
+
+def test_multi_credit_request_takes_all_or_nothing(backend):
+    user_id = next(_user_ids)
+    assert backend.consume(user_id, WINDOW, LIMIT - 3, LIMIT, 0.0)[0]
+    allowed, used = backend.consume(user_id, WINDOW, 5, LIMIT, 0.0)
+    assert not allowed and used == LIMIT - 3
+    assert backend.consume(user_id, WINDOW, 3, LIMIT, 0.0)[0]
+    assert backend.peek(user_id, WINDOW) == (LIMIT, 0)
+
+
+def test_previous_window_counts_by_weight(backend):
+    user_id = next(_user_ids)
+    for _ in range(10):
+        backend.consume(user_id, WINDOW - 1, 1, LIMIT, 0.0)
+    # Half of yesterday's 10 still inside the sliding window: 15 left today
+    results = [backend.consume(user_id, WINDOW, 1, LIMIT, 0.5)[0] for _ in range(20)]
+    assert sum(results) == 15
+    assert backend.peek(user_id, WINDOW) == (15, 10)
+
+
+def test_limiter_reports_remaining_and_reset(backend):
+    limiter = RateLimiter(backend, daily_limit=3, policy="daily")
+    user_id = next(_user_ids)
+
+    async def run():
+        return [await limiter.check_and_increment(user_id) for _ in range(4)], await limiter.get_remaining(user_id)
+
+    results, remaining = asyncio.run(run())
+    assert [r["remaining"] for r in results[:3]] == [2, 1, 0]
+    assert results[3]["allowed"] is False and results[3]["resets_at"].endswith("Z")
+    assert remaining == 0
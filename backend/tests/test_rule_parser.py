@@ -0,0 +1,36 @@
+from datetime import date
+from app.services import rule_parser
+
+TODAY = date(2026, 10, 18)
+CATEGORIES = [("Food", "expense"), ("Salary", "income")]
+
+
+def test_days_ago():
+    result = rule_parser.parse("spent 50 on food 3 days ago", CATEGORIES, today=TODAY)
+    assert result.date == "2026-10-15"
+    assert result.amount == 50 and result.category == "Food"
+    assert result.confidence >= 0.8
+
+
+def test_days_ago_out_of_range_goes_to_the_next_tier():
+    # Used to raise OverflowError (date value out of range)
+    result = rule_parser.parse("paid 99999999 days ago 50 food", CATEGORIES, today=TODAY)
+    assert result.confidence == 0
+    assert result.date == TODAY.isoformat()
+
+
+def test_days_ago_at_the_limit():
+    result = rule_parser.parse(f"spent 50 on food {rule_parser.MAX_DAYS_AGO} days ago", CATEGORIES, today=TODAY)
+    assert date.fromisoformat(result.date) == date(2016, 10, 20)
+    assert result.confidence > 0
+
+
+def test_impossible_iso_date_goes_to_the_next_tier():
+    result = rule_parser.parse("spent 50 on food 2026-13-45", CATEGORIES, today=TODAY)
+    assert result.confidence == 0
+    assert result.date == TODAY.isoformat()
+
+
+def test_iso_date():
+    result = rule_parser.parse("spent 50 on food 2026-02-28", CATEGORIES, today=TODAY)
+    assert result.date == "2026-02-28" and result.confidence > 0
@@ -0,0 +1,90 @@
+"""Search over descriptions (?q=) on SQLite's FTS5 table."""
+from datetime import date, timedelta
+from tests.test_db_modes import _category, _transaction
+
+
+def _search(client, auth, q, path="/api/transactions/", **params):
+    response = client.get(path, params={"q": q, **params}, headers=auth)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _descriptions(rows) -> set:
+    return {t["description"] for t in rows}
+
+
+def test_every_word_matches_as_a_prefix(client, auth):
+    food = _category(client, auth)
+    for description in ("Coffee beans", "Coffeehouse brunch", "Tea", "Beans on toast"):
+        _transaction(client, auth, food["id"], description=description)
+
+    assert _descriptions(_search(client, auth, "coff")) == {"Coffee beans", "Coffeehouse brunch"}
+    assert _descriptions(_search(client, auth, "COFFEE bea")) == {"Coffee beans"}
+    assert _search(client, auth, "chocolate") == []
+
+
+def test_search_text_is_not_query_syntax(client, auth):
+    food = _category(client, auth)
+    _transaction(client, auth, food["id"], description="Fish & chips")
+
+    assert _descriptions(_search(client, auth, 'fish" chips*(')) == {"Fish & chips"}
+    # Nothing to search for: the filter is dropped rather than matching nothing
+    assert len(_search(client, auth, "%_*")) == 1
+
+
+def test_search_sees_updates_and_deletes(client, auth):
+    food = _category(client, auth)
+    lunch = _transaction(client, auth, food["id"], description="Lunch")
+    dinner = _transaction(client, auth, food["id"], description="Dinner")
+
+    client.put(f"/api/transactions/{lunch['id']}", json={"description": "Brunch"}, headers=auth)
+    client.delete(f"/api/transactions/{dinner['id']}", headers=auth)
+
+    assert _search(client, auth, "lunch") == [] and _search(client, auth, "dinner") == []
+    assert _descriptions(_search(client, auth, "brunch")) == {"Brunch"}
+
+
+def test_search_is_per_user(client, auth, make_user):
+    _transaction(client, auth, _category(client, auth)["id"], description="Rent")
+    other = make_user()
+    _transaction(client, other, _category(client, other)["id"], description="Rent")
+
+    assert len(_search(client, auth, "rent")) == 1
+    assert len(_search(client, auth, "rent", path="/api/transactions/page")["items"]) == 1
+
+
+def test_search_page_cursor_is_stable_across_inserts(client, auth):
+    food = _category(client, auth)
+    start = date(2026, 3, 1)
+    for day in range(8):
+        _transaction(client, auth, food["id"], on=(start + timedelta(days=day)).isoformat(), description="Taxi home")
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = _search(client, auth, "taxi", path="/api/transactions/page", **params)
+        seen += [t["id"] for t in page["items"]]
+        # Newer and older matches, and a non-match, land between every pair of pages
+        _transaction(client, auth, food["id"], on="2026-04-30", description="Taxi to the airport")
+        _transaction(client, auth, food["id"], on="2026-01-01", description="Taxi to work")
+        _transaction(client, auth, food["id"], description="Groceries")
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    march = [t for t in _search(client, auth, "taxi", limit=100) if t["date"].startswith("2026-03")]
+    january = [t for t in _search(client, auth, "taxi", limit=100) if t["date"].startswith("2026-01")]
+    # Every March row exactly once, and the January rows added before the walk got there
+    assert len(seen) == len(set(seen))
+    assert {t["id"] for t in march} <= set(seen)
+    assert set(seen) - {t["id"] for t in march} <= {t["id"] for t in january}
+
+
+def test_export_filters_by_search(client, auth):
+    food = _category(client, auth)
+    _transaction(client, auth, food["id"], description="Parking")
+    _transaction(client, auth, food["id"], description="Groceries")
+
+    response = client.get("/api/transactions/export", params={"q": "park", "format": "csv"}, headers=auth)
+    assert response.status_code == 200
+    assert "Parking" in response.text and "Groceries" not in response.text